@@ -0,0 +1,94 @@
+"""A small stand-in for the grid and cell objects that grid entities expect.
+
+It implements just the interface entyty relies on: ``Grid.__getitem__``, ``random_cell``, ``get_path``
+and ``cell_size``, and on cells ``designation``, ``coordinates``, ``adjacent``, the eight direction
+attributes, ``passable``, ``cost_in``/``cost_out``, ``occupied`` and ``recv_occupant``.
+"""
+import random
+
+# Cells list their neighbors in ``adjacent`` in the order of entyty's ``Direction``.
+DIRECTIONS = ('down_left', 'left', 'up_left', 'up', 'up_right', 'right', 'down_right', 'down')
+OFFSETS = ((-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class Cell:
+    __slots__ = ('grid', 'col', 'row', 'designation', 'coordinates', 'adjacent', 'passable', 'cost_in',
+                 'cost_out', 'occupant', 'occupied')
+
+    def __init__(self, grid, col, row):
+        self.grid = grid
+        self.col = col
+        self.row = row
+        self.designation = f'{col}_{row}'
+        self.coordinates = (col * grid.cell_size, row * grid.cell_size)
+        self.adjacent = []
+        self.passable = True
+        self.cost_in = 1
+        self.cost_out = 1
+        self.occupant = None
+        self.occupied = False
+
+    def _neighbor(self, index):
+        designation = self.adjacent[index]
+        return self.grid.cells[designation] if designation is not None else None
+
+    down_left = property(lambda self: self._neighbor(0))
+    left = property(lambda self: self._neighbor(1))
+    up_left = property(lambda self: self._neighbor(2))
+    up = property(lambda self: self._neighbor(3))
+    up_right = property(lambda self: self._neighbor(4))
+    right = property(lambda self: self._neighbor(5))
+    down_right = property(lambda self: self._neighbor(6))
+    down = property(lambda self: self._neighbor(7))
+
+    def recv_occupant(self, occupant):
+        if self.occupant is not None:
+            if self.occupant is occupant:
+                self.occupant = None
+                self.occupied = False
+            return
+        self.occupant = occupant
+        self.occupied = True
+
+
+class Grid:
+    def __init__(self, cols=100, rows=100, cell_size=1, blocked=0.0, seed=0):
+        rng = random.Random(seed)
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.cells = {}
+        self._by_position = {}
+        for col in range(cols):
+            for row in range(rows):
+                cell = Cell(self, col, row)
+                cell.passable = rng.random() >= blocked
+                self.cells[cell.designation] = cell
+                self._by_position[col, row] = cell
+        for cell in self.cells.values():
+            cell.adjacent = [
+                    neighbor.designation if neighbor is not None else None
+                    for neighbor in (self._by_position.get((cell.col + dx, cell.row + dy)) for dx, dy in OFFSETS)
+            ]
+        self._cell_list = list(self.cells.values())
+
+    def __getitem__(self, designation):
+        return self.cells[designation]
+
+    def random_cell(self, attr=None):
+        cell = random.choice(self._cell_list)
+        while attr is not None and getattr(cell, attr[0]) != attr[1]:
+            cell = random.choice(self._cell_list)
+        return cell
+
+    def get_path(self, start, destination):
+        """Return the cells of a straight, diagonal-first walk from start to destination."""
+        start = self.cells[start] if isinstance(start, str) else start
+        destination = self.cells[destination] if isinstance(destination, str) else destination
+        col, row = start.col, start.row
+        path = []
+        while (col, row) != (destination.col, destination.row):
+            col += (destination.col > col) - (destination.col < col)
+            row += (destination.row > row) - (destination.row < row)
+            path.append(self._by_position[col, row])
+        return path
@@ -0,0 +1,76 @@
+"""Microbenchmark for entity event dispatch.
+
+Every entity registers its own handler, then events are dispatched to randomly chosen entities. With
+handlers routed by entity id and class, the cost per dispatch should stay flat from 10 to 100k entities.
+For comparison, the same workload is run against a single shared ``pyglet.event.EventDispatcher`` with
+one handler frame pushed per entity, which is how entity handlers were registered before.
+
+Run from the repository root with ``python benchmarks/bench_dispatch.py``.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyglet.event import EventDispatcher
+
+from entyty._entity import LogicalEntity
+
+SCALES = (10, 100, 1_000, 10_000, 100_000)
+DISPATCHES = 10_000
+LEGACY_DISPATCHES = 200
+
+
+class Unit(LogicalEntity):
+    pass
+
+
+class SharedDispatcher(EventDispatcher):
+    pass
+
+
+SharedDispatcher.register_event_type('on_update')
+
+
+def on_update(*args):
+    pass
+
+
+def bench_entity_dispatch(entities):
+    for entity in entities:
+        entity._add_entity_handler('on_update', on_update)
+    sample = [random.choice(entities) for _ in range(DISPATCHES)]
+    start = time.perf_counter()
+    for entity in sample:
+        entity._dispatch_event('on_update', entity)
+    elapsed = time.perf_counter() - start
+    for entity in entities:
+        entity._clear_entity_handlers()
+    return elapsed / DISPATCHES
+
+
+def bench_shared_dispatch(entities):
+    dispatcher = SharedDispatcher()
+    for _ in entities:
+        dispatcher.push_handlers(on_update=on_update)
+    start = time.perf_counter()
+    for _ in range(LEGACY_DISPATCHES):
+        dispatcher.dispatch_event('on_update')
+    return (time.perf_counter() - start) / LEGACY_DISPATCHES
+
+
+def main():
+    random.seed(0)
+    entities = []
+    print(f'{"entities":>10} {"routed ns/dispatch":>20} {"shared stack ns/dispatch":>26}')
+    for n in SCALES:
+        entities.extend(Unit() for _ in range(n - len(entities)))
+        routed = bench_entity_dispatch(entities)
+        shared = bench_shared_dispatch(entities)
+        print(f'{n:>10} {routed * 1e9:>20.0f} {shared * 1e9:>26.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark for the memory held by each entity.
+
+Reports, for ``Entity``, ``LogicalEntity``, ``VisualEntity`` and ``GridEntity``, the bytes allocated per
+entity including everything it owns (its UUID, history lists, path and so on) and the size of the
+instance itself, whose attributes are stored in ``__slots__`` rather than a per-instance ``__dict__``.
+
+Run from the repository root with ``python benchmarks/bench_memory.py``.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entyty._entity import Entity, LogicalEntity, VisualEntity, GridEntity
+
+from _grid import Grid
+
+COUNT = 10_000
+
+
+def bytes_per_entity(factory):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [factory() for _ in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / COUNT, sys.getsizeof(entities[0])
+
+
+def main():
+    grid = Grid(200, 200)
+    cases = (
+            ('Entity', lambda: Entity()),
+            ('LogicalEntity', lambda: LogicalEntity()),
+            ('VisualEntity', lambda: VisualEntity(position=(0, 0))),
+            ('GridEntity', lambda: GridEntity(grid)),
+    )
+    print(f'{"class":>14} {"bytes per entity":>17} {"instance bytes":>15} {"has __dict__":>13}')
+    for name, factory in cases:
+        total, instance = bytes_per_entity(factory)
+        has_dict = hasattr(factory(), '__dict__')
+        print(f'{name:>14} {total:>17.0f} {instance:>15} {str(has_dict):>13}')
+        for cell in grid.cells.values():
+            cell.occupant = None
+            cell.occupied = False
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark for following long paths one turn's movements at a time.
+
+Compares the list slicing that ``move_in_path`` and ``slice_path`` used to do, where every turn copied
+the rest of the path and popped the head of a fully materialized chunk queue, against walking the same
+path with a ``PathCursor``. Both walk every cell of each turn's chunk, as ``move_in_path`` does. Paths of
+1k and 10k cells are walked with 1, 5 and 20 movements per turn, so the cursor's time should grow
+tenfold between them while the slicing's grows about a hundredfold.
+
+Run from the repository root with ``python benchmarks/bench_path.py``.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entyty._entity import PathCursor
+
+PATH_LENGTHS = (1_000, 10_000)
+MOVEMENTS = (1, 5, 20)
+REPEATS = 5
+
+
+def follow_sliced(path, movements):
+    queue = [path[i:i + movements] for i in range(0, len(path), movements)]
+    walked = 0
+    while queue:
+        cells = queue.pop(0)
+        path = path[len(cells):]
+        for _ in cells:
+            walked += 1
+    return walked
+
+
+def follow_cursor(path, movements):
+    cursor = PathCursor(path)
+    walked = 0
+    while cursor:
+        for _ in cursor.advance(movements):
+            walked += 1
+    return walked
+
+
+def best_of(func, *args):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f'{"path length":>12} {"movements":>10} {"sliced ms":>12} {"cursor ms":>12} {"speedup":>9}')
+    for length in PATH_LENGTHS:
+        path = [object() for _ in range(length)]
+        for movements in MOVEMENTS:
+            sliced = best_of(follow_sliced, path, movements)
+            cursor = best_of(follow_cursor, path, movements)
+            print(f'{length:>12} {movements:>10} {sliced * 1e3:>12.2f} {cursor * 1e3:>12.2f} {sliced / cursor:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark for replanning the paths of many grid entities in one tick.
+
+Plans 1,000 paths between random passable cells of a 120x120 grid with a fifth of its cells blocked,
+once in the calling process and then on pools of 2, 4 and every available core, with the pool started
+before timing. Each worker reads the grid from shared memory, so the only data sent per request is two
+cell numbers and the path that comes back. Speedups are bounded by the number of cores of the machine.
+
+Run from the repository root with ``python benchmarks/bench_planner.py``.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entyty._entity import GridEntity, PathPlanner
+
+from _grid import Grid
+
+PATHS = 1_000
+
+
+def make_requests(grid):
+    entities, destinations = [], []
+    for _ in range(PATHS):
+        entity = GridEntity.__new__(GridEntity)
+        entity._grid = grid
+        entity._cell = grid.random_cell(attr=('passable', True))
+        entities.append(entity)
+        destinations.append(grid.random_cell(attr=('passable', True)))
+    return entities, destinations
+
+
+def plan(grid, entities, destinations, workers):
+    with PathPlanner(grid, workers=workers) as planner:
+        planner.start()
+        start = time.perf_counter()
+        for entity, destination in zip(entities, destinations):
+            planner.plan(entity, destination)
+        planner.submit()
+        planner.collect(wait=True)
+        return time.perf_counter() - start
+
+
+def main():
+    random.seed(0)
+    grid = Grid(120, 120, blocked=0.2)
+    entities, destinations = make_requests(grid)
+    cores = os.cpu_count() or 1
+    print(f'{PATHS} paths, {cores} cores')
+    serial = plan(grid, entities, destinations, 0)
+    print(f'{"in process":>12} {serial:>8.2f} s')
+    for workers in sorted({2, 4, cores} - {1}):
+        elapsed = plan(grid, entities, destinations, workers)
+        print(f'{f"{workers} workers":>12} {elapsed:>8.2f} s {serial / elapsed:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
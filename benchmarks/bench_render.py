@@ -0,0 +1,86 @@
+"""Benchmark for the time it takes to draw a frame of 10k grid entities.
+
+Compares the old ``GridEntity.draw``, which created a new rectangle for every entity on every frame,
+against a ``GridRenderer`` that keeps one rectangle per entity and only moves the rectangles of the
+entities that changed cell. Each frame steps a world in which a tenth of the entities travel, then
+draws the batch.
+
+Run from the repository root with ``python benchmarks/bench_render.py``. Without a display, pyglet is
+run headless, which needs EGL.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyglet
+
+pyglet.options['headless'] = not os.environ.get('DISPLAY')
+
+from entyty._entity import GridEntity, GridRenderer, World
+
+from _grid import Grid
+
+COUNT = 10_000
+FRAMES = 60
+
+
+def make_world():
+    grid = Grid(200, 200, cell_size=4)
+    world = World(grid)
+    entities = []
+    for _ in range(COUNT):
+        entity = GridEntity(grid)
+        world.add(entity)
+        entities.append(entity)
+    for entity in entities[::10]:
+        entity.set_path_to(grid.random_cell(attr=('passable', True)))
+    return world, entities
+
+
+def frames_per_frame_shapes(window):
+    world, entities = make_world()
+    batch = pyglet.graphics.Batch()
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        world.step(1)
+        window.clear()
+        # A shape leaves the batch when it is garbage collected, so the frame's shapes are held until
+        # the batch has been drawn and released before the next frame creates new ones.
+        shapes = [
+                pyglet.shapes.Rectangle(entity.x, entity.y, entity.width, entity.height, color=(255, 0, 0), batch=batch)
+                for entity in entities
+        ]
+        batch.draw()
+        del shapes
+        window.flip()
+    return (time.perf_counter() - start) / FRAMES
+
+
+def frames_persistent(window):
+    world, entities = make_world()
+    renderer = GridRenderer()
+    for entity in entities:
+        renderer.show(entity)
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        world.step(1)
+        window.clear()
+        renderer.draw()
+        window.flip()
+    elapsed = (time.perf_counter() - start) / FRAMES
+    renderer.close()
+    return elapsed
+
+
+def main():
+    window = pyglet.window.Window(800, 800, visible=False)
+    print(f'{COUNT} entities, {FRAMES} frames')
+    print(f'{"new shapes every frame":>26} {frames_per_frame_shapes(window) * 1e3:>8.2f} ms per frame')
+    print(f'{"persistent renderer":>26} {frames_persistent(window) * 1e3:>8.2f} ms per frame')
+    window.close()
+
+
+if __name__ == '__main__':
+    main()
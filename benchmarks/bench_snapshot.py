@@ -0,0 +1,65 @@
+"""Benchmark for checkpointing and restoring a world.
+
+Compares writing one JSON file per entity with ``AbstractEntity._save`` against writing a single
+columnar ``Snapshot`` with ``World.save``, and reports how long it takes to open a snapshot, to rebuild
+one entity from it, to restore a whole world from it and to build every restored entity.
+
+Run from the repository root with ``python benchmarks/bench_snapshot.py``.
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entyty._entity import GridEntity, Snapshot, World
+
+from _grid import Grid
+
+COUNT = 20_000
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def save_json(entities, directory):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, entity in enumerate(entities):
+            entity._save(os.path.join(directory, f'{i}.json'))
+
+
+def main():
+    grid = Grid(300, 300)
+    world = World(grid)
+    for _ in range(COUNT):
+        world.add(GridEntity(grid))
+    for entity in world.entities[:COUNT // 10]:
+        entity.set_path_to(grid.random_cell(attr=('passable', True)))
+    world.step(1)
+    with tempfile.TemporaryDirectory() as directory:
+        json_seconds, _ = timed(save_json, world.entities, directory)
+        path = os.path.join(directory, 'world.snap')
+        save_seconds, _ = timed(world.save, path)
+        size = os.path.getsize(path)
+        open_seconds, snapshot = timed(Snapshot, path, grid)
+        one_seconds, _ = timed(snapshot.__getitem__, COUNT // 2)
+        snapshot.close()
+        restore_seconds, _ = timed(world.restore, path)
+        build_seconds, _ = timed(list, world)
+    print(f'{COUNT} entities')
+    print(f'{"json files, save":>24} {json_seconds * 1e3:>10.1f} ms')
+    print(f'{"snapshot, save":>24} {save_seconds * 1e3:>10.1f} ms  ({size / COUNT:.0f} bytes per entity)')
+    print(f'{"snapshot, open":>24} {open_seconds * 1e3:>10.1f} ms')
+    print(f'{"snapshot, one entity":>24} {one_seconds * 1e3:>10.1f} ms')
+    print(f'{"snapshot, restore world":>24} {restore_seconds * 1e3:>10.1f} ms')
+    print(f'{"restored, build all":>24} {build_seconds * 1e3:>10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+"""Benchmark suite for the entity paths other code depends on, with machine-readable results.
+
+Measures entity creation (``Entity`` and ``GridEntity``, one by one and with ``spawn_many``), creating
+and deleting grid entities with and without an ``EntityPool``, ``move``, ``move_in_path`` and
+``refresh`` throughput, ``set_path_to``, event dispatch and ``_save`` at 1k, 10k and 100k entities on
+the stand-in grid of ``_grid.py``, which the suite reuses from the memory benchmark rather than defining
+a grid of its own. Only the measured calls are timed; building grids and entities for a benchmark is
+not. Each benchmark is run ``--repeat`` times at every scale and the fastest run is kept.
+
+Results are printed as a table and, with ``--output``, written as JSON together with the commit, Python
+and NumPy versions and platform they were measured on. ``--compare`` reads an earlier JSON file and
+reports the change of every benchmark, exiting with status 1 if any got slower by more than
+``--threshold``, so two commits can be compared with::
+
+    python benchmarks/suite.py --output before.json
+    git checkout other-commit
+    python benchmarks/suite.py --compare before.json
+
+Run from the repository root with ``python benchmarks/suite.py``.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy
+
+from entyty._entity import Entity, EntityPool, GridEntity, LogicalEntity
+
+from _grid import Grid
+
+SCALES = (1_000, 10_000, 100_000)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a function that builds its fixture for a scale and returns (seconds, operations)."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the prints of ``move`` and ``_save`` while they are timed."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def make_grid(scale):
+    """Return a grid with about twice as many cells as entities."""
+    side = math.ceil(math.sqrt(scale * 2))
+    return Grid(side, side, cell_size=4)
+
+
+def make_grid_entities(scale):
+    grid = make_grid(scale)
+    return grid, [GridEntity(grid) for _ in range(scale)]
+
+
+def timed(func, items):
+    """Call a function on every item and return the elapsed seconds."""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+@benchmark('create_entity')
+def create_entity(scale):
+    start = time.perf_counter()
+    entities = [Entity() for _ in range(scale)]
+    return time.perf_counter() - start, len(entities)
+
+
+@benchmark('create_grid_entity')
+def create_grid_entity(scale):
+    grid = make_grid(scale)
+    start = time.perf_counter()
+    entities = [GridEntity(grid) for _ in range(scale)]
+    return time.perf_counter() - start, len(entities)
+
+
+@benchmark('spawn_many')
+def spawn_many(scale):
+    grid = make_grid(scale)
+    start = time.perf_counter()
+    entities = GridEntity.spawn_many(grid, scale)
+    return time.perf_counter() - start, len(entities)
+
+
+def churn_cells(scale):
+    grid = make_grid(scale)
+    return grid, [grid.random_cell(attr=('passable', True)) for _ in range(scale)]
+
+
+@benchmark('churn')
+def churn(scale):
+    grid, cells = churn_cells(scale)
+    start = time.perf_counter()
+    for cell in cells:
+        GridEntity(grid, cell=cell).delete()
+    return time.perf_counter() - start, len(cells)
+
+
+@benchmark('churn_pooled')
+def churn_pooled(scale):
+    grid, cells = churn_cells(scale)
+    pool = EntityPool(GridEntity)
+    pool.release(GridEntity(grid))
+    start = time.perf_counter()
+    for cell in cells:
+        pool.release(pool.acquire(grid, cell=cell))
+    return time.perf_counter() - start, len(cells)
+
+
+@benchmark('move')
+def move(scale):
+    grid, entities = make_grid_entities(scale)
+    moves = []
+    for entity in entities:
+        for designation in entity.cell.adjacent:
+            cell = grid[designation] if designation is not None else None
+            if cell is not None and cell.passable and not cell.occupied:
+                moves.append((entity, cell))
+                break
+    with quiet():
+        return timed(lambda pair: pair[0].move(pair[1]), moves), len(moves)
+
+
+def traveling_entities(scale):
+    grid, entities = make_grid_entities(scale)
+    for entity in entities:
+        entity.set_path_to(grid.random_cell(attr=('passable', True)))
+    return entities
+
+
+@benchmark('move_in_path')
+def move_in_path(scale):
+    entities = traveling_entities(scale)
+    with quiet():
+        return timed(GridEntity.move_in_path, entities), len(entities)
+
+
+@benchmark('refresh')
+def refresh(scale):
+    entities = traveling_entities(scale)
+    with quiet():
+        return timed(lambda entity: entity.refresh(1), entities), len(entities)
+
+
+@benchmark('set_path_to')
+def set_path_to(scale):
+    grid, entities = make_grid_entities(scale)
+    pairs = [(entity, grid.random_cell(attr=('passable', True))) for entity in entities]
+    return timed(lambda pair: pair[0].set_path_to(pair[1]), pairs), len(pairs)
+
+
+@benchmark('dispatch')
+def dispatch(scale):
+    entities = [LogicalEntity() for _ in range(scale)]
+    handled = []
+    for entity in entities:
+        entity._push_entity_handlers(on_update=lambda entity, fields: handled.append(fields))
+    targets = random.choices(entities, k=scale)
+    fields = frozenset(('age',))
+    elapsed = timed(lambda entity: entity._dispatch_event('on_update', entity, fields), targets)
+    for entity in entities:
+        entity._clear_entity_handlers()
+    return elapsed, len(handled)
+
+
+@benchmark('save')
+def save(scale):
+    entities = [Entity() for _ in range(scale)]
+    with tempfile.TemporaryDirectory() as directory, quiet():
+        path = os.path.join(directory, 'entity.json')
+        return timed(lambda entity: entity._save(path), entities), len(entities)
+
+
+def run(names, scales, repeat):
+    """Run benchmarks and return one result per benchmark and scale."""
+    results = []
+    for name in names:
+        for scale in scales:
+            runs = []
+            for _ in range(repeat):
+                random.seed(0)
+                gc.collect()
+                runs.append(BENCHMARKS[name](scale))
+            seconds, operations = min(runs)
+            results.append({
+                    'name':       name,
+                    'scale':      scale,
+                    'seconds':    seconds,
+                    'operations': operations,
+                    'per_second': operations / seconds if seconds else None,
+            })
+            rate = f'{operations / seconds:>12.0f}' if seconds else f'{"-":>12}'
+            print(f'{name:>20} {scale:>8} {seconds * 1e3:>10.2f} ms {rate} ops/s', flush=True)
+    return results
+
+
+def commit():
+    """Return the commit of the repository, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print the change of every result against a baseline and return the number of regressions."""
+    before = {(result['name'], result['scale']): result for result in baseline['results']}
+    regressions = 0
+    print(f'\ncompared with {baseline["meta"].get("commit") or "baseline"}')
+    for result in results:
+        old = before.get((result['name'], result['scale']))
+        if old is None or not old['per_second'] or not result['per_second']:
+            continue
+        change = result['per_second'] / old['per_second'] - 1
+        regressed = change < -threshold
+        regressions += regressed
+        flag = '  REGRESSION' if regressed else ''
+        print(f'{result["name"]:>20} {result["scale"]:>8} {change:>+9.1%}{flag}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', default=','.join(map(str, SCALES)), help='comma-separated entity counts')
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help='comma-separated benchmark names')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark and scale')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='compare with the JSON results of an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown reported as a regression')
+    args = parser.parse_args(argv)
+    names = [name for name in args.only.split(',') if name]
+    unknown = sorted(set(names) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(unknown)}')
+    scales = [int(scale) for scale in args.scales.split(',') if scale]
+    results = run(names, scales, max(args.repeat, 1))
+    report = {
+            'meta': {
+                    'commit':    commit(),
+                    'python':    platform.python_version(),
+                    'numpy':     numpy.__version__,
+                    'platform':  platform.platform(),
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    'repeat':    args.repeat,
+            },
+            'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        return 1 if compare(results, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
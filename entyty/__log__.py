@@ -1,21 +1,77 @@
+import atexit
 import logging
+import os
 from functools import wraps
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 
-logging.addLevelName(37, "ENTITY")
+LEVEL = 37
+# Messages logged at import time use this level, below the handler's, so importing entyty neither starts
+# the writer thread nor creates the log file.
+IMPORT_LEVEL = logging.DEBUG
+# log_method leaves the functions it decorates untouched when Python runs with -O or when the
+# ENTYTY_LOG_METHODS environment variable is set to 0 before entyty is imported.
+LOG_METHODS = __debug__ and os.environ.get('ENTYTY_LOG_METHODS', '1') != '0'
+
+logging.addLevelName(LEVEL, "ENTITY")
 logger = logging.getLogger("ENTITY")
-file_handler = logging.FileHandler('entity.log')
-file_handler.setLevel(37)
 formatter = logging.Formatter('%(asctime)s - %(message)s', 'w')
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
-logger.setLevel(37)
 
-def log(message):
-    logger.log(37, message)
+
+class LazyQueueHandler(QueueHandler):
+    """A handler that hands records to a background thread, which writes them to a file.
+
+    The file handler and the thread are only created when the first record is logged, and logging a
+    record only puts it on a queue, so the caller never waits on disk I/O.
+    """
+
+    def __init__(self, filename):
+        super().__init__(SimpleQueue())
+        self.filename = filename
+        self.file_handler = None
+        self.listener = None
+
+    def enqueue(self, record):
+        if self.listener is None:
+            self.start()
+        super().enqueue(record)
+
+    def start(self):
+        """Create the file handler and start the thread that writes queued records to it."""
+        self.file_handler = logging.FileHandler(self.filename, delay=True)
+        self.file_handler.setLevel(LEVEL)
+        self.file_handler.setFormatter(formatter)
+        self.listener = QueueListener(self.queue, self.file_handler, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Write out the queued records and stop the background thread."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            self.file_handler.close()
+
+
+queue_handler = LazyQueueHandler('entity.log')
+queue_handler.setLevel(LEVEL)
+logger.addHandler(queue_handler)
+logger.setLevel(LEVEL)
+
+
+def log(message, *args, level=LEVEL):
+    """Log a message, %-formatting it with `args` only if the logger is enabled for `level`."""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args)
+
 
 def log_method(func):
+    if not LOG_METHODS:
+        return func
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        log(f'Calling {func.__name__}(args={args}, kwargs={kwargs})')
+        if logger.isEnabledFor(LEVEL):
+            logger.log(LEVEL, 'Calling %s(args=%s, kwargs=%s)', func.__name__, args, kwargs)
         return func(*args, **kwargs)
     return wrapper
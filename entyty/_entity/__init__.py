@@ -2,3 +2,22 @@ from ._base_entity import AbstractEntity, BaseEntity
 from ._entity import Entity, LogicalEntity, VisualEntity
 from ._grid_entity import AbstractGridEntity, GridEntity
 
+from ._registry import EntityRegistry
+from ._world import World
+from ._path_cache import PathCache
+from ._flow_field import FlowField, FlowFieldCache
+from ._path import PathCursor
+from ._spatial import SpatialIndex
+from ._snapshot import Snapshot
+from ._journal import Journal
+from ._actions import ActionLog, Direction
+from ._history import CellHistory, HistorySpill
+from ._render import GridRenderer
+from ._changes import ChangeSet
+from ._event_queue import EventQueue, EventStream, QueuedEvent
+from ._neighbors import NeighborTable
+from ._planner import PathPlanner
+from ._hierarchy import Hierarchy
+from ._labels import LabelIndex
+from ._instrument import Instrumentation
+from ._pool import EntityPool
@@ -0,0 +1,174 @@
+from __future__ import annotations as _annotations
+
+from collections import deque as _deque
+
+from enum import IntEnum as _IntEnum
+
+from typing import Optional as _Optional
+
+import numpy as _np
+
+
+class Direction(_IntEnum):
+    """The direction of a move, numbered by the position of the destination in a cell's `adjacent`."""
+    SOUTH_WEST = 0
+    WEST = 1
+    NORTH_WEST = 2
+    NORTH = 3
+    NORTH_EAST = 4
+    EAST = 5
+    SOUTH_EAST = 6
+    SOUTH = 7
+
+    @property
+    def cell_attribute(self) -> str:
+        """Return the name of the cell attribute that holds the neighbour in this direction."""
+        return _CELL_ATTRIBUTES[self]
+
+
+_CELL_ATTRIBUTES = ('down_left', 'left', 'up_left', 'up', 'up_right', 'right', 'down_right', 'down')
+
+
+ACTION_DTYPE = _np.dtype([
+        ('entity', _np.int64),
+        ('turn', _np.int64),
+        ('index', _np.int32),
+        ('direction', _np.uint8),
+        ('from', _np.int32),
+        ('to', _np.int32),
+])
+
+
+class ActionLog:
+    """A fixed-size ring buffer of move records shared by many entities.
+
+    Each record holds the entity's integer id, the turn and index of the move, its direction and the ids
+    of the cells it moved from and to, so recording a move formats no strings and allocates nothing.
+    Cell ids index a table of cell designations kept by the log. Once the buffer is full the oldest
+    records are overwritten, which keeps memory bounded however long the simulation runs. The log also
+    keeps the sequence numbers of each entity's retained records, so reading or discarding the moves of
+    one entity only visits that entity's records.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        self._records = _np.zeros(max(int(capacity), 1), ACTION_DTYPE)
+        self._records['entity'] = -1
+        self._count = 0
+        self._cells = []
+        self._cell_ids = {}
+        self._index = {}
+
+    def __len__(self):
+        return min(self._count, len(self._records))
+
+    @property
+    def capacity(self) -> int:
+        """Return the number of records the log holds before it overwrites the oldest."""
+        return len(self._records)
+
+    @property
+    def cells(self) -> tuple:
+        """Return the cell designations indexed by the cell ids of the records."""
+        return tuple(self._cells)
+
+    def cell_id(self, designation: str) -> int:
+        """Return the id of a cell designation, assigning one if it has none."""
+        cell_id = self._cell_ids.get(designation)
+        if cell_id is None:
+            cell_id = self._cell_ids[designation] = len(self._cells)
+            self._cells.append(designation)
+        return cell_id
+
+    def record(self, entity_id: int, turn: int, index: int, direction: int, cell_from: str, cell_to: str):
+        """Append a move record, overwriting the oldest record if the log is full."""
+        records = self._records
+        sequence = self._count
+        slot = sequence % len(records)
+        if sequence >= len(records):
+            self._forget(slot, sequence - len(records))
+        records[slot] = (entity_id, turn, index, direction, self.cell_id(cell_from), self.cell_id(cell_to))
+        sequences = self._index.get(entity_id)
+        if sequences is None:
+            sequences = self._index[entity_id] = _deque()
+        sequences.append(sequence)
+        self._count = sequence + 1
+
+    def _forget(self, slot: int, sequence: int):
+        """Drop the record about to be overwritten from the index of its entity."""
+        entity_id = int(self._records['entity'][slot])
+        if entity_id < 0:
+            return
+        sequences = self._index.get(entity_id)
+        if sequences and sequences[0] == sequence:
+            sequences.popleft()
+            if not sequences:
+                del self._index[entity_id]
+
+    def export(self) -> _np.ndarray:
+        """Return a copy of the records, oldest first, as a structured array of `ACTION_DTYPE`."""
+        start = self._count % len(self._records)
+        if self._count <= len(self._records):
+            records = self._records[:self._count]
+        else:
+            records = _np.concatenate((self._records[start:], self._records[:start]))
+        return records[records['entity'] >= 0].copy()
+
+    def _select(self, entity_id: int, turn: _Optional[int] = None) -> list:
+        """Return the retained records of an entity, or of one of its turns, oldest first."""
+        sequences = self._index.get(entity_id)
+        if not sequences:
+            return []
+        records = self._records
+        capacity = len(records)
+        if turn is None:
+            return [records[sequence % capacity] for sequence in sequences]
+        selected = []
+        # An entity's turns only increase, so the records of a turn are found walking back from the newest.
+        for sequence in reversed(sequences):
+            record = records[sequence % capacity]
+            if record['turn'] == turn:
+                selected.append(record)
+            elif record['turn'] < turn:
+                break
+        selected.reverse()
+        return selected
+
+    def _move(self, record) -> dict:
+        return {
+                'direction': Direction(record['direction']).name.lower(),
+                'from':      self._cells[record['from']],
+                'to':        self._cells[record['to']],
+        }
+
+    def moves(self, entity_id: int, turn: int) -> dict:
+        """Return the retained moves of an entity in a turn as {index: {'direction', 'from', 'to'}}."""
+        return {int(record['index']): self._move(record) for record in self._select(entity_id, turn)}
+
+    def turns(self, entity_id: int) -> dict:
+        """Return the retained moves of an entity grouped by turn, as {turn: {index: move}}."""
+        turns = {}
+        for record in self._select(entity_id):
+            turns.setdefault(int(record['turn']), {})[int(record['index'])] = self._move(record)
+        return turns
+
+    def discard(self, entity_id: int, turn: _Optional[int] = None):
+        """Drop the records of an entity, or of one of its turns."""
+        sequences = self._index.pop(entity_id, None)
+        if not sequences:
+            return
+        records = self._records
+        kept = _deque()
+        for sequence in sequences:
+            slot = sequence % len(records)
+            if turn is None or records['turn'][slot] == turn:
+                records['entity'][slot] = -1
+            else:
+                kept.append(sequence)
+        if kept:
+            self._index[entity_id] = kept
+
+    def clear(self):
+        """Drop every record."""
+        self._records['entity'] = -1
+        self._count = 0
+        self._index.clear()
@@ -1,10 +1,17 @@
 from __future__ import annotations as _annotations
 
-from ..__log__ import log, log_method
+from ..__log__ import IMPORT_LEVEL, log, log_method
+
+from ._registry import Column as _Column
+from ._changes import ChangeSet as _ChangeSet
+from ._event_queue import EventQueue as _EventQueue
+from ._labels import LabelIndex as _LabelIndex
 
 from abc import ABC as _ABC, abstractmethod as _abstractmethod
 
-from pyglet.event import EventDispatcher as _EventDispatcher
+from ._dispatch import EntityDispatcher as _EntityDispatcher
+
+from itertools import count as _count
 
 from typing import Optional as _Optional
 
@@ -12,6 +19,8 @@ from uuid import uuid4 as _uuid4, UUID as _UUID
 
 import json
 
+_next_id = _count(1).__next__
+
 
 class Scene(_ABC):
     pass
@@ -22,7 +31,7 @@ class AbstractElement(_ABC):
 
 
 class EntityMeta(type):
-    dispatcher = _EventDispatcher()
+    dispatcher = _EntityDispatcher()
     events = {
             'on_create': 'entity_created',
             'on_update': 'entity_updated',
@@ -35,17 +44,47 @@ class EntityMeta(type):
     """A metaclass for entity _objects."""
 
     def __new__(cls, name, bases, attrs):
-        """Create a new entity class."""
+        """Create a new entity class, merging the events it declares in `_events` with those of its bases.
+
+        A slot cannot share its name with a class attribute, so class-level defaults for attributes stored
+        in `__slots__` are moved into `_slot_defaults` and assigned to every new instance instead.
+        """
+        events = dict(cls.events)
+        for base in reversed(bases):
+            events.update(getattr(base, '_events', {}))
+        events.update(attrs.get('_events', {}))
+        for event_name in events:
+            cls.dispatcher.register_event_type(event_name)
+        attrs['_events'] = events
+        slots = set(attrs.get('__slots__', ()))
+        for base in bases:
+            for klass in base.__mro__:
+                slots.update(vars(klass).get('__slots__', ()))
+        defaults = {}
+        for base in reversed(bases):
+            defaults.update(getattr(base, '_slot_defaults', {}))
+        for attr_name in slots:
+            if attr_name in attrs:
+                defaults[attr_name] = attrs.pop(attr_name)
+        attrs['_slot_defaults'] = defaults
         return super().__new__(cls, name, bases, attrs)
 
 
 class AbstractEntity(metaclass=EntityMeta):
-    log('Initializing abstract entity class.')
+    log('Initializing abstract entity class.', level=IMPORT_LEVEL)
+    __slots__ = (
+            '_scene', '_name', '_id', '_entity_id', '_age_local', '_registry', '_slot', '_labels', '_recvs_input',
+            '_inputs', '_is_child', '_is_parent', '_children', '_siblings', '_parent', '_dirty', '__weakref__',
+    )
+    dispatcher = EntityMeta.dispatcher
     _scene = None
     _name = None
     _entity_id = None
-    _age = 0
-    _labels = {'static': [], 'dynamic': []}
+    _age = _Column(0)
+    _registry = None
+    _slot = None
+    _labels = 0
+    _label_index = _LabelIndex()
     _recvs_input = False
     _inputs = None
     _is_child = False
@@ -53,8 +92,19 @@ class AbstractEntity(metaclass=EntityMeta):
     _children = None
     _siblings = None
     _parent = None
+    _dirty = None
+    _changes = None
+    _event_queue = None
     """An abstract base class for entity _objects."""
 
+    def __new__(cls, *args, **kwargs):
+        """Create a new entity with its slots set to their class-level defaults and a fresh integer id."""
+        entity = super().__new__(cls)
+        entity._id = _next_id()
+        for attr_name, default in cls._slot_defaults.items():
+            setattr(entity, attr_name, default)
+        return entity
+
     @property
     def name(self):
         """Return the name of the entity."""
@@ -65,6 +115,7 @@ class AbstractEntity(metaclass=EntityMeta):
         """Set the name of the entity."""
         if self._name is None or self.__class__.__name__ != 'BaseEntity':
             self._name = name
+            self._mark_dirty('name')
         else:
             raise AttributeError("Cannot change the name of an entity.")
         
@@ -83,7 +134,6 @@ class AbstractEntity(metaclass=EntityMeta):
             elif self._scene is not None and scene is None:
                 self._scene.remove_entity(self)
                 self._scene = None
-                del self._scene
             elif self._scene is not None:
                 self._scene.remove_entity(self)
                 self._scene = scene
@@ -94,61 +144,256 @@ class AbstractEntity(metaclass=EntityMeta):
         if hasattr(self, '_scene') and self._scene is not None:
             self._scene.remove_entity(self)
             self._scene = None
-            delattr(self, '_scene')
         else:
             return
 
+    @property
+    def id(self) -> int:
+        """Return the integer id of the entity, unique within the process."""
+        return self._id
+
     @property
     def entity_id(self):
-        """Return the ID of the entity."""
+        """Return the UUID of the entity as a hex string, creating the UUID on first access."""
         if self._entity_id is None:
-            self._entity_id = _uuid4()
-        return self._entity_id.hex
+            self._entity_id = _uuid4().hex
+        return self._entity_id
 
     @entity_id.setter
     def entity_id(self, entity_id):
         """Set the ID of the entity."""
         if isinstance(entity_id, _UUID):
-            self._entity_id = entity_id
+            self._entity_id = entity_id.hex
+        elif isinstance(entity_id, str):
+            self._entity_id = _UUID(entity_id).hex
     
     @property
     def events(self):
         """Return the events of the entity."""
-        return self.__class__.events
+        return self._events
+
+    @property
+    def parent(self):
+        """Return the parent of the entity."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent):
+        """Set the parent of the entity."""
+        self._parent = parent
+        self._mark_dirty('parent')
+
+    @property
+    def children(self):
+        """Return the children of the entity in the order they were adopted, or None if it has none.
+
+        The tuple is a copy; children are added and removed with ``_adopt`` and ``_orphan``.
+        """
+        return tuple(self._children.values()) if self._children else None
+
+    @children.setter
+    def children(self, children):
+        """Set the children of the entity, keyed by id so that any child is orphaned in O(1)."""
+        self._children = {child._id: child for child in children} if children else None
+
+    @property
+    def siblings(self):
+        """Return the other children of the entity's parent."""
+        if self._parent is None:
+            return []
+        return [child for child in (self._parent._children or {}).values() if child is not self]
+
+    @property
+    def root(self):
+        """Return the topmost ancestor of the entity, or the entity itself if it has no parent."""
+        entity = self
+        while entity._parent is not None:
+            entity = entity._parent
+        return entity
+
+    def ancestors(self):
+        """Yield the parent of the entity, then its parent, up to the root."""
+        entity = self._parent
+        while entity is not None:
+            yield entity
+            entity = entity._parent
+
+    def descendants(self):
+        """Yield every descendant of the entity, each parent before its children, without recursion."""
+        stack = [iter(self._children.values())] if self._children else []
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            yield child
+            if child._children:
+                stack.append(iter(child._children.values()))
+
+    @property
+    def is_parent(self):
+        """Return True if the entity has children."""
+        return self._is_parent
+
+    @is_parent.setter
+    def is_parent(self, is_parent):
+        self._is_parent = is_parent
+
+    @property
+    def is_child(self):
+        """Return True if the entity has a parent."""
+        return self._is_child
+
+    @is_child.setter
+    def is_child(self, is_child):
+        self._is_child = is_child
+
+    @property
+    def labels(self) -> tuple:
+        """Return the names of the entity's labels."""
+        return self._label_index.labels(self._labels)
+
+    @labels.setter
+    def labels(self, labels):
+        """Replace the entity's labels with one label or an iterable of labels."""
+        self._set_labels(self._label_index.mask(labels or ()))
+
+    def add_label(self, *labels: str):
+        """Add labels to the entity."""
+        self._set_labels(self._labels | self._label_index.mask(labels))
+
+    def remove_label(self, *labels: str):
+        """Remove labels from the entity."""
+        self._set_labels(self._labels & ~self._label_index.mask(labels))
+
+    def has_label(self, *labels: str) -> bool:
+        """Return True if the entity carries every one of the labels."""
+        mask = self._label_index.mask(labels)
+        return self._labels & mask == mask
+
+    def _set_labels(self, mask: int):
+        old = self._labels
+        if mask != old:
+            self._labels = mask
+            self._label_index.update(self, old, mask)
+            self._mark_dirty('labels')
+
+    @classmethod
+    def use_label_index(cls, label_index: _LabelIndex):
+        """Sets the index that entities of the class record their labels in. Entities labeled before the
+        change stay in the old index."""
+        cls._label_index = label_index
+
+    @classmethod
+    def labeled(cls, all_of=(), any_of=(), none_of=()) -> list:
+        """Return the entities of the class's label index that match a label query."""
+        return cls._label_index.entities(all_of, any_of, none_of)
 
     @property
     def age(self):
         return self._age
 
+    @property
+    def registry(self):
+        """Return the registry that stores the entity's column fields, if any."""
+        return self._registry
+
+    @property
+    def dirty(self) -> frozenset:
+        """Return the names of the fields that changed since the entity's changes were last flushed."""
+        return frozenset(self._dirty or ())
+
+    def _mark_dirty(self, field):
+        """Note that a field changed, so the next flush reports the entity once with every changed field.
+
+        Changes are collected by the registry of a registered entity and otherwise by the class's change
+        set, if it has one.
+        """
+        dirty = self._dirty
+        if dirty is not None:
+            dirty.add(field)
+            return
+        changes = self._registry.changes if self._registry is not None else self._changes
+        if changes is not None:
+            self._dirty = {field}
+            changes.add(self)
+
+    @classmethod
+    def use_change_set(cls, changes: _Optional[_ChangeSet] = None):
+        """Sets the change set that collects the changes of entities of the class that are not registered
+        with a registry. Passing None stops tracking them."""
+        cls._changes = changes
+
+    @classmethod
+    def flush_changes(cls) -> int:
+        """Dispatch one on_update for each entity in the class's change set and return how many there were."""
+        if cls._changes is None:
+            return 0
+        entities, fields = cls._changes.flush()
+        for entity, changed in zip(entities, fields):
+            if entity.dispatcher.has_listeners(entity):
+                entity._dispatch_event('on_update', entity, changed)
+        return len(entities)
+
     @classmethod
     def _add_handler(cls, event_type, handler):
-        """Add an event handler to the entity."""
-        cls.dispatcher.push_handlers(handler, event_type)
+        """Add an event handler for every entity of the class."""
+        cls.dispatcher.set_handler(cls, event_type, handler)
 
     @classmethod
     def _remove_handler(cls, event_type, handler):
-        """Remove an event handler from the entity."""
-        cls.dispatcher.remove_handlers(handler, event_type)
+        """Remove an event handler from the class."""
+        cls.dispatcher.remove_handler(cls, event_type, handler)
 
     @classmethod
     def _push_handlers(cls, *args, **kwargs):
-        """Push event handlers to the entity."""
-        cls.dispatcher.push_handlers(*args, **kwargs)
+        """Push a frame of event handlers for every entity of the class."""
+        cls.dispatcher.push_handlers(cls, *args, **kwargs)
 
     @classmethod
     def _pop_handlers(cls):
-        """Pop event handlers from the entity."""
-        cls.dispatcher.pop_handlers()
+        """Pop the top frame of event handlers from the class."""
+        cls.dispatcher.pop_handlers(cls)
 
     @classmethod
     def _register_event_type(cls, event_type):
         """Register an event type for the entity."""
+        cls._events.setdefault(event_type, event_type)
         cls.dispatcher.register_event_type(event_type)
 
+    def _add_entity_handler(self, event_type, handler):
+        """Add an event handler for this entity only."""
+        self.dispatcher.set_handler(self._id, event_type, handler)
+
+    def _remove_entity_handler(self, event_type, handler):
+        """Remove an event handler from this entity."""
+        self.dispatcher.remove_handler(self._id, event_type, handler)
+
+    def _push_entity_handlers(self, *args, **kwargs):
+        """Push a frame of event handlers for this entity only."""
+        self.dispatcher.push_handlers(self._id, *args, **kwargs)
+
+    def _pop_entity_handlers(self):
+        """Pop the top frame of event handlers from this entity."""
+        self.dispatcher.pop_handlers(self._id)
+
+    def _clear_entity_handlers(self):
+        """Remove every event handler registered for this entity."""
+        self.dispatcher.clear_handlers(self._id)
+
+    @classmethod
+    def use_event_queue(cls, event_queue: _Optional[_EventQueue] = None):
+        """Sets the queue that collects the events of entities of the class until it delivers them.
+        Passing None dispatches events immediately again."""
+        cls._event_queue = event_queue
+
     def _dispatch_event(self, event_name, *args):
-        """Dispatch an event for the entity."""
-        if event_type := self.events.get(event_name):
-            self.dispatcher.dispatch_event(event_type, *args)
+        """Dispatch an event for the entity, or queue it if the class uses an event queue."""
+        if event_name in self.events:
+            queue = self._event_queue
+            if queue is not None and not queue.delivering:
+                return queue.put(self, event_name, args)
+            return self.dispatcher.dispatch_event(self, event_name, *args)
 
     @_abstractmethod
     def _validate(self):
@@ -181,42 +426,112 @@ class AbstractEntity(metaclass=EntityMeta):
             print(f"Failed to save entity data: {str(e)}")
             return False
 
+    def delete(self):
+        """Delete the entity, detaching it from its scene, parent and children, and dispatch on_delete.
+
+        The entity's own event handlers are removed once on_delete has reached them, when its event queue
+        delivers it if the class uses one.
+        """
+        if self._parent is not None:
+            self._parent._orphan(self)
+        for child in list(self._children.values() if self._children else ()):
+            self._orphan(child)
+        del self.scene
+        if self._labels:
+            self._label_index.discard(self)
+        self._dispatch_event('on_delete', self)
+        queue = self._event_queue
+        if queue is None or queue.delivering:
+            self._clear_entity_handlers()
+
+    def reinit(self, *args, **kwargs):
+        """Initialize an entity recycled by an EntityPool again with the arguments of its constructor.
+
+        This runs __init__ again; subclasses that are pooled often override it to set their fields directly.
+        """
+        self.__init__(*args, **kwargs)
+
+    def _retire(self):
+        """Delete an entity that is going back to an EntityPool, skipping ``delete`` when the entity has no
+        scene, parent, children, labels or listeners for it to detach or notify."""
+        if (self._parent is not None or self._children or self._scene is not None or self._labels
+                or self.dispatcher.has_listeners(self)):
+            self.delete()
+
+    def _recycle(self):
+        """Give a retired entity a fresh identity so an EntityPool can hand it out again."""
+        if self._dirty is not None:
+            if self._changes is not None:
+                self._changes.discard(self)
+            self._dirty = None
+        self.dispatcher.clear_handlers(self._id)
+        if self._labels:
+            self._label_index.discard(self)
+            self._labels = 0
+        self._id = _next_id()
+        self._entity_id = None
+        self._name = None
+        self._age = 0
+
+    @classmethod
+    def _restore(cls, state: dict):
+        """Rebuild an entity from snapshot state without running __init__ or dispatching events."""
+        entity = cls.__new__(cls)
+        entity._name = state['name']
+        entity._entity_id = state['entity_id']
+        entity._age = state['age']
+        return entity
+
     def _update_entity(self):
         pass
 
     def _adopt(self, child):
-        """Adopt a child entity."""
-        if not self.children:
-            self.children = []
-        self.children.append(child)
+        """Adopt a child entity, orphaning it from its current parent first."""
+        if child._parent is not None and child._parent is not self:
+            child._parent._orphan(child)
+        if not self._children:
+            self._children = {}
+        self._children[child._id] = child
         self.is_parent = True
         child.parent = self
         child.is_child = True
 
+    def _link(self, child):
+        """Attach a child rebuilt from a snapshot or journal, without marking fields dirty or dispatching
+        events."""
+        if not self._children:
+            self._children = {}
+        self._children[child._id] = child
+        self._is_parent = True
+        child._parent = self
+        child._is_child = True
+
     def _orphan(self, child):
         """Orphan a child entity."""
         if self._children:
-            self._children.remove(child)
+            self._children.pop(child._id, None)
         if not self._children:
             self._children = None
             self._is_parent = False
         child._parent = None
         child._is_child = False
+        child._mark_dirty('parent')
 
     def __eq__(self, other):
         """Check if the entity is equal to another entity."""
         if not isinstance(other, AbstractEntity):
             return False
-        return self.entity_id == other.entity_id
+        return self._id == other._id
 
     def __hash__(self):
         """Return a hash of the entity."""
-        return hash(self.entity_id)
+        return self._id
 
 
 class BaseEntity(AbstractEntity):
     """A base class for entity _objects."""
-    log('Initializing base entity class.')
+    log('Initializing base entity class.', level=IMPORT_LEVEL)
+    __slots__ = ()
     def __init__(
             self,
             scene: _Optional[Scene] = None,
@@ -227,7 +542,8 @@ class BaseEntity(AbstractEntity):
         """Create a new entity object."""
         super(BaseEntity, self).__init__()
         self.name = name
-        self.entity_id = entity_id if entity_id is not None else _uuid4()
+        if entity_id is not None:
+            self.entity_id = entity_id
         if scene is None:
             del self.scene
         else:
@@ -238,3 +554,4 @@ class BaseEntity(AbstractEntity):
 
     def update(self, dt):
         self._age += 1
+        self._mark_dirty('age')
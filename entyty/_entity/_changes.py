@@ -0,0 +1,43 @@
+from __future__ import annotations as _annotations
+
+from typing import Iterator as _Iterator
+
+
+class ChangeSet:
+    """The entities whose tracked fields have changed since the set was last flushed.
+
+    An entity joins the set the first time one of its fields changes and keeps the names of the fields
+    that changed on itself, so however often a field is written during a tick the entity is listed once
+    and each field is named once. ``flush`` hands the changes over and empties the set.
+    """
+
+    def __init__(self):
+        self._entities = {}
+
+    def __len__(self):
+        return len(self._entities)
+
+    def __iter__(self) -> _Iterator:
+        return iter(self._entities.values())
+
+    def __contains__(self, entity):
+        return entity._id in self._entities
+
+    def add(self, entity):
+        """Add an entity whose fields have changed."""
+        self._entities[entity._id] = entity
+
+    def discard(self, entity):
+        """Forget the changes of an entity."""
+        if self._entities.pop(entity._id, None) is not None:
+            entity._dirty = None
+
+    def flush(self) -> tuple:
+        """Return the changed entities and the names of the fields each changed, and empty the set."""
+        entities = list(self._entities.values())
+        self._entities.clear()
+        fields = []
+        for entity in entities:
+            fields.append(frozenset(entity._dirty))
+            entity._dirty = None
+        return entities, fields
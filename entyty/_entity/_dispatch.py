@@ -0,0 +1,155 @@
+from __future__ import annotations as _annotations
+
+import inspect as _inspect
+
+from pyglet.event import EVENT_HANDLED, EVENT_UNHANDLED, EventException as _EventException
+
+from typing import Any as _Any, Callable as _Callable, Hashable as _Hashable
+
+
+class EntityDispatcher:
+    """An event dispatcher that keeps a separate stack of handler frames for each entity class and each
+    entity id.
+
+    Dispatching an event for an entity only visits the entity's own frames and the frames of the classes
+    in its MRO, so the cost of a dispatch does not depend on how many entities or handlers exist
+    elsewhere. Handlers are invoked from the top of each stack down, instance frames first, and
+    returning ``EVENT_HANDLED`` stops propagation, as with ``pyglet.event.EventDispatcher``.
+    """
+
+    def __init__(self):
+        self.event_types = []
+        self._frames = {}
+        self._routes = {}
+
+    def register_event_type(self, event_type: str):
+        """Register an event type with the dispatcher."""
+        if event_type not in self.event_types:
+            self.event_types.append(event_type)
+
+    def _get_handlers(self, args, kwargs):
+        """Yield (event type, handler) pairs from positional and keyword handler specifications."""
+        for obj in args:
+            if _inspect.isroutine(obj):
+                if obj.__name__ not in self.event_types:
+                    raise _EventException(f'Unknown event "{obj.__name__}"')
+                yield obj.__name__, obj
+            else:
+                for name in dir(obj):
+                    if name in self.event_types:
+                        yield name, getattr(obj, name)
+        for name, handler in kwargs.items():
+            if name not in self.event_types:
+                raise _EventException(f'Unknown event "{name}"')
+            yield name, handler
+
+    def _changed(self, key: _Hashable):
+        if isinstance(key, type):
+            self._routes.clear()
+
+    def _route(self, cls: type) -> tuple:
+        """Return the classes in the MRO of a class that have handler frames."""
+        route = self._routes.get(cls)
+        if route is None:
+            route = self._routes[cls] = tuple(klass for klass in cls.__mro__ if klass in self._frames)
+        return route
+
+    def has_handlers(self, key: _Hashable) -> bool:
+        """Return True if any handler frames are registered for a class or entity id."""
+        return key in self._frames
+
+    def has_listeners(self, entity: object) -> bool:
+        """Return True if an entity or any class in its MRO has handler frames."""
+        return entity.id in self._frames or bool(self._route(type(entity)))
+
+    def push_handlers(self, key: _Hashable, *args, **kwargs):
+        """Push a new frame of handlers onto the stack for a class or entity id."""
+        self._frames.setdefault(key, []).append(dict(self._get_handlers(args, kwargs)))
+        self._changed(key)
+
+    def set_handlers(self, key: _Hashable, *args, **kwargs):
+        """Set handlers in the top frame of the stack for a class or entity id, pushing a frame if needed."""
+        frames = self._frames.setdefault(key, [])
+        if not frames:
+            frames.append({})
+        frames[-1].update(self._get_handlers(args, kwargs))
+        self._changed(key)
+
+    def set_handler(self, key: _Hashable, event_type: str, handler: _Callable):
+        """Set a single handler in the top frame of the stack for a class or entity id."""
+        self.set_handlers(key, **{event_type: handler})
+
+    def pop_handlers(self, key: _Hashable):
+        """Pop the top frame of handlers for a class or entity id."""
+        frames = self._frames.get(key)
+        if not frames:
+            return
+        frames.pop()
+        if not frames:
+            del self._frames[key]
+        self._changed(key)
+
+    def remove_handlers(self, key: _Hashable, *args, **kwargs):
+        """Remove handlers from the frames of a class or entity id, dropping frames that become empty."""
+        frames = self._frames.get(key)
+        if not frames:
+            return
+        for name, handler in self._get_handlers(args, kwargs):
+            for frame in reversed(frames):
+                if frame.get(name) == handler:
+                    del frame[name]
+                    break
+        frames[:] = [frame for frame in frames if frame]
+        if not frames:
+            del self._frames[key]
+        self._changed(key)
+
+    def remove_handler(self, key: _Hashable, event_type: str, handler: _Callable):
+        """Remove a single handler from the frames of a class or entity id."""
+        self.remove_handlers(key, **{event_type: handler})
+
+    def clear_handlers(self, key: _Hashable):
+        """Remove every frame of handlers for a class or entity id."""
+        if self._frames.pop(key, None) is not None:
+            self._changed(key)
+
+    def dispatch_event(self, entity: object, event_type: str, *args: _Any):
+        """Dispatch an event for an entity to its own handlers, then to its classes' handlers.
+
+        Returns ``EVENT_HANDLED`` if a handler handled the event, ``EVENT_UNHANDLED`` if handlers were
+        invoked without handling it and ``False`` if no handler was registered for the event.
+        """
+        if event_type not in self.event_types:
+            raise _EventException(f'Unknown event "{event_type}"')
+        invoked = False
+        frames = self._frames.get(entity.id)
+        if frames:
+            for frame in reversed(frames):
+                handler = frame.get(event_type)
+                if handler is not None:
+                    invoked = True
+                    if handler(*args):
+                        return EVENT_HANDLED
+        for cls in self._route(type(entity)):
+            for frame in reversed(self._frames.get(cls, ())):
+                handler = frame.get(event_type)
+                if handler is not None:
+                    invoked = True
+                    if handler(*args):
+                        return EVENT_HANDLED
+        return EVENT_UNHANDLED if invoked else False
+
+    def dispatch_class_event(self, cls: type, event_type: str, *args: _Any):
+        """Dispatch an event that concerns many entities of a class to the handlers of the classes in its
+        MRO only, returning as ``dispatch_event`` does."""
+        if event_type not in self.event_types:
+            raise _EventException(f'Unknown event "{event_type}"')
+        invoked = False
+        for klass in self._route(cls):
+            for frame in reversed(self._frames.get(klass, ())):
+                handler = frame.get(event_type)
+                if handler is not None:
+                    invoked = True
+                    if handler(*args):
+                        return EVENT_HANDLED
+        return EVENT_UNHANDLED if invoked else False
@@ -1,39 +1,44 @@
 from ._base_entity import BaseEntity as _BaseEntity, Scene
-from ..__log__ import log
+from ..__log__ import IMPORT_LEVEL, log
 from typing import Optional as _Optional
+from sys import intern as _intern
 
 class Entity(_BaseEntity):
+    __slots__ = ()
     dispatcher = _BaseEntity.dispatcher
-    log('Initializing entity class.')
+    log('Initializing entity class.', level=IMPORT_LEVEL)
     def __init__(
         self,
         name: _Optional[str] = None,
         *args, **kwargs
     ):
-        log(f'Instantiating entity {name}.')
+        log('Instantiating entity %s.', name)
         super().__init__(None, None, name, *args, **kwargs)
         if self.name is None:
-            self.name = self.__class__.__name__.lower()
+            self.name = _intern(self.__class__.__name__.lower())
         
 
 
 class LogicalEntity(_BaseEntity):
     """A base class for logical entities."""
-    log(f'Initializing logical entity class.')
+    __slots__ = ()
 
     def __init__(
             self,
             name: _Optional[str] = None,
     ):
-        log(f'Instantiating logical entity {name}.')
+        log('Instantiating logical entity %s.', name)
         super().__init__(None, None, name)
         if self.name is None:
-            self.name = self.__class__.__name__.lower()
+            self.name = _intern(self.__class__.__name__.lower())
 
 
 class VisualEntity(_BaseEntity):
     """A base class for visual entities."""
-    log(f'Initializing visual entity class.')
+    __slots__ = ('_position', '_x', '_y')
+    _position = None
+    _x = None
+    _y = None
 
     def __init__(
             self,
@@ -41,11 +46,11 @@ class VisualEntity(_BaseEntity):
             scene: _Optional[Scene] = None,
             position: _Optional[tuple] = None
     ):
-        log(f'Instantiating visual entity {name}.')
+        log('Instantiating visual entity %s.', name)
         super().__init__(scene, None, name)
         if self.name is None:
-            self.name = self.__class__.__name__.lower()
-        self._position = position
+            self.name = _intern(self.__class__.__name__.lower())
+        self.position = position
 
     @property
     def position(self):
@@ -57,10 +62,12 @@ class VisualEntity(_BaseEntity):
         """Set the position of the entity"""
         if value is not None:
             self._position = value
+            self._mark_dirty('position')
             self.x = value[1]
             self.y = value[0]
         else:
             self._position = None
+            self._mark_dirty('position')
             self.x = None
             self.y = None
 
@@ -73,6 +80,7 @@ class VisualEntity(_BaseEntity):
     def x(self, value):
         """Set the x coordinate of the entity."""
         self._x = value
+        self._mark_dirty('x')
 
     @property
     def y(self):
@@ -83,6 +91,7 @@ class VisualEntity(_BaseEntity):
     def y(self, value):
         """Set the y coordinate of the entity."""
         self._y = value
+        self._mark_dirty('y')
 
     def update(self, dt):
         super().update(dt)
\ No newline at end of file
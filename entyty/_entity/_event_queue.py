@@ -0,0 +1,186 @@
+from __future__ import annotations as _annotations
+
+from collections import deque as _deque
+
+from typing import Callable as _Callable, NamedTuple as _NamedTuple, Optional as _Optional
+
+import asyncio as _asyncio
+
+
+class QueuedEvent(_NamedTuple):
+    """An entity event held by an EventQueue."""
+    event_type: str
+    entity: object
+    args: tuple
+
+
+class EventQueue:
+    """Collects the events dispatched by entities and delivers them in bulk, grouped by event type.
+
+    While a class uses the queue (see ``AbstractEntity.use_event_queue``), dispatching an event on one of
+    its entities only appends it to the queue, so no handler runs in the middle of ``move`` or a world
+    step. ``deliver`` then hands every queued event of a type to the bulk handlers added with
+    ``subscribe`` and passes it on to the asyncio streams opened with ``stream``, then dispatches every
+    event to its entity's own and class handlers in the order the events were queued, so handlers that
+    depend on that order, such as a journal's, see the same sequence as without a queue. Events
+    dispatched while the queue is delivering are dispatched immediately.
+
+    Attached to a world, the queue is delivered at the end of every step, before ``on_step``.
+    """
+
+    def __init__(self):
+        self._events = []
+        self._bulk = {}
+        self._streams = []
+        self.delivering = False
+        self.world = None
+        self._classes = []
+
+    def __len__(self):
+        return len(self._events)
+
+    def attach(self, world, *classes):
+        """Queue the events of entity classes and deliver them at the end of every step of a world.
+
+        Without classes, the events of every entity are queued.
+        """
+        if not classes:
+            from ._base_entity import AbstractEntity
+            classes = (AbstractEntity,)
+        self.detach()
+        self.world = world
+        world.event_queue = self
+        for cls in classes:
+            cls.use_event_queue(self)
+        self._classes = list(classes)
+
+    def detach(self):
+        """Stop queueing events, delivering those still queued."""
+        for cls in self._classes:
+            if cls._event_queue is self:
+                cls.use_event_queue(None)
+        self._classes = []
+        if self.world is not None and self.world.event_queue is self:
+            self.world.event_queue = None
+        self.world = None
+        self.deliver()
+
+    def put(self, entity, event_type: str, args: tuple):
+        """Queue an event of an entity."""
+        self._events.append(QueuedEvent(event_type, entity, args))
+
+    def subscribe(self, event_type: str, handler: _Callable):
+        """Call a handler once per delivery with the list of every queued event of a type."""
+        self._bulk.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type: str, handler: _Callable):
+        """Stop calling a bulk handler."""
+        handlers = self._bulk.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self._bulk[event_type]
+
+    def stream(self, *event_types: str, maxsize: int = 0) -> EventStream:
+        """Open an asyncio stream of the delivered events of some types, or of every type.
+
+        Must be called from a running event loop. With a `maxsize`, the stream holds at most that many
+        undelivered batches and drops new batches while it is full, so a slow consumer never holds up
+        the simulation or grows without bound.
+        """
+        stream = EventStream(self, event_types, maxsize)
+        self._streams.append(stream)
+        return stream
+
+    def deliver(self) -> int:
+        """Deliver every queued event, one event type at a time, and return the number delivered."""
+        events, self._events = self._events, []
+        if not events:
+            return 0
+        groups = {}
+        for event in events:
+            groups.setdefault(event.event_type, []).append(event)
+        self.delivering = True
+        try:
+            for event_type, group in groups.items():
+                for handler in tuple(self._bulk.get(event_type, ())):
+                    handler(group)
+            for stream in self._streams:
+                stream._offer(groups)
+            for event in events:
+                entity = event.entity
+                if entity.dispatcher.has_listeners(entity):
+                    entity.dispatcher.dispatch_event(entity, event.event_type, *event.args)
+                if event.event_type == 'on_delete':
+                    entity._clear_entity_handlers()
+        finally:
+            self.delivering = False
+        return len(events)
+
+    def clear(self):
+        """Drop every queued event without delivering it."""
+        self._events = []
+
+    def _close_stream(self, stream: EventStream):
+        if stream in self._streams:
+            self._streams.remove(stream)
+
+
+class EventStream:
+    """An asyncio stream of the events delivered by an EventQueue, read with ``async for``.
+
+    Each delivery is handed to the stream's event loop as one batch, so the simulation never awaits a
+    consumer, and the consumer is woken once per delivery rather than once per event.
+    """
+
+    def __init__(self, queue: EventQueue, event_types: tuple = (), maxsize: int = 0):
+        self.queue = queue
+        self.event_types = frozenset(event_types)
+        self.dropped = 0
+        self._loop = _asyncio.get_running_loop()
+        self._batches = _asyncio.Queue(maxsize)
+        self._buffer = _deque()
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> QueuedEvent:
+        while not self._buffer:
+            batch = await self._batches.get()
+            if batch is None:
+                raise StopAsyncIteration
+            self._buffer.extend(batch)
+        return self._buffer.popleft()
+
+    def _offer(self, groups: dict):
+        if self._closed:
+            return
+        batch = [
+                event
+                for event_type, group in groups.items()
+                if not self.event_types or event_type in self.event_types
+                for event in group
+        ]
+        if batch:
+            self._loop.call_soon_threadsafe(self._put, batch)
+
+    def _put(self, batch: _Optional[list]):
+        if batch is not None and self._batches.full():
+            self.dropped += 1
+            return
+        self._batches.put_nowait(batch)
+
+    def close(self):
+        """Stop receiving events. The events already received can still be read."""
+        if self._closed:
+            return
+        self._closed = True
+        self.queue._close_stream(self)
+        self._loop.call_soon_threadsafe(self._end)
+
+    def _end(self):
+        while self._batches.full():
+            self._batches.get_nowait()
+            self.dropped += 1
+        self._batches.put_nowait(None)
@@ -0,0 +1,135 @@
+from __future__ import annotations as _annotations
+
+from ._path_cache import _designation
+
+from heapq import heappush as _heappush, heappop as _heappop
+
+from typing import Optional as _Optional
+
+import math as _math
+
+
+class FlowField:
+    """A cost-aware integration field over a grid toward a single destination.
+
+    The field is built once with a reverse Dijkstra search from the destination, where stepping from a
+    cell into an adjacent passable cell costs the first cell's ``cost_out`` plus the second cell's
+    ``cost_in``. Every reached cell records the adjacent cell to step into next, so any number of
+    entities heading to the destination can read their next step in O(1) without storing a path.
+    """
+
+    def __init__(self, grid, destination, max_cost: _Optional[float] = None):
+        self.grid = grid
+        self.destination = grid[destination] if isinstance(destination, str) else destination
+        self.max_cost = max_cost
+        self.stale = False
+        self.users = 0
+        self.cache = None
+        self._next = {}
+        self._cost = {}
+        self._steps = {}
+        self._build()
+
+    def __len__(self):
+        return len(self._cost)
+
+    def __contains__(self, cell):
+        return _designation(cell) in self._cost
+
+    def _build(self):
+        grid = self.grid
+        destination = self.destination.designation
+        self._cost[destination] = 0
+        self._steps[destination] = 0
+        frontier = [(0, destination)]
+        while frontier:
+            cost, designation = _heappop(frontier)
+            if cost > self._cost[designation]:
+                continue
+            cell = grid[designation]
+            cost_in = cell.cost_in or 0
+            steps = self._steps[designation] + 1
+            for neighbor_designation in cell.adjacent:
+                if neighbor_designation is None:
+                    continue
+                neighbor = grid[neighbor_designation]
+                if not neighbor.passable:
+                    continue
+                neighbor_cost = cost + (neighbor.cost_out or 0) + cost_in
+                if self.max_cost is not None and neighbor_cost > self.max_cost:
+                    continue
+                if neighbor_cost < self._cost.get(neighbor_designation, _math.inf):
+                    self._cost[neighbor_designation] = neighbor_cost
+                    self._steps[neighbor_designation] = steps
+                    self._next[neighbor_designation] = cell
+                    _heappush(frontier, (neighbor_cost, neighbor_designation))
+
+    def next_step(self, cell):
+        """Return the cell to step into from a cell, or None at the destination or outside the field."""
+        return self._next.get(_designation(cell))
+
+    def cost_from(self, cell):
+        """Return the total cost of reaching the destination from a cell, or None if it cannot be reached."""
+        return self._cost.get(_designation(cell))
+
+    def steps_from(self, cell):
+        """Return the number of steps from a cell to the destination, or None if it cannot be reached."""
+        return self._steps.get(_designation(cell))
+
+    def path_from(self, cell) -> list:
+        """Return the full path from a cell to the destination, excluding the starting cell."""
+        path = []
+        step = self.next_step(cell)
+        while step is not None:
+            path.append(step)
+            step = self.next_step(step)
+        return path
+
+
+class FlowFieldCache:
+    """Builds flow fields on demand and shares them between every entity heading to the same destination.
+
+    Entities ``acquire`` the field for their destination and ``release`` it when they arrive or change
+    course. A field is kept while at least one entity is using it and dropped once the last one releases
+    it. ``invalidate`` marks the fields of a grid stale after cell passability or costs change, and their
+    users acquire a rebuilt field on their next step.
+    """
+
+    def __init__(self, max_cost: _Optional[float] = None):
+        self.max_cost = max_cost
+        self.builds = 0
+        self.reuses = 0
+        self._fields = {}
+
+    def __len__(self):
+        return len(self._fields)
+
+    def stats(self) -> dict:
+        """Return the cache counters."""
+        return {'fields': len(self._fields), 'builds': self.builds, 'reuses': self.reuses}
+
+    def acquire(self, grid, destination) -> FlowField:
+        """Return the shared field toward a destination, building it if no entity is using one."""
+        key = (id(grid), _designation(destination))
+        field = self._fields.get(key)
+        if field is None or field.stale:
+            field = self._fields[key] = FlowField(grid, destination, self.max_cost)
+            field.cache = self
+            self.builds += 1
+        else:
+            self.reuses += 1
+        field.users += 1
+        return field
+
+    def release(self, field: FlowField):
+        """Stop using a field, dropping it once it has no users left."""
+        field.users -= 1
+        if field.users <= 0:
+            key = (id(field.grid), field.destination.designation)
+            if self._fields.get(key) is field:
+                del self._fields[key]
+
+    def invalidate(self, grid: _Optional[object] = None):
+        """Mark the fields of a grid, or of every grid, stale and stop handing them out."""
+        for key in [key for key in self._fields if grid is None or key[0] == id(grid)]:
+            self._fields.pop(key).stale = True
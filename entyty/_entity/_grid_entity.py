@@ -1,36 +1,86 @@
 from __future__ import annotations
 
 import math
-
-import pyglet
+import random as _random
+from sys import intern as _intern
 
 from ._entity import *
+from ._registry import Column as _Column
+from ._path import PathCursor
+from ._path_cache import PathCache
+from ._flow_field import FlowFieldCache
+from ._spatial import SpatialIndex
+from ._actions import ActionLog, Direction
+from ._neighbors import NeighborTable
+from ._planner import PathPlanner
+from ._history import CellHistory, HistorySpill
+from ._render import GridRenderer
 from typing import Optional as _Optional, Union as _Union
 
-_DIRECTION_MAP = {'south_west': 'down_left', 'west': 'left', 'north_west': 'up_left', 'north': 'up', 'north_east': 'up_right',  'east': 'right', 'south_east': 'down_right', 'south': 'down'}
+# Empty cursors never move, so every entity without a path shares this one.
+_EMPTY_PATH = PathCursor()
+
+_DIRECTION_MAP = {direction.name.lower(): direction.cell_attribute for direction in Direction}
+# Maps both direction names and cell attribute names to the cell attribute, for move_in_direction.
+_DIRECTION_ATTRIBUTES = {**_DIRECTION_MAP, **{attribute: attribute for attribute in _DIRECTION_MAP.values()}}
+
+_CARDINAL_RANGES = (
+        ('E',  range(337, 360)),
+        ('E',  range(23)),
+        ('NE', range(23, 68)),
+        ('N',  range(68, 113)),
+        ('NW', range(113, 158)),
+        ('W',  range(158, 203)),
+        ('SW', range(203, 248)),
+        ('S',  range(248, 293)),
+        ('SE', range(293, 338)),
+)
+_CARDINALS = frozenset(name for name, _ in _CARDINAL_RANGES)
+# The cardinal direction of every whole degree, so setting facing is a single index.
+_FACING_TABLE = tuple(next(name for name, angles in _CARDINAL_RANGES if angle in angles) for angle in range(360))
 
 def throw_exception(exception_type, message):
     """Throws an exception of the specified type with the specified message."""
     raise exception_type(message)
 
 class AbstractGridEntity(LogicalEntity):
+    __slots__ = (
+            '_grid', '_cell_local', '_cell_history', '_last_cell', '_width', '_height', '_path', '_speed_local',
+            '_movements', '_movements_remaining_local', '_move_energy_local', '_turn_local', '_turn_moves_local',
+            '_is_turn', '_vision', '_facing', '_flow_field', '_blocked_ticks', 'traveling',
+    )
+    _events = {
+            'on_vacate': 'entity_vacated',
+            'on_occupy': 'entity_occupied',
+    }
     _parent = None
     _grid = None
-    _cell = None
+    _cell = _Column()
     _cell_history = None
     _last_cell = None
     _width =  None
     _height = None
     _path = None
-    _speed = None
+    _speed = _Column()
     _movements = None
-    _movements_remaining = None
-    _movement_queue = None
-    _move_energy = None
-    _actions = None
+    _movements_remaining = _Column()
+    _move_energy = _Column()
+    _turn = _Column(0)
+    _turn_moves = _Column(0)
+    _action_log = ActionLog()
     _is_turn = None
     _vision = None
     _facing = None
+    _path_cache = None
+    _path_planner = None
+    _flow_fields = None
+    _flow_field = None
+    _spatial_index = None
+    _history_maxlen = None
+    _history_spill = None
+    _blocked_ticks = 0
+    _patience = 3
+    traveling = False
 
     @property
     def speed(self):
@@ -42,8 +92,54 @@ class AbstractGridEntity(LogicalEntity):
     
     @path.setter
     def path(self, path):
+        """Sets the path, wrapping it in a PathCursor so it can be walked without copying."""
+        if path is not None and not isinstance(path, PathCursor):
+            path = PathCursor(path)
         self._path = path
+        self._mark_dirty('path')
         
+    @property
+    def path_cache(self):
+        """Returns the path cache used to look up paths, if any."""
+        return self._path_cache
+
+    @classmethod
+    def use_path_cache(cls, path_cache: _Optional[PathCache] = None):
+        """Sets the path cache used by every entity of the class. Passing None disables caching."""
+        cls._path_cache = path_cache
+
+    @property
+    def path_planner(self):
+        """Returns the planner that searches paths for set_path_to in worker processes, if any."""
+        return self._path_planner
+
+    @classmethod
+    def use_path_planner(cls, path_planner: _Optional[PathPlanner] = None):
+        """Makes set_path_to of every entity of the class queue its search on a path planner, which sets
+        the path when it is collected. Passing None searches paths on the calling thread again."""
+        cls._path_planner = path_planner
+
+    @property
+    def flow_field(self):
+        """Returns the shared flow field the entity is following, if any."""
+        return self._flow_field
+
+    @classmethod
+    def use_flow_fields(cls, flow_fields: _Optional[FlowFieldCache] = None):
+        """Makes every entity of the class follow shared flow fields from set_path_to. Passing None
+        restores per-entity paths."""
+        cls._flow_fields = flow_fields
+
+    @property
+    def spatial_index(self):
+        """Returns the spatial index that tracks the cells occupied by entities of the class, if any."""
+        return self._spatial_index
+
+    @classmethod
+    def use_spatial_index(cls, spatial_index: _Optional[SpatialIndex] = None):
+        """Sets the spatial index kept up to date as entities of the class occupy and vacate cells."""
+        cls._spatial_index = spatial_index
+
     @property
     def grid(self):
         return self._grid
@@ -62,11 +158,12 @@ class AbstractGridEntity(LogicalEntity):
             if self.cell is not None:
                 return
             self._cell = cell
+            self._mark_dirty('cell')
         elif self.cell is not None:
             self.last_cell = self.cell
             self._cell = None
             self.cell_history.append(self.last_cell)
-            self._pop_handlers()
+            self._mark_dirty('cell')
             
 
     @property
@@ -80,7 +177,25 @@ class AbstractGridEntity(LogicalEntity):
     
     @cell_history.setter
     def cell_history(self, cell_history):
-        self._cell_history = cell_history
+        """Sets the cell history, keeping the cells given under the class's history policy."""
+        self._cell_history = CellHistory(cell_history, self._history_maxlen, self._history_spill, self)
+
+    def _reset_history(self):
+        """Empties the cell history, reusing the history kept by a recycled entity if it has the class's
+        current policy."""
+        history = self._cell_history
+        if history is None or history.maxlen != self._history_maxlen or history.spill is not self._history_spill:
+            self.cell_history = ()
+        else:
+            history.clear()
+            history.dropped = 0
+
+    @classmethod
+    def use_cell_history(cls, maxlen: _Optional[int] = None, spill: _Optional[HistorySpill] = None):
+        """Sets how many left cells entities of the class keep in their cell history, and where the
+        cells dropped from a full history are spilled. Applies to histories created afterwards."""
+        cls._history_maxlen = maxlen
+        cls._history_spill = spill
 
     @property
     def last_cell(self):
@@ -99,6 +214,7 @@ class AbstractGridEntity(LogicalEntity):
     @movements.setter
     def movements(self, movements):
         self._movements_remaining = movements
+        self._mark_dirty('movements_remaining')
         
     @property
     def movements_remaining(self):
@@ -107,18 +223,19 @@ class AbstractGridEntity(LogicalEntity):
     @movements_remaining.setter
     def movements_remaining(self, movements_remaining):
         self._movements_remaining = movements_remaining
+        self._mark_dirty('movements_remaining')
         
     @property
     def movement_queue(self):
-        if self._movement_queue is None:
-            self._movement_queue = []
-        return self._movement_queue
+        """Returns the rest of the path split into chunks of one turn's movements."""
+        if not self.path:
+            return []
+        return list(self.path.chunks(self.movements))
     
     @movement_queue.setter
     def movement_queue(self, movement_queue):
-        if movement_queue is None:
-            movement_queue = []
-        self._movement_queue = movement_queue
+        """Replaces the path with the cells of the given chunks."""
+        self.path = [cell for chunk in movement_queue or () for cell in chunk]
         
     @property
     def move_energy(self):
@@ -129,6 +246,7 @@ class AbstractGridEntity(LogicalEntity):
     @move_energy.setter
     def move_energy(self, move_energy):
         self._move_energy = move_energy
+        self._mark_dirty('move_energy')
 
     @property
     def position(self):
@@ -152,11 +270,34 @@ class AbstractGridEntity(LogicalEntity):
     
     @property
     def actions(self):
-        return self._actions
+        """Returns the moves of the current turn, as {'move': {index: {'direction', 'from', 'to'}}}."""
+        return {'move': self._action_log.moves(self._id, self._turn) or {None: {}}}
     
     @actions.setter
     def actions(self, actions):
-        self._actions = actions
+        """Replaces the moves recorded for the current turn."""
+        self._action_log.discard(self._id, self._turn)
+        self._turn_moves = 0
+        for move in actions.get('move', {}).values():
+            if move and move.get('direction') is not None:
+                self._log_move(Direction[move['direction'].upper()], move['from'], move['to'])
+
+    @property
+    def action_history(self):
+        """Returns the actions of the entity's past turns that are still held by the action log."""
+        turns = self._action_log.turns(self._id)
+        first = min(turns, default=self._turn)
+        return [{'move': turns.get(turn) or {None: {}}} for turn in range(first, self._turn)]
+
+    @property
+    def action_log(self):
+        """Returns the action log that records the moves of entities of the class."""
+        return self._action_log
+
+    @classmethod
+    def use_action_log(cls, action_log: ActionLog):
+        """Sets the action log that records the moves of every entity of the class."""
+        cls._action_log = action_log
 
     @property
     def is_turn(self):
@@ -174,32 +315,20 @@ class AbstractGridEntity(LogicalEntity):
     @facing.setter
     def facing(self, facing: _Optional[_Union[float, int, str]]):
         """Sets the facing direction in degrees."""
-        cardinal_directions = {
-                "E":  range(337, 360) or range(23),
-                "NE": range(23, 68),
-                "N":  range(68, 113),
-                "NW": range(113, 158),
-                "W":  range(158, 203),
-                "SW": range(203, 248),
-                "S":  range(248, 293),
-                "SE": range(293, 338)
-        }
-        if isinstance(facing, (float)):
-            facing = math.degrees(facing)
-        elif isinstance(facing, str) and facing in cardinal_directions:
-            self._facing = facing
+        self._mark_dirty('facing')
+        if isinstance(facing, str):
+            self._facing = facing if facing in _CARDINALS else "Invalid angle"
             return
-        self._facing = next(
-                (
-                        direction
-                        for direction, angle_range in cardinal_directions.items()
-                        if facing in angle_range
-                ),
-                "Invalid angle",
-        )
+        if isinstance(facing, float):
+            facing = math.degrees(facing)
+        if isinstance(facing, (int, float)) and facing == facing:
+            self._facing = _FACING_TABLE[int(facing) % 360]
+        else:
+            self._facing = "Invalid angle"
         
 
 class GridEntity(AbstractGridEntity):
+    __slots__ = ()
     _base_move_action = {None: {'direction': None, 'from': None, 'to': None}}
     """A class for an The GridEntity is a subclass of LogicalEntity and is assumed to exist on a grid, and
     has a position, a name, and a scale. The scale is used to determine the size of the entity
@@ -246,25 +375,119 @@ class GridEntity(AbstractGridEntity):
             grid: _Optional[Grid] = None,
             name: _Optional[str] = None,
             parent: _Optional[object] = None,
-            *arg, **kwargs
+            *arg,
+            cell: _Optional[object] = None,
+            **kwargs
     ):
         super(GridEntity, self).__init__(name)
         self.parent = parent
         self.grid = grid
-        init_cell = self.grid.random_cell(attr=('passable', True))
+        init_cell = cell if cell is not None else self.grid.random_cell(attr=('passable', True))
         self.cell = init_cell
-        self.cell_history = []
+        self._reset_history()
         self.last_cell = None
         self._width =  self.grid.cell_size*0.8
         self._height = self.grid.cell_size*0.8
-        self._path = []
+        self._path = _EMPTY_PATH
         self._speed = parent.speed if parent is not None else 5
         self._movements_remaining = self.speed // 5
-        self._actions = {'move': {None:{}}}
-        self._action_history = []
         self.traveling = False
         self.occupy(self.cell)
 
+    def reinit(
+            self,
+            grid: _Optional[Grid] = None,
+            name: _Optional[str] = None,
+            parent: _Optional[object] = None,
+            *arg,
+            cell: _Optional[object] = None,
+            **kwargs
+    ):
+        """Initializes a recycled entity as __init__ does, on `cell` or a random passable cell of `grid`
+        (by default the grid it was on). Fields are set directly, so nothing is logged, marked dirty or
+        dispatched, and the cell history of the entity's previous life is emptied and reused."""
+        grid = grid if grid is not None else self._grid
+        self._grid = grid
+        self._name = name if name is not None else _intern(self.__class__.__name__.lower())
+        self._parent = parent
+        self._cell = cell if cell is not None else grid.random_cell(attr=('passable', True))
+        self._last_cell = None
+        self._reset_history()
+        self._width = self._height = grid.cell_size*0.8
+        self._path = _EMPTY_PATH
+        self._flow_field = None
+        self._speed = parent.speed if parent is not None else 5
+        self._move_energy = None
+        self._movements = None
+        self._movements_remaining = self._speed // 5
+        self._turn = 0
+        self._turn_moves = 0
+        self._is_turn = None
+        self._blocked_ticks = 0
+        self._vision = None
+        self._facing = None
+        self.traveling = False
+        self._claim()
+
+    def _retire(self):
+        """Leaves the entity's cell and flow field without dispatching events, then retires it."""
+        self._release_flow()
+        if self.cell is not None:
+            self._leave()
+        super()._retire()
+
+    @classmethod
+    def spawn_many(
+            cls,
+            grid: Grid,
+            count: int,
+            name: _Optional[str] = None,
+            parent: _Optional[object] = None,
+            rng: _Optional[_random.Random] = None,
+    ) -> list:
+        """Creates `count` entities on distinct free passable cells of a grid and returns them.
+
+        The free passable cells are collected once and sampled without replacement, so no two entities
+        share a cell and no sample is retried. The entities are built and occupy their cells in one pass
+        without running __init__ or dispatching on_occupy, as snapshot restores do, and a single
+        ``on_create(entities)`` is dispatched to the class handlers. Requires ``grid.cells``.
+        """
+        cells = grid.cells
+        free = [
+                cell for cell in (cells.values() if hasattr(cells, 'values') else cells)
+                if cell.passable and not cell.occupied
+        ]
+        if count > len(free):
+            raise ValueError(f'Cannot spawn {count} entities on {len(free)} free passable cells.')
+        chosen = (rng or _random).sample(free, count)
+        name = name if name is not None else _intern(cls.__name__.lower())
+        speed = parent.speed if parent is not None else 5
+        size = grid.cell_size*0.8
+        spatial_index = cls._spatial_index
+        track = cls._changes is not None
+        entities = []
+        for cell in chosen:
+            entity = cls.__new__(cls)
+            entity._name = name
+            entity._parent = parent
+            entity._grid = grid
+            entity._cell = cell
+            entity.cell_history = ()
+            entity._width = size
+            entity._height = size
+            entity._path = _EMPTY_PATH
+            entity._speed = speed
+            entity._movements_remaining = speed // 5
+            cell.recv_occupant(entity)
+            if spatial_index is not None:
+                spatial_index.insert(entity, cell)
+            if track:
+                entity._mark_dirty('cell')
+            entities.append(entity)
+        if entities:
+            cls.dispatcher.dispatch_class_event(cls, 'on_create', entities)
+        return entities
+
     @property
     def speed(self):
         return self._speed
@@ -273,35 +496,200 @@ class GridEntity(AbstractGridEntity):
     def speed(self, value):
         self._speed = value
         self._move_energy = value
+        self._mark_dirty('speed')
+        self._mark_dirty('move_energy')
         
     def end_turn(self):
-        self._action_history.append(self.actions)
         self.move_energy = self.speed - abs(self.move_energy) if self.move_energy < 0 else self.speed
-        self.actions = {'move': {None:{}}}
+        self._turn += 1
+        self._turn_moves = 0
 
     def get_path_to(self, destination: object):
+        if self._path_cache is not None:
+            return self._path_cache.get_path(self.grid, self.cell_name, destination)
         return self.grid.get_path(self.cell_name, destination)
 
     def slice_path(self, path):
-        return [path[i:i + self.movements] for i in range(0, len(path), self.movements)]
+        """Lazily yields one turn's movements of a path at a time, without copying the path."""
+        if not isinstance(path, PathCursor):
+            path = PathCursor(path)
+        return path.chunks(self.movements)
         
     def set_path_to(self, destination: object):
+        if self._flow_fields is not None:
+            return self.set_flow_to(destination)
+        if self._path_planner is not None:
+            return self._path_planner.plan(self, destination)
+        self._release_flow()
         self.path = self.get_path_to(destination)
-        if len(self.path) > self.movements:
-            self.movement_queue = list(self.slice_path(self.path))
-        else:
-            self.movement_queue = list(self.path)
         self.traveling = True
     
-    def vacate(self):
-        self.cell.recv_occupant(self)
+    def set_flow_to(self, destination: object, flow_fields: _Optional[FlowFieldCache] = None):
+        """Follows the shared flow field toward the destination instead of storing a path."""
+        flow_fields = flow_fields if flow_fields is not None else self._flow_fields
+        self._release_flow()
+        self._flow_field = flow_fields.acquire(self.grid, destination)
+        self.path = PathCursor()
+        self.traveling = True
+
+    def _release_flow(self):
+        """Stops following the current flow field."""
+        field = self._flow_field
+        if field is not None:
+            self._flow_field = None
+            self._mark_dirty('path')
+            if field.cache is not None:
+                field.cache.release(field)
+
+    def _next_flow_step(self):
+        """Returns the next cell on the flow field, acquiring a rebuilt field if the current one is stale."""
+        field = self._flow_field
+        if field.stale and field.cache is not None:
+            cache = field.cache
+            cache.release(field)
+            field = self._flow_field = cache.acquire(self.grid, field.destination)
+        return field.next_step(self.cell)
+
+    def _move_in_flow(self, steps=None):
+        moved = 0
+        for _ in range(steps if steps is not None else self.movements):
+            cell = self._next_flow_step()
+            if cell is None:
+                break
+            if self.move(cell) is None:
+                if cell.occupied:
+                    self._block(cell, moved)
+                break
+            moved += 1
+        if moved:
+            self._unblock()
+        if self._flow_field is not None and self._next_flow_step() is None:
+            self._release_flow()
+            self.traveling = False
+
+    @property
+    def destination(self):
+        """Returns the last cell of the entity's path or the destination of its flow field, if any."""
+        if self._flow_field is not None:
+            return self._flow_field.destination
+        return self._path[-1] if self._path else None
+
+    @classmethod
+    def use_patience(cls, ticks: int):
+        """Sets how many ticks in a row entities of the class wait for an occupied cell on their way
+        before they stop traveling."""
+        cls._patience = ticks
+
+    def stop(self):
+        """Stops traveling, dropping the entity's path or flow field."""
+        self._release_flow()
+        self.path = _EMPTY_PATH
+        self.traveling = False
+        self._unblock()
+
+    def _block(self, cell: object, moved: int = 0):
+        """Handles a move refused because another entity occupies a cell, by the same rule whether a world
+        step or move_in_path drives the entity: it stops if the cell is its destination or once it has gone
+        more than `_patience` ticks in a row without moving, and otherwise waits for the cell to free up."""
+        if moved:
+            self._unblock()
+        else:
+            self._blocked_ticks += 1
+            self._mark_dirty('blocked_ticks')
+        if cell is self.destination or self._blocked_ticks > self._patience:
+            self.stop()
+
+    def _unblock(self):
+        """Resets the count of ticks the entity has waited for an occupied cell."""
+        if self._blocked_ticks:
+            self._blocked_ticks = 0
+            self._mark_dirty('blocked_ticks')
+
+    def _leave(self):
+        """Leave the current cell without dispatching an event and return the cell that was left."""
+        cell = self.cell
+        cell.recv_occupant(self)
         self.cell = None
+        if self._spatial_index is not None:
+            self._spatial_index.remove(self)
+        return cell
 
-    def occupy(self, cell_to_occupy: object = None):
+    def _enter(self, cell_to_occupy: object = None):
+        """Enter a cell without dispatching an event and return the cell that is occupied."""
         if self.cell is None and not cell_to_occupy.occupied or self.last_cell is not None:
             self.cell = cell_to_occupy
         self.cell.recv_occupant(self)
-        self._push_handlers(on_vacate=self.cell.recv_occupant, on_occupy=self.cell.recv_occupant)
+        if self._spatial_index is not None:
+            self._spatial_index.insert(self, self.cell)
+        return self.cell
+
+    def _claim(self):
+        """Occupy the entity's cell if no other entity holds it, without dispatching an event."""
+        cell = self.cell
+        if cell is None:
+            return
+        if not cell.occupied:
+            cell.recv_occupant(self)
+        if self._spatial_index is not None:
+            self._spatial_index.insert(self, cell)
+
+    @property
+    def neighbor_table(self) -> NeighborTable:
+        """Returns the table of directions between adjacent cells of the entity's grid."""
+        return NeighborTable.for_grid(self._grid)
+
+    def _record_move(self, cell_from: object, cell_to: object, direction: _Optional[Direction] = None):
+        """Record a move between adjacent cells in the entity's actions and return its index."""
+        if direction is None:
+            direction = NeighborTable.for_grid(self._grid).direction(cell_from, cell_to)
+        return self._log_move(direction, cell_from.designation, cell_to.designation)
+
+    def _log_move(self, direction: int, cell_from: str, cell_to: str):
+        """Append a move of the current turn to the action log and return its index."""
+        index = self._turn_moves
+        self._action_log.record(self._id, self._turn, index, direction, cell_from, cell_to)
+        self._turn_moves = index + 1
+        return index
+
+    @classmethod
+    def _restore(cls, state: dict):
+        """Rebuild a grid entity from snapshot state, occupying its cell without dispatching events."""
+        entity = super()._restore(state)
+        grid = state['grid']
+        entity._grid = grid
+        entity.cell_history = ()
+        entity._width = grid.cell_size*0.8
+        entity._height = grid.cell_size*0.8
+        entity._path = PathCursor(state['path']) if state['path'] else _EMPTY_PATH
+        entity._speed = state['speed']
+        entity._move_energy = state['move_energy']
+        entity._movements_remaining = state['movements_remaining']
+        entity.traveling = state['traveling']
+        entity._blocked_ticks = state.get('blocked_ticks', 0)
+        entity._cell = state['cell']
+        entity._claim()
+        if state['flow_destination'] is not None and cls._flow_fields is not None:
+            entity.set_flow_to(state['flow_destination'])
+        return entity
+
+    def delete(self):
+        """Deletes the entity, leaving its cell and releasing its flow field first."""
+        self._release_flow()
+        if self.cell is not None:
+            self._leave()
+        super().delete()
+
+    def vacate(self):
+        cell = self._leave()
+        self._dispatch_event('on_vacate', self, cell)
+
+    def occupy(self, cell_to_occupy: object = None):
+        cell = self._enter(cell_to_occupy)
+        self._dispatch_event('on_occupy', self, cell)
+
+    def neighbors_within(self, radius: float) -> list:
+        """Returns the other entities within a radius of the entity's cell, using the spatial index."""
+        return self._spatial_index.entities_within(self.cell, radius, exclude=self)
 
     def check_destination(self, cell_to_move_to: object = None):
         if cell_to_move_to is not None:
@@ -312,23 +700,19 @@ class GridEntity(AbstractGridEntity):
             print('No energy remaining.')
             return None
         if self.move_energy < self.cell.cost_out:
-            print(f'Not enough energy to move out of cell {cell.designation}.')
+            print(f'Not enough energy to move out of cell {self.cell.designation}.')
             return None
         elif self.move_energy < cell_to_move_to.cost_in:
-            print(f'Not enough energy to move into cell {cell.designation}.')
+            print(f'Not enough energy to move into cell {cell_to_move_to.designation}.')
             return None
         elif self.move_energy < self.cell.cost_out + cell_to_move_to.cost_in:
             print(f'Not enough energy to complete move from cell {self.cell.designation} to cell {cell_to_move_to.designation}.')
             return None
-        # idx = self.cell.adjacent.index([getattr(self.cell, f'{direction}') for direction in list(_DIRECTION_MAP.values()) if getattr(self.cell, f'{direction}') is cell_to_move_to][0].designation)
-        if cell_to_move_to in [self.grid[cell] for cell in self.cell.adjacent]:
-            if list(self.actions['move'].keys()) == [None]:
-                mvmnt_index = 0
-                self.actions['move'].update({0: {'direction': f'{list(_DIRECTION_MAP.keys())[self.cell.adjacent.index(cell_to_move_to.designation)]}', 'from': f'{self.cell.designation}', 'to': f'{cell_to_move_to.designation}'}})
-                del self.actions['move'][None]
-            else:
-                mvmnt_index = len(list(self.actions['move'].keys()))
-                self.actions['move'].update({mvmnt_index: {'direction': f'{list(_DIRECTION_MAP.keys())[self.cell.adjacent.index(cell_to_move_to.designation)]}', 'from': f'{self.cell.designation}', 'to': f'{cell_to_move_to.designation}'}})
+        direction = NeighborTable.for_grid(self._grid).direction(self.cell, cell_to_move_to)
+        if cell_to_move_to.occupied:
+            return None
+        if direction is not None:
+            mvmnt_index = self._record_move(self.cell, cell_to_move_to, direction)
         elif not cell_to_move_to.passable:
             print('Cell impassable')
             return
@@ -345,36 +729,49 @@ class GridEntity(AbstractGridEntity):
         return mvmnt_index
 
     def move_in_path(self, steps = None):
-        if self.movement_queue != [] and self.traveling:
-            cells = self.movement_queue.pop(0)
-            self.path = self.path[len(cells):]
+        if self._flow_field is not None:
+            return self._move_in_flow(steps)
+        if not self.path:
+            return
+        if self.traveling:
+            count = self.movements
         elif steps is not None:
             if steps <= self._movements_remaining:
-                cells = self.path[:steps]
-                self.path = self.path[steps:]
-            elif steps < len(self.path):
-                cells = self.path[:self._movements_remaining]
-                self.path = self.path[self._movements_remaining:]
-                self.movement_queue = [self.path[i:i + self.movements] for i in range(0, len(self.path), self.movements)][:steps]
+                count = steps
+            else:
+                count = self._movements_remaining
                 self.traveling = True
-
-            
-        for cell in cells:
-            self.move(cell)               
+        else:
+            return
+        path = self.path
+        moved = 0
+        # The cursor only advances past cells actually entered, so a refused move is retried next time.
+        for _ in range(int(count)):
+            cell = path.peek()
+            if cell is None:
+                break
+            if self.move(cell) is None:
+                if cell.occupied:
+                    self._block(cell, moved)
+                break
+            path.advance()
+            moved += 1
+        if moved:
+            self._unblock()
 
     def move_in_direction(self, direction):
-        direction = _DIRECTION_MAP[direction] if direction not in _DIRECTION_MAP.values() else direction
-        destination = getattr(self.cell, direction)
+        destination = getattr(self.cell, _DIRECTION_ATTRIBUTES[direction])
         if destination is not None:
             return self.move(destination)
 
     def refresh(self, dt):
         if self._movements_remaining > 0 and self.traveling:
             self.move_in_path()
-        elif not self.path:
+        if not self.path and self._flow_field is None:
             self.traveling = False
-            self.movement_queue = []
                         
     def draw(self):
-        pyglet.shapes.Rectangle(self.x, self.y, self.width, self.height, color=(255, 0, 0), batch=self.scene.main_batch)
+        """Shows the entity in its scene's main batch. The entity's rectangle is created on the first call
+        and then follows the entity, so later calls do nothing."""
+        GridRenderer.for_batch(self.scene.main_batch).show(self)
  
\ No newline at end of file
@@ -0,0 +1,117 @@
+from __future__ import annotations as _annotations
+
+from ._entity import VisualEntity
+
+from typing import Iterable as _Iterable, Optional as _Optional
+
+# The changed fields that mean an entity has moved.
+_POSITION_FIELDS = frozenset(('position', 'x', 'y', 'cell'))
+
+
+def _position(entity) -> _Optional[tuple]:
+    """Return the (x, y) position of an entity, or None if it has none."""
+    if isinstance(entity, VisualEntity):
+        return (entity._x, entity._y) if entity._x is not None and entity._y is not None else None
+    cell = getattr(entity, 'cell', None)
+    return (entity.x, entity.y) if cell is not None else None
+
+
+class Hierarchy:
+    """Moves the descendants of entities along with them, and passes inherited fields down to them, in
+    one pass per tick.
+
+    The hierarchy remembers the last position it saw for every entity. Given the entities that changed
+    during a tick, it computes how far each of them moved since then and adds that offset to the
+    position of every visual descendant, so a subtree follows its root and any moved entity within it
+    without one call per child. The fields named in `inherit`, such as ``speed``, that changed on an
+    entity are set to the entity's new value on every descendant that has them. Attached to a world, it
+    propagates the entities reported by the world's ``on_update`` event at the end of every step.
+    """
+
+    def __init__(self, inherit: _Iterable[str] = ()):
+        self.world = None
+        self.inherit = frozenset(inherit)
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._positions)
+
+    def track(self, entities: _Iterable):
+        """Remember the current positions of entities, so their next move is measured from here."""
+        positions = self._positions
+        for entity in entities:
+            position = _position(entity)
+            if position is None:
+                positions.pop(entity._id, None)
+            else:
+                positions[entity._id] = position
+
+    def forget(self, entity):
+        """Stop remembering the position of an entity."""
+        self._positions.pop(entity._id, None)
+
+    def propagate(self, entities: _Iterable, fields: _Optional[_Iterable] = None) -> int:
+        """Move the descendants of the entities that moved since they were last seen, set the inherited
+        fields that changed on the entities on their descendants, and return the number of descendants
+        changed.
+
+        `fields` holds the names of the changed fields of each entity, as the world's ``on_update`` does;
+        without it only moves are propagated.
+        """
+        entities = list(entities)
+        positions = self._positions
+        offsets = []
+        moved = {}
+        updated = {}
+        if fields is not None and self.inherit:
+            for entity, changed in zip(entities, fields):
+                names = self.inherit.intersection(changed)
+                if names and entity._children:
+                    values = [(name, getattr(entity, name)) for name in sorted(names)]
+                    for descendant in entity.descendants():
+                        for name, value in values:
+                            if hasattr(descendant, name):
+                                setattr(descendant, name, value)
+                                updated[descendant._id] = descendant
+        for entity in entities:
+            position = _position(entity)
+            previous = positions.get(entity._id)
+            if position is None:
+                positions.pop(entity._id, None)
+                continue
+            positions[entity._id] = position
+            if previous is not None and previous != position and entity._children:
+                offsets.append((entity, position[0] - previous[0], position[1] - previous[1]))
+        for entity, dx, dy in offsets:
+            for descendant in entity.descendants():
+                if isinstance(descendant, VisualEntity) and descendant._x is not None:
+                    descendant.position = (descendant._y + dy, descendant._x + dx)
+                    moved[descendant._id] = descendant
+        # The descendants were moved by the hierarchy, so their new positions are not moves of their own.
+        self.track(moved.values())
+        return len(moved.keys() | updated.keys())
+
+    def attach(self, world):
+        """Propagate the moves of a world's entities at the end of every step."""
+        self.detach()
+        self.world = world
+        self.track(world)
+        world.push_handlers(on_add=self.on_add, on_remove=self.on_remove, on_update=self.on_update)
+
+    def detach(self):
+        """Stop propagating the moves of the attached world."""
+        if self.world is not None:
+            self.world.remove_handlers(on_add=self.on_add, on_remove=self.on_remove, on_update=self.on_update)
+            self.world = None
+
+    def on_add(self, entity):
+        self.track((entity,))
+
+    def on_remove(self, entity):
+        self.forget(entity)
+
+    def on_update(self, entities, fields):
+        watched = _POSITION_FIELDS | self.inherit
+        changes = [(entity, changed) for entity, changed in zip(entities, fields) if not changed.isdisjoint(watched)]
+        if changes:
+            self.propagate(*zip(*changes))
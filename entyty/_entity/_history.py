@@ -0,0 +1,128 @@
+from __future__ import annotations as _annotations
+
+from collections.abc import Sequence as _Sequence
+
+from typing import Callable as _Callable, Iterator as _Iterator, Optional as _Optional
+
+
+class CellHistory(_Sequence):
+    """The cells an entity has left, oldest first, optionally bounded.
+
+    With a `maxlen` the history is a ring buffer: once full, each new cell overwrites the oldest one,
+    which is passed to `spill` first if one is set. The most recent cell, the last N cells and any
+    indexed cell are read in O(1) per cell whether or not the buffer has wrapped.
+    """
+    __slots__ = ('_cells', '_start', 'maxlen', 'spill', 'owner', 'dropped')
+
+    def __init__(self, cells=(), maxlen: _Optional[int] = None, spill: _Optional[_Callable] = None,
+                 owner: _Optional[object] = None):
+        self._cells = []
+        self._start = 0
+        self.maxlen = maxlen
+        self.spill = spill
+        self.owner = owner
+        self.dropped = 0
+        for cell in cells:
+            self.append(cell)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __bool__(self):
+        return bool(self._cells)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._cells)))]
+        size = len(self._cells)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('cell history index out of range')
+        return self._cells[(self._start + index) % size]
+
+    def __iter__(self) -> _Iterator:
+        cells = self._cells
+        yield from cells[self._start:]
+        yield from cells[:self._start]
+
+    def __eq__(self, other):
+        if isinstance(other, (CellHistory, list, tuple)):
+            return len(self) == len(other) and all(a is b or a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f'CellHistory({list(self)!r}, maxlen={self.maxlen!r})'
+
+    @property
+    def total(self) -> int:
+        """Return the number of cells ever appended, including those dropped from a bounded history."""
+        return self.dropped + len(self._cells)
+
+    @property
+    def last(self):
+        """Return the most recently left cell, or None if the history is empty."""
+        cells = self._cells
+        return cells[self._start - 1] if cells else None
+
+    def last_n(self, count: int) -> list:
+        """Return up to `count` of the most recently left cells, oldest first."""
+        return self[max(len(self._cells) - count, 0):] if count > 0 else []
+
+    def append(self, cell):
+        """Append a cell, dropping the oldest one if the history is full."""
+        cells = self._cells
+        if self.maxlen is None or len(cells) < self.maxlen:
+            cells.append(cell)
+            return
+        if not self.maxlen:
+            evicted = cell
+        else:
+            evicted = cells[self._start]
+            cells[self._start] = cell
+            self._start = (self._start + 1) % self.maxlen
+        self.dropped += 1
+        if self.spill is not None:
+            self.spill(self.owner, evicted)
+
+    def clear(self):
+        """Remove every cell from the history."""
+        self._cells = []
+        self._start = 0
+
+
+class HistorySpill:
+    """Appends the cells dropped from bounded cell histories to a text file, keeping the full history
+    on disk while only the most recent cells stay in memory.
+
+    Each line holds the ``entity_id`` of the entity and the designation of the cell it left.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __call__(self, entity, cell):
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        self._file.write(f'{entity.entity_id} {cell.designation}\n')
+
+    def flush(self):
+        """Write buffered lines to the file."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Close the file. It is reopened if another cell is spilled."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read(self, entity_id: str) -> list:
+        """Return the designations of the cells spilled for an entity, oldest first."""
+        self.flush()
+        try:
+            with open(self.path) as file:
+                return [line.split(' ', 1)[1].rstrip('\n') for line in file if line.startswith(entity_id)]
+        except FileNotFoundError:
+            return []
@@ -0,0 +1,198 @@
+from __future__ import annotations as _annotations
+
+from functools import wraps as _wraps
+
+from time import perf_counter_ns as _perf_counter_ns
+
+# The methods timed on every entity class that defines them.
+METHODS = ('update', 'refresh', 'move', 'occupy', 'vacate', 'get_path_to', '_dispatch_event')
+
+# The phases of a world step, which resolves movement on columns rather than through entity methods.
+STEP_METHODS = ('_move', '_dispatch_moves', 'flush_changes', 'update')
+
+_PROMETHEUS = (
+        ('calls_total', 'counter', 'Calls of instrumented methods.', 0, 1),
+        ('seconds_total', 'counter', 'Seconds spent in instrumented methods.', 1, 1e-9),
+        ('max_seconds', 'gauge', 'Longest single call of instrumented methods.', 2, 1e-9),
+)
+
+
+def _subclasses(cls):
+    yield cls
+    for subclass in cls.__subclasses__():
+        yield from _subclasses(subclass)
+
+
+def _merge(into: dict, counters: dict):
+    for key, (calls, elapsed, longest) in counters.items():
+        record = into.get(key)
+        if record is None:
+            into[key] = [calls, elapsed, longest]
+        else:
+            record[0] += calls
+            record[1] += elapsed
+            record[2] = max(record[2], longest)
+
+
+class Instrumentation:
+    """Counts and times calls of the entity methods a tick spends its time in.
+
+    ``enable`` replaces the methods named in `METHODS` on every entity class that defines them, and
+    those named in `STEP_METHODS` on the world and the registry, with wrappers that add the call and its
+    duration to a counter keyed by the method and the class of the object it was called on.
+    ``disable`` puts the original methods back, so instrumentation costs nothing while it is off.
+    ``tick`` closes the counters of a tick; attached to a world it is called after every step. Counters
+    are read with ``snapshot`` or as Prometheus text with ``prometheus``.
+    """
+    _enabled = None
+
+    def __init__(self, prefix: str = 'entyty'):
+        self.prefix = prefix
+        self.ticks = 0
+        self.world = None
+        self._current = {}
+        self._last = {}
+        self._total = {}
+        self._patched = []
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if the instrumented methods are currently wrapped by this instrumentation."""
+        return Instrumentation._enabled is self
+
+    def enable(self):
+        """Wrap the instrumented methods of the entity classes that exist now, the world and the registry."""
+        if self.enabled:
+            return
+        if Instrumentation._enabled is not None:
+            raise RuntimeError('Another instrumentation is already enabled.')
+        from ._base_entity import AbstractEntity
+        from ._registry import EntityRegistry
+        from ._world import World
+        targets = [(cls, METHODS) for cls in _subclasses(AbstractEntity)]
+        targets += [(World, STEP_METHODS), (EntityRegistry, STEP_METHODS)]
+        for cls, names in targets:
+            for name in names:
+                func = vars(cls).get(name)
+                if callable(func):
+                    setattr(cls, name, self._wrap(f'{cls.__name__}.{name}', func))
+                    self._patched.append((cls, name, func))
+        Instrumentation._enabled = self
+
+    def disable(self):
+        """Put the original methods back."""
+        if not self.enabled:
+            return
+        for cls, name, func in reversed(self._patched):
+            setattr(cls, name, func)
+        self._patched.clear()
+        Instrumentation._enabled = None
+
+    def _wrap(self, method: str, func):
+        counters = self._current
+
+        @_wraps(func)
+        def wrapper(owner, *args, **kwargs):
+            start = _perf_counter_ns()
+            try:
+                return func(owner, *args, **kwargs)
+            finally:
+                elapsed = _perf_counter_ns() - start
+                key = (method, owner.__class__.__name__)
+                record = counters.get(key)
+                if record is None:
+                    counters[key] = [1, elapsed, elapsed]
+                else:
+                    record[0] += 1
+                    record[1] += elapsed
+                    if elapsed > record[2]:
+                        record[2] = elapsed
+        return wrapper
+
+    def tick(self) -> list:
+        """Close the counters of the current tick and return them as ``snapshot`` does."""
+        self._last = {key: list(record) for key, record in self._current.items()}
+        _merge(self._total, self._current)
+        self._current.clear()
+        self.ticks += 1
+        return self._records(self._last)
+
+    def reset(self):
+        """Drop every counter."""
+        self._current.clear()
+        self._last = {}
+        self._total = {}
+        self.ticks = 0
+
+    @staticmethod
+    def _records(counters: dict) -> list:
+        return [
+                {
+                        'method':      method,
+                        'class':       cls,
+                        'calls':       calls,
+                        'seconds':     elapsed * 1e-9,
+                        'max_seconds': longest * 1e-9,
+                }
+                for (method, cls), (calls, elapsed, longest) in sorted(counters.items())
+        ]
+
+    def _totals(self) -> dict:
+        totals = {key: list(record) for key, record in self._total.items()}
+        _merge(totals, self._current)
+        return totals
+
+    def snapshot(self, scope: str = 'total') -> list:
+        """Return the counters of the last closed tick (`scope` 'tick'), of the tick in progress
+        ('current') or of every call since the last reset ('total'), one dict per method and class."""
+        if scope == 'tick':
+            return self._records(self._last)
+        if scope == 'current':
+            return self._records(self._current)
+        if scope == 'total':
+            return self._records(self._totals())
+        raise ValueError(f'Unknown scope "{scope}"')
+
+    def prometheus(self) -> str:
+        """Return the counters since the last reset, and those of the last tick, in Prometheus text format."""
+        lines = []
+        for scope, counters in (('', self._totals()), ('last_tick_', self._last)):
+            for name, kind, help_text, index, scale in _PROMETHEUS:
+                metric = f'{self.prefix}_{scope}{name}'
+                if scope:
+                    kind = 'gauge'
+                    help_text = f'{help_text[:-1]}, in the last tick.'
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} {kind}')
+                for (method, cls), record in sorted(counters.items()):
+                    value = record[index] * scale
+                    lines.append(f'{metric}{{method="{method}",class="{cls}"}} {value:.9g}')
+        lines.append(f'# HELP {self.prefix}_ticks_total Ticks closed by the instrumentation.')
+        lines.append(f'# TYPE {self.prefix}_ticks_total counter')
+        lines.append(f'{self.prefix}_ticks_total {self.ticks}')
+        return '\n'.join(lines) + '\n'
+
+    def attach(self, world):
+        """Enable the instrumentation and close a tick after every step of a world."""
+        self.detach()
+        self.enable()
+        self.world = world
+        world.push_handlers(on_step=self.on_step)
+
+    def detach(self, disable: bool = True):
+        """Stop closing ticks on the steps of the attached world, and disable the instrumentation."""
+        if self.world is not None:
+            self.world.remove_handlers(on_step=self.on_step)
+            self.world = None
+        if disable:
+            self.disable()
+
+    def on_step(self, dt):
+        self.tick()
@@ -0,0 +1,273 @@
+from __future__ import annotations as _annotations
+
+from ._snapshot import Snapshot, _class_path, _load_class
+from ._world import World
+
+from typing import Optional as _Optional
+
+import json as _json
+import os as _os
+
+
+# The fields recorded as updates, and the attributes they are read from.
+_FIELDS = {
+        'name':                '_name',
+        'age':                 '_age',
+        'speed':               '_speed',
+        'move_energy':         '_move_energy',
+        'movements_remaining': '_movements_remaining',
+        'blocked_ticks':       '_blocked_ticks',
+}
+
+
+class Journal:
+    """An append-only journal of the changes made to the entities of a world.
+
+    Once attached to a world, the journal records a delta for every entity added or removed and every
+    world step, and, from the changes the world reports once per step with ``on_update``, the current
+    cell, fields and route of every entity that changed. However often an entity was written during a
+    tick, it is recorded once with its values at the end of the tick. Records are buffered in memory and appended to the journal file by
+    ``checkpoint``, so the cost of a checkpoint depends on the number of changes since the last one
+    rather than on the size of the world. ``compact`` folds the journal into a base ``Snapshot`` and
+    truncates it, and ``replay`` rebuilds the world from the base snapshot and the journal.
+
+    Records are JSON arrays, one per line, whose first two items are the kind of record and the
+    ``entity_id`` of the entity it concerns:
+
+        ["create", entity_id, class, fields]
+        ["delete", entity_id]
+        ["cell", entity_id, designation or null]
+        ["update", entity_id, field, value]
+        ["route", entity_id, [designation, ...], flow destination or null, traveling]
+        ["step", tick]
+
+    A route is recorded when an entity's path or flow field changes, with the cells still ahead of the
+    entity. Replay walks it forward to each cell the entity is recorded in. The ticks an entity has waited
+    for an occupied cell are recorded as a ``blocked_ticks`` update, so a replayed entity gives up on its
+    route when the live one would. A step ages every entity and refills the energy of every entity with a
+    speed, which replay repeats for all of them, so only the entities changed otherwise are recorded.
+    """
+
+    def __init__(self, path: str, base: _Optional[str] = None, compact_every: _Optional[int] = None):
+        self.path = path
+        self.base = base if base is not None else f'{path}.base'
+        self.compact_every = compact_every
+        self.world = None
+        self.written = 0
+        self._pending = []
+        self._tick = None
+
+    def __len__(self):
+        """Return the number of records since the journal was last compacted."""
+        return self.written + len(self._pending)
+
+    @property
+    def pending(self) -> int:
+        """Return the number of records not yet written to the journal file."""
+        return len(self._pending)
+
+    def attach(self, world: World):
+        """Start journaling the changes made to the entities of a world.
+
+        The journal is compacted first, so its base snapshot holds the world as it is when attached.
+        """
+        if self.world is not None:
+            self.detach()
+        self.world = world
+        self.compact()
+        world.push_handlers(
+                on_add=self.on_add, on_remove=self.on_remove, on_update=self.on_update, on_step=self.on_step
+        )
+
+    def detach(self):
+        """Stop journaling the attached world."""
+        if self.world is None:
+            return
+        self.world.remove_handlers(
+                on_add=self.on_add, on_remove=self.on_remove, on_update=self.on_update, on_step=self.on_step
+        )
+        self.world = None
+
+    def on_add(self, entity):
+        cell = getattr(entity, 'cell', None)
+        fields = {
+                'name':                entity.name,
+                'age':                 entity.age,
+                'speed':               getattr(entity, '_speed', None),
+                'move_energy':         getattr(entity, '_move_energy', None),
+                'movements_remaining': getattr(entity, '_movements_remaining', None),
+                'cell':                cell.designation if cell is not None else None,
+                'parent':              entity._parent.entity_id if entity._parent is not None else None,
+        }
+        fields.update(zip(('path', 'flow_destination', 'traveling'), _route(entity)))
+        self._pending.append(['create', entity.entity_id, _class_path(type(entity)), fields])
+
+    def on_remove(self, entity):
+        self._pending.append(['delete', entity.entity_id])
+
+    def on_update(self, entities, fields):
+        # The world reports the changes of a step after resolving it, so the step is recorded first.
+        self._record_step()
+        for entity, changed in zip(entities, fields):
+            if entity in self.world:
+                self._record_changes(entity, changed)
+
+    def on_step(self, dt):
+        self._record_step()
+
+    def _record_step(self):
+        tick = self.world.tick
+        if tick != self._tick:
+            self._tick = tick
+            self._pending.append(['step', tick])
+
+    def _record_changes(self, entity, changed):
+        entity_id = entity.entity_id
+        for field in changed:
+            attr = _FIELDS.get(field)
+            if attr is not None:
+                self._pending.append(['update', entity_id, field, getattr(entity, attr)])
+        if 'parent' in changed:
+            parent = entity._parent
+            self._pending.append(['update', entity_id, 'parent', parent.entity_id if parent is not None else None])
+        if 'cell' in changed:
+            cell = entity.cell
+            self._pending.append(['cell', entity_id, cell.designation if cell is not None else None])
+        if 'path' in changed:
+            self._pending.append(['route', entity_id, *_route(entity)])
+
+    def checkpoint(self) -> int:
+        """Append the pending records to the journal file and return the number written.
+
+        If `compact_every` is set and the journal has grown past that many records, it is compacted.
+        Changes made since the last step are recorded first, as the world reports them only when it steps.
+        """
+        if self.world is not None:
+            for entity in self.world.registry.changes:
+                if entity in self.world:
+                    self._record_changes(entity, entity._dirty)
+        count = len(self._pending)
+        if count:
+            with open(self.path, 'a') as file:
+                file.writelines(f'{_json.dumps(record)}\n' for record in self._pending)
+            self._pending.clear()
+            self.written += count
+        if self.compact_every is not None and self.world is not None and self.written >= self.compact_every:
+            self.compact()
+        return count
+
+    def compact(self, world: _Optional[World] = None):
+        """Write a base snapshot of the world and start a new, empty journal."""
+        world = world if world is not None else self.world
+        temporary = f'{self.base}.tmp'
+        Snapshot.save(temporary, world.entities, world.tick)
+        _os.replace(temporary, self.base)
+        open(self.path, 'w').close()
+        self._pending.clear()
+        self._tick = world.tick
+        self.written = 0
+
+    def records(self):
+        """Yield the records of the journal file followed by the pending records."""
+        if _os.path.exists(self.path):
+            with open(self.path) as file:
+                for line in file:
+                    yield _json.loads(line)
+        yield from self._pending
+
+    def replay(self, grid: _Optional[object] = None) -> World:
+        """Rebuild a world from the base snapshot and the journal."""
+        states, tick = {}, 0
+        if _os.path.exists(self.base):
+            with Snapshot(self.base, grid) as snapshot:
+                tick = snapshot.tick
+                for index in range(len(snapshot)):
+                    state = snapshot.state(index)
+                    states[state['entity_id']] = state
+        for record in self.records():
+            kind = record[0]
+            if kind == 'step':
+                tick = record[1]
+                for state in states.values():
+                    _step(state)
+            elif kind == 'create':
+                _, entity_id, class_path, fields = record
+                state = {
+                        'class': _load_class(class_path), 'entity_id': entity_id, 'path': [],
+                        'flow_destination': None, 'traveling': False, 'grid': grid,
+                }
+                state.update(fields, cell=grid[fields['cell']] if fields['cell'] is not None else None)
+                if 'path' in fields:
+                    _set_route(state, grid, fields['path'], fields['flow_destination'], fields['traveling'])
+                states[entity_id] = state
+            elif kind == 'delete':
+                states.pop(record[1], None)
+            elif kind == 'cell':
+                state = states[record[1]]
+                state['cell'] = grid[record[2]] if record[2] is not None else None
+                if state['cell'] is not None:
+                    _walk(state, state['cell'])
+            elif kind == 'route':
+                _set_route(states[record[1]], grid, *record[2:])
+            elif kind == 'update':
+                _, entity_id, field, value = record
+                states[entity_id][field] = value
+        world = World(grid)
+        for state in states.values():
+            state['path'] = state['path'][state.pop('walked', 0):]
+        entities = {entity_id: state['class']._restore(state) for entity_id, state in states.items()}
+        for entity_id, state in states.items():
+            parent = entities.get(state['parent'])
+            if parent is not None:
+                parent._link(entities[entity_id])
+        for entity in entities.values():
+            world.add(entity)
+            entity._claim()
+        world.tick = tick
+        return world
+
+
+def _step(state: dict):
+    """Apply a world step to the state of an entity, as ``EntityRegistry.update`` does."""
+    state['age'] += 1
+    speed = state.get('speed')
+    if speed is None:
+        return
+    energy = state.get('move_energy')
+    energy = speed if energy is None else energy
+    state['move_energy'] = speed - abs(energy) if energy < 0 else speed
+    state['movements_remaining'] = speed // 5
+
+
+def _route(entity) -> tuple:
+    """Return the designations of the cells ahead of an entity, its flow destination and whether it travels."""
+    path = getattr(entity, 'path', None) or ()
+    field = getattr(entity, '_flow_field', None)
+    return (
+            [cell.designation for cell in path],
+            field.destination.designation if field is not None else None,
+            bool(getattr(entity, 'traveling', False)),
+    )
+
+
+def _set_route(state: dict, grid, path: list, flow_destination: _Optional[str], traveling: bool):
+    """Replace the route of an entity's state with a recorded one."""
+    state['path'] = [grid[designation] for designation in path]
+    state['walked'] = 0
+    state['flow_destination'] = grid[flow_destination] if flow_destination is not None else None
+    state['traveling'] = traveling
+
+
+def _walk(state: dict, cell):
+    """Advance the route of an entity's state past a cell it is in, as the world steps that took it there
+    did."""
+    path, walked = state['path'], state.get('walked', 0)
+    for index in range(walked, len(path)):
+        if path[index] is cell:
+            state['walked'] = index + 1
+            if index + 1 == len(path):
+                state['traveling'] = False
+            return
+    if state['flow_destination'] is cell:
+        state['flow_destination'] = None
+        state['traveling'] = False
@@ -0,0 +1,156 @@
+from __future__ import annotations as _annotations
+
+from typing import Iterable as _Iterable
+
+from weakref import ref as _ref
+
+import numpy as _np
+
+
+class LabelIndex:
+    """An inverted index from labels to the ids of the entities that carry them.
+
+    Label names are interned into a table that gives each one a bit, so an entity stores its labels as
+    a single integer bitmask. The index keeps one bitset per label over the integer entity ids, plus one
+    of every labeled entity, as rows of a NumPy byte matrix, so ``query`` answers AND/OR/NOT questions
+    with a few vectorized passes over the rows involved. An entity leaves the index when it is deleted
+    or garbage collected.
+
+    Entity ids are never reused, even by an ``EntityPool``, which gives a recycled entity a fresh id so
+    that records kept under its old id, such as its moves in the action log, are not carried over. The
+    rows are therefore as wide as the highest id ever allocated, one bit per entity created, and a run
+    that creates millions of entities over its lifetime pays a few hundred kilobytes per label.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._bits = {}
+        self._names = []
+        self._rows = _np.zeros((1, max(int(capacity), 8) >> 3), _np.uint8)
+        self._refs = {}
+
+    def __len__(self):
+        """Return the number of entities with at least one label."""
+        return len(self._refs)
+
+    def __contains__(self, label: str):
+        return label in self._bits
+
+    @property
+    def names(self) -> tuple:
+        """Return the interned label names, in the order of their bits."""
+        return tuple(self._names)
+
+    def bit(self, label: str) -> int:
+        """Return the bit number of a label, interning the label if it is new."""
+        bit = self._bits.get(label)
+        if bit is None:
+            bit = self._bits[label] = len(self._names)
+            self._names.append(label)
+            if bit + 1 >= len(self._rows):
+                rows = _np.zeros((len(self._rows) * 2, self._rows.shape[1]), _np.uint8)
+                rows[:len(self._rows)] = self._rows
+                self._rows = rows
+        return bit
+
+    def _row(self, bit: int) -> _np.ndarray:
+        # Row 0 holds every labeled entity and the row of a label follows it.
+        return self._rows[bit + 1]
+
+    def _reserve(self, entity_id: int):
+        width = self._rows.shape[1]
+        if entity_id >> 3 >= width:
+            while entity_id >> 3 >= width:
+                width *= 2
+            rows = _np.zeros((len(self._rows), width), _np.uint8)
+            rows[:, :self._rows.shape[1]] = self._rows
+            self._rows = rows
+
+    def mask(self, labels: _Iterable[str]) -> int:
+        """Return the bitmask of some labels, interning any that are new. A string is a single label."""
+        if isinstance(labels, str):
+            labels = (labels,)
+        mask = 0
+        for label in labels:
+            mask |= 1 << self.bit(label)
+        return mask
+
+    def labels(self, mask: int) -> tuple:
+        """Return the names of the labels in a bitmask."""
+        return tuple(name for bit, name in enumerate(self._names) if mask >> bit & 1)
+
+    def update(self, entity, old: int, new: int):
+        """Move an entity from the label sets of its old bitmask to those of its new one."""
+        entity_id = entity._id
+        self._reserve(entity_id)
+        byte, flag = entity_id >> 3, 1 << (entity_id & 7)
+        rows = self._rows
+        changed = old ^ new
+        bit = 1
+        while changed:
+            if changed & 1:
+                if new >> (bit - 1) & 1:
+                    rows[bit, byte] |= flag
+                else:
+                    rows[bit, byte] &= ~flag & 0xff
+            changed >>= 1
+            bit += 1
+        if new and entity_id not in self._refs:
+            rows[0, byte] |= flag
+            self._refs[entity_id] = _ref(entity, self._collector(entity_id))
+        elif not new and self._refs.pop(entity_id, None) is not None:
+            rows[0, byte] &= ~flag & 0xff
+
+    def _collector(self, entity_id: int):
+        def collect(_):
+            self._discard(entity_id)
+        return collect
+
+    def _discard(self, entity_id: int):
+        if self._refs.pop(entity_id, None) is not None:
+            self._rows[:, entity_id >> 3] &= ~(1 << (entity_id & 7)) & 0xff
+
+    def discard(self, entity):
+        """Remove an entity from every label set."""
+        self.update(entity, entity._labels, 0)
+
+    def _select(self, labels) -> list:
+        """Return the row numbers of some labels, with None for labels that were never interned."""
+        if isinstance(labels, str):
+            labels = (labels,)
+        return [self._bits[label] + 1 if label in self._bits else None for label in labels]
+
+    def bitset(self, all_of=(), any_of=(), none_of=()) -> _np.ndarray:
+        """Return the bitset of the entities that carry every label of `all_of`, at least one label of
+        `any_of` and no label of `none_of`. The bit of id ``i`` is bit ``i % 8`` of byte ``i // 8``.
+
+        Without `all_of` or `any_of`, the query starts from every labeled entity.
+        """
+        rows = self._rows
+        required = self._select(all_of)
+        if None in required:
+            return _np.zeros(rows.shape[1], _np.uint8)
+        result = _np.bitwise_and.reduce(rows[[0] + required], axis=0)
+        alternatives = [row for row in self._select(any_of) if row is not None]
+        if any_of:
+            result &= _np.bitwise_or.reduce(rows[alternatives], axis=0) if alternatives else 0
+        excluded = [row for row in self._select(none_of) if row is not None]
+        if excluded:
+            result &= ~_np.bitwise_or.reduce(rows[excluded], axis=0)
+        return result
+
+    def query(self, all_of=(), any_of=(), none_of=()) -> _np.ndarray:
+        """Return the sorted ids of the entities matched by ``bitset``."""
+        bits = _np.unpackbits(self.bitset(all_of, any_of, none_of), bitorder='little')
+        return _np.flatnonzero(bits.view(bool))
+
+    def entities(self, all_of=(), any_of=(), none_of=()) -> list:
+        """Return the live entities matched by ``query``, in id order."""
+        refs = self._refs
+        entities = (refs[entity_id]() for entity_id in self.query(all_of, any_of, none_of).tolist())
+        return [entity for entity in entities if entity is not None]
+
+    def count(self, label: str) -> int:
+        """Return the number of entities that carry a label."""
+        if label not in self._bits:
+            return 0
+        return int(_np.unpackbits(self._row(self._bits[label])).sum())
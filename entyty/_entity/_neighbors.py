@@ -0,0 +1,55 @@
+from __future__ import annotations as _annotations
+
+from ._actions import Direction
+
+from typing import Optional as _Optional
+
+from weakref import WeakKeyDictionary as _WeakKeyDictionary
+
+
+class NeighborTable:
+    """The directions between the adjacent cells of a grid, precomputed once per cell.
+
+    Each cell's entry maps the designation of every neighbour to the ``Direction`` of the move into it,
+    so checking that a move is between adjacent cells and finding its direction is a single dict lookup
+    that allocates nothing. Entries are built the first time a cell is looked up; call ``invalidate``
+    if the adjacency of a cell changes.
+    """
+    _tables = _WeakKeyDictionary()
+
+    def __init__(self, grid: object):
+        self.grid = grid
+        self._directions = {}
+
+    def __len__(self):
+        return len(self._directions)
+
+    @classmethod
+    def for_grid(cls, grid: object) -> NeighborTable:
+        """Return the table of a grid, creating it on first use."""
+        table = cls._tables.get(grid)
+        if table is None:
+            table = cls._tables[grid] = cls(grid)
+        return table
+
+    def directions(self, cell: object) -> dict:
+        """Return a cell's neighbours as {designation: Direction}."""
+        directions = self._directions.get(cell.designation)
+        if directions is None:
+            directions = self._directions[cell.designation] = {
+                    designation: direction
+                    for direction, designation in zip(Direction, cell.adjacent)
+                    if designation is not None
+            }
+        return directions
+
+    def direction(self, cell_from: object, cell_to: object) -> _Optional[Direction]:
+        """Return the direction of a move between two cells, or None if they are not adjacent."""
+        return self.directions(cell_from).get(cell_to.designation)
+
+    def invalidate(self, cell: _Optional[object] = None):
+        """Drop the entry of a cell, or of every cell, so it is rebuilt on the next lookup."""
+        if cell is None:
+            self._directions.clear()
+        else:
+            self._directions.pop(cell.designation, None)
@@ -0,0 +1,72 @@
+from __future__ import annotations as _annotations
+
+from collections.abc import Sequence as _Sequence
+
+from typing import Iterator as _Iterator, Optional as _Optional
+
+
+class PathCursor(_Sequence):
+    """A read cursor over a path of cells.
+
+    The cursor holds a reference to the cells of the path and the bounds of the part that is still to be
+    walked. Advancing the cursor or slicing it returns another cursor over the same cells instead of
+    copying them, so following a path chunk by chunk costs O(1) per chunk rather than O(len(path)).
+    """
+    __slots__ = ('_cells', '_start', '_stop')
+
+    def __init__(self, cells=(), start: int = 0, stop: _Optional[int] = None):
+        self._cells = cells
+        self._start = start
+        self._stop = len(cells) if stop is None else stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __bool__(self):
+        return self._stop > self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self._cells[self._start + i] for i in range(start, stop, step)]
+            return PathCursor(self._cells, self._start + start, self._start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('path index out of range')
+        return self._cells[self._start + index]
+
+    def __iter__(self) -> _Iterator:
+        # Index from the cursor's start: islice would step through every cell before it on each call.
+        return map(self._cells.__getitem__, range(self._start, self._stop))
+
+    def __eq__(self, other):
+        if isinstance(other, (PathCursor, list, tuple)):
+            return len(self) == len(other) and all(a is b or a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f'PathCursor({list(self)!r})'
+
+    @property
+    def position(self):
+        """Return the number of cells of the underlying path that have been walked."""
+        return self._start
+
+    def peek(self, index: int = 0):
+        """Return a cell ahead of the cursor without advancing, or None past the end of the path."""
+        index += self._start
+        return self._cells[index] if index < self._stop else None
+
+    def advance(self, count: int = 1) -> PathCursor:
+        """Advance the cursor by up to `count` cells and return a cursor over the cells passed."""
+        start = self._start
+        self._start = min(start + max(int(count), 0), self._stop)
+        return PathCursor(self._cells, start, self._start)
+
+    def chunks(self, size: int) -> _Iterator[PathCursor]:
+        """Yield cursors over consecutive `size`-cell chunks of the rest of the path without advancing."""
+        size = max(size, 1)
+        for start in range(self._start, self._stop, size):
+            yield PathCursor(self._cells, start, min(start + size, self._stop))
@@ -0,0 +1,111 @@
+from __future__ import annotations as _annotations
+
+from collections import OrderedDict as _OrderedDict
+
+from typing import Optional as _Optional
+
+import sys as _sys
+
+
+def _designation(cell):
+    """Return the designation of a cell given either a Cell object or a designation."""
+    return getattr(cell, 'designation', cell)
+
+
+class PathCache:
+    """A least-recently-used cache of grid paths keyed on (grid, start, destination, grid revision).
+
+    Paths are stored and handed out as tuples, so a hit shares the cached path instead of copying it. The
+    revision of a grid is the number of times the cache has been told the grid changed, combined with
+    the grid's own ``revision`` attribute when it has one, so grids that count their own passability
+    and cost changes invalidate their cached paths automatically. Call ``invalidate`` after changing the
+    passability or costs of cells on a grid that does not.
+    """
+
+    def __init__(self, maxsize: _Optional[int] = 4096, max_bytes: _Optional[int] = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._bytes = 0
+        self._paths = _OrderedDict()
+        self._revisions = {}
+
+    def __len__(self):
+        return len(self._paths)
+
+    @property
+    def nbytes(self):
+        """Return the estimated number of bytes held by the cached paths."""
+        return self._bytes
+
+    @property
+    def hit_rate(self):
+        """Return the fraction of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def revision(self, grid) -> tuple:
+        """Return the revision of a grid as seen by the cache."""
+        return self._revisions.get(id(grid), 0), getattr(grid, 'revision', None)
+
+    def stats(self) -> dict:
+        """Return the cache counters."""
+        return {
+                'size':          len(self._paths),
+                'bytes':         self._bytes,
+                'hits':          self.hits,
+                'misses':        self.misses,
+                'hit_rate':      self.hit_rate,
+                'evictions':     self.evictions,
+                'invalidations': self.invalidations,
+        }
+
+    def get_path(self, grid, start, destination) -> tuple:
+        """Return the path between two cells of a grid, asking the grid only on a cache miss."""
+        key = (id(grid), _designation(start), _designation(destination), self.revision(grid))
+        path = self._paths.get(key)
+        if path is not None:
+            self.hits += 1
+            self._paths.move_to_end(key)
+            return path
+        self.misses += 1
+        found = grid.get_path(start, destination)
+        if found is not None:
+            found = tuple(found)
+            self._store(key, found)
+        return found
+
+    def _store(self, key, path):
+        size = _sys.getsizeof(path)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._paths[key] = path
+        self._bytes += size
+        while (self.maxsize is not None and len(self._paths) > self.maxsize) or \
+                (self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, evicted = self._paths.popitem(last=False)
+            self._bytes -= _sys.getsizeof(evicted)
+            self.evictions += 1
+
+    def invalidate(self, grid: _Optional[object] = None):
+        """Drop the cached paths of a grid, or of every grid, after cell passability or costs change."""
+        self.invalidations += 1
+        if grid is None:
+            for grid_id in self._revisions:
+                self._revisions[grid_id] += 1
+            self._paths.clear()
+            self._bytes = 0
+            return
+        grid_id = id(grid)
+        self._revisions[grid_id] = self._revisions.get(grid_id, 0) + 1
+        for key in [key for key in self._paths if key[0] == grid_id]:
+            self._bytes -= _sys.getsizeof(self._paths.pop(key))
+
+    def clear(self):
+        """Drop every cached path and reset the counters."""
+        self._paths.clear()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
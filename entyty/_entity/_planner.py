@@ -0,0 +1,310 @@
+from __future__ import annotations as _annotations
+
+from ._path_cache import _designation
+
+from concurrent.futures import Future as _Future, ProcessPoolExecutor as _ProcessPoolExecutor
+
+from heapq import heappush as _heappush, heappop as _heappop
+
+from multiprocessing import shared_memory as _shared_memory
+
+from typing import Callable as _Callable, Optional as _Optional
+
+import math as _math
+import os as _os
+
+import numpy as _np
+
+
+# The arrays a planner copies into shared memory, in order, with their dtypes and items per cell.
+_LAYOUT = (
+        ('passable', _np.uint8, 1),
+        ('cost_in', _np.float64, 1),
+        ('cost_out', _np.float64, 1),
+        ('x', _np.float64, 1),
+        ('y', _np.float64, 1),
+        ('adjacent', _np.int32, 8),
+)
+
+
+def _offsets(count: int) -> tuple:
+    """Return the byte offset of each array of `_LAYOUT` for a grid of `count` cells, and the total size."""
+    offsets, size = {}, 0
+    for name, dtype, width in _LAYOUT:
+        size = -(-size // 8) * 8
+        offsets[name] = size
+        size += _np.dtype(dtype).itemsize * width * count
+    return offsets, size
+
+
+class _Graph:
+    """Read-only views of a planner's arrays, indexed by cell number, for the search."""
+
+    def __init__(self, buffer, count: int, step: float, unit: float):
+        offsets, _ = _offsets(count)
+        self.count = count
+        self.step = step
+        self.unit = unit
+        view = memoryview(buffer)
+        self._view = view
+        for name, dtype, width in _LAYOUT:
+            start = offsets[name]
+            end = start + _np.dtype(dtype).itemsize * width * count
+            setattr(self, name, view[start:end].cast(_np.dtype(dtype).char))
+
+    def release(self):
+        for name, _, _ in _LAYOUT:
+            getattr(self, name).release()
+        self._view.release()
+
+    def search(self, start: int, goal: int) -> list:
+        """Return the cell numbers of the cheapest path from start to goal, excluding start.
+
+        Stepping from a cell into an adjacent passable cell costs the first cell's ``cost_out`` plus the
+        second cell's ``cost_in``, as it does for flow fields. The search is A* with the Chebyshev
+        distance times the cheapest possible step as its heuristic.
+        """
+        if start == goal:
+            return []
+        passable, cost_in, cost_out, adjacent = self.passable, self.cost_in, self.cost_out, self.adjacent
+        xs, ys, step, unit = self.x, self.y, self.step, self.unit
+        gx, gy = xs[goal], ys[goal]
+        cost = {start: 0.0}
+        came_from = {}
+        frontier = [(0.0, start)]
+        while frontier:
+            _, current = _heappop(frontier)
+            if current == goal:
+                path = [goal]
+                while True:
+                    current = came_from[current]
+                    if current == start:
+                        break
+                    path.append(current)
+                path.reverse()
+                return path
+            current_cost = cost[current]
+            leave = cost_out[current]
+            for neighbor in adjacent[current * 8:current * 8 + 8]:
+                if neighbor < 0 or not passable[neighbor]:
+                    continue
+                neighbor_cost = current_cost + leave + cost_in[neighbor]
+                if neighbor_cost < cost.get(neighbor, _math.inf):
+                    cost[neighbor] = neighbor_cost
+                    came_from[neighbor] = current
+                    distance = max(abs(xs[neighbor] - gx), abs(ys[neighbor] - gy)) / unit
+                    _heappush(frontier, (neighbor_cost + distance * step, neighbor))
+        return []
+
+
+_worker_graph = None
+_worker_memory = None
+
+
+def _attach(name: str, count: int, unit: float):
+    """Attach a pool worker to a planner's shared memory."""
+    global _worker_graph, _worker_memory
+    try:
+        _worker_memory = _shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        _worker_memory = _shared_memory.SharedMemory(name=name)
+    _worker_graph = _Graph(_worker_memory.buf, count, 0.0, unit)
+
+
+def _search_batch(pairs: list, step: float) -> list:
+    """Search the paths of a batch of (start, goal) cell numbers in a pool worker."""
+    _worker_graph.step = step
+    search = _worker_graph.search
+    return [search(start, goal) for start, goal in pairs]
+
+
+class PathPlanner:
+    """Plans grid paths on a pool of worker processes that share one copy of the grid.
+
+    The passability, costs, coordinates and adjacency of every cell are copied into shared memory when
+    the planner is created, so workers read the grid without pickling it. Entities ``plan`` paths, the
+    planner sends the requests to the pool in batches with ``submit``, and ``collect`` hands finished
+    paths back on the calling thread, setting each entity's path and resolving the future returned by
+    ``plan``. A planner attached to a world submits and collects on every step.
+
+    With ``workers=0`` the paths are searched in the calling process when they are submitted. Call
+    ``update`` after changing the passability or costs of cells.
+    """
+
+    def __init__(self, grid, workers: _Optional[int] = None, batch_size: int = 64):
+        self.grid = grid
+        self.workers = (_os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = max(int(batch_size), 1)
+        self.world = None
+        cells = grid.cells
+        self._cells = list(cells.values() if hasattr(cells, 'values') else cells)
+        self._numbers = {cell.designation: number for number, cell in enumerate(self._cells)}
+        count = len(self._cells)
+        _, size = _offsets(count)
+        self._memory = _shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._arrays = self._views(self._memory.buf, count)
+        adjacent = self._arrays['adjacent']
+        for number, cell in enumerate(self._cells):
+            adjacent[number] = [
+                    self._numbers[designation] if designation is not None else -1
+                    for designation in (list(cell.adjacent) + [None] * 8)[:8]
+            ]
+        coordinates = _np.array([getattr(cell, 'coordinates', (0, 0)) for cell in self._cells], float)
+        self._arrays['x'][:] = coordinates[:, 0] if count else 0
+        self._arrays['y'][:] = coordinates[:, 1] if count else 0
+        self.update()
+        self._pool = None
+        self._graph = None
+        self._pending = []
+        self._running = []
+        self._latest = {}
+
+    def __len__(self):
+        """Return the number of requests not yet collected."""
+        return len(self._pending) + sum(len(batch) for batch, _ in self._running)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _views(buffer, count: int) -> dict:
+        offsets, _ = _offsets(count)
+        return {
+                name: _np.ndarray((count, width) if width > 1 else count, dtype, buffer, offsets[name])
+                for name, dtype, width in _LAYOUT
+        }
+
+    def update(self, cells: _Optional[list] = None):
+        """Copy the passability and costs of some cells, or of every cell, into shared memory again.
+
+        Workers see the new values from their next search.
+        """
+        arrays = self._arrays
+        if cells is None:
+            numbers = range(len(self._cells))
+        else:
+            numbers = [self._numbers[_designation(cell)] for cell in cells]
+        for number in numbers:
+            cell = self._cells[number]
+            arrays['passable'][number] = bool(cell.passable)
+            arrays['cost_in'][number] = cell.cost_in or 0
+            arrays['cost_out'][number] = cell.cost_out or 0
+        self._step = self._cheapest_step()
+
+    def _cheapest_step(self) -> float:
+        """Return the least a step can cost, which the search multiplies by its distance estimate."""
+        passable = self._arrays['passable'].astype(bool)
+        if not passable.any():
+            return 0.0
+        return float(max(self._arrays['cost_out'][passable].min() + self._arrays['cost_in'][passable].min(), 0))
+
+    def _unit(self) -> float:
+        return float(getattr(self.grid, 'cell_size', 1) or 1)
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = _ProcessPoolExecutor(
+                    self.workers, initializer=_attach,
+                    initargs=(self._memory.name, len(self._cells), self._unit()),
+            )
+        return self._pool
+
+    def start(self):
+        """Start the worker processes now instead of on the first submit."""
+        if self.workers:
+            self._executor().submit(int).result()
+
+    def plan(self, entity, destination, callback: _Optional[_Callable] = None) -> _Future:
+        """Queue a path from an entity's cell to a destination and return a future of its cells.
+
+        When the path is collected it becomes the entity's path and the entity starts traveling, unless
+        a later request for the same entity has replaced it. `callback` is called with the entity and
+        the path.
+        """
+        future = _Future()
+        request = (entity, self._numbers[entity.cell.designation], self._numbers[_designation(destination)],
+                   future, callback)
+        self._latest[entity._id] = future
+        self._pending.append(request)
+        return future
+
+    def submit(self) -> int:
+        """Send the queued requests to the workers in batches and return the number sent."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        if not self.workers:
+            if self._graph is None:
+                self._graph = _Graph(self._memory.buf, len(self._cells), self._step, self._unit())
+            self._graph.step = self._step
+            paths = [self._graph.search(start, goal) for _, start, goal, _, _ in pending]
+            done = _Future()
+            done.set_result(paths)
+            self._running.append((pending, done))
+            return len(pending)
+        size = max(min(self.batch_size, -(-len(pending) // self.workers)), 1)
+        pool = self._executor()
+        for first in range(0, len(pending), size):
+            batch = pending[first:first + size]
+            pairs = [(start, goal) for _, start, goal, _, _ in batch]
+            self._running.append((batch, pool.submit(_search_batch, pairs, self._step)))
+        return len(pending)
+
+    def collect(self, wait: bool = False) -> int:
+        """Hand the finished paths back to their entities and return the number handed back.
+
+        With `wait`, block until every submitted request has finished.
+        """
+        collected = 0
+        running = []
+        for batch, done in self._running:
+            if not (wait or done.done()):
+                running.append((batch, done))
+                continue
+            for (entity, _, _, future, callback), numbers in zip(batch, done.result()):
+                path = [self._cells[number] for number in numbers]
+                if self._latest.get(entity._id) is future:
+                    del self._latest[entity._id]
+                    entity._release_flow()
+                    entity.path = path
+                    entity.traveling = bool(path)
+                    if callback is not None:
+                        callback(entity, path)
+                future.set_result(path)
+                collected += 1
+        self._running = running
+        return collected
+
+    def attach(self, world):
+        """Submit and collect the planned paths at the end of every step of a world."""
+        self.detach()
+        self.world = world
+        world.push_handlers(on_step=self.on_step)
+
+    def detach(self):
+        """Stop planning on the steps of the attached world."""
+        if self.world is not None:
+            self.world.remove_handlers(on_step=self.on_step)
+            self.world = None
+
+    def on_step(self, dt):
+        self.submit()
+        self.collect()
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        self.detach()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self._graph is not None:
+            self._graph.release()
+            self._graph = None
+        if self._memory is not None:
+            self._arrays = None
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
@@ -0,0 +1,76 @@
+from __future__ import annotations as _annotations
+
+
+class EntityPool:
+    """Recycles the instances of an entity class for entities that are created and deleted often.
+
+    ``release`` retires an entity, leaving its cell and running ``delete`` only if the entity has links
+    or listeners to undo, then gives it a fresh id, drops its own event handlers and keeps it, up to
+    `maxsize` entities. ``acquire`` hands a kept entity back through ``reinit``, which for grid entities
+    sets the per-life fields directly and reuses the cell history, and only creates a new entity when the
+    pool is empty. ``hits`` and ``misses`` count the acquisitions that did and did not reuse an entity.
+    """
+
+    def __init__(self, entity_class: type, maxsize: int = 1024):
+        self.entity_class = entity_class
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+        self.discarded = 0
+        self._free = []
+
+    def __len__(self):
+        """Return the number of entities waiting to be reused."""
+        return len(self._free)
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the share of acquisitions that reused an entity."""
+        acquired = self.hits + self.misses
+        return self.hits / acquired if acquired else 0.0
+
+    def stats(self) -> dict:
+        """Return the counters of the pool."""
+        return {
+                'size':      len(self._free),
+                'hits':      self.hits,
+                'misses':    self.misses,
+                'hit_rate':  self.hit_rate,
+                'released':  self.released,
+                'discarded': self.discarded,
+        }
+
+    def acquire(self, *args, **kwargs):
+        """Return an entity initialized with the arguments of the class's constructor, reusing a released
+        entity if there is one."""
+        if self._free:
+            entity = self._free.pop()
+            self.hits += 1
+            entity.reinit(*args, **kwargs)
+            return entity
+        self.misses += 1
+        return self.entity_class(*args, **kwargs)
+
+    def release(self, entity, delete: bool = True):
+        """Retire an entity and keep it for reuse. Pass `delete=False` for an entity already deleted.
+
+        The entity must not be used after it is released, and must have been removed from its world or
+        registry first.
+        """
+        if type(entity) is not self.entity_class:
+            raise TypeError(f'Cannot release a {type(entity).__name__} into a pool of {self.entity_class.__name__}.')
+        if entity._registry is not None:
+            raise ValueError('Remove the entity from its registry before releasing it.')
+        if delete:
+            entity._retire()
+        self.released += 1
+        if len(self._free) >= self.maxsize:
+            self.discarded += 1
+            return
+        entity._recycle()
+        self._free.append(entity)
+
+    def clear(self):
+        """Drop every entity waiting to be reused."""
+        self._free.clear()
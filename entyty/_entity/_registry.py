@@ -0,0 +1,217 @@
+from __future__ import annotations as _annotations
+
+from ._changes import ChangeSet
+
+from typing import Optional as _Optional
+
+import numpy as _np
+
+
+_NULL = {
+        _np.dtype(_np.int64): 0,
+        _np.dtype(_np.float64): _np.nan,
+        _np.dtype(object): None,
+}
+
+
+class Column:
+    """A field of an entity that is stored on the entity itself until the entity is registered with an
+    EntityRegistry, after which reads and writes go to the registry's column for that field.
+
+    The column is named after the attribute it is bound to, without leading underscores, so
+    ``_move_energy = Column()`` is stored in the registry's ``move_energy`` column.
+    """
+
+    def __init__(self, default=None):
+        self.default = default
+        self.name = None
+        self.local = None
+
+    def __set_name__(self, owner, name):
+        self.name = name.lstrip('_')
+        self.local = f'{name}_local'
+
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self.default
+        if entity._registry is not None:
+            return entity._registry.get(self.name, entity._slot)
+        return getattr(entity, self.local, self.default)
+
+    def __set__(self, entity, value):
+        if entity._registry is not None:
+            entity._registry.set(self.name, entity._slot, value)
+        else:
+            setattr(entity, self.local, value)
+
+
+class EntityRegistry:
+    """A columnar store for the per-tick fields of many entities.
+
+    Registered entities keep their usual property API, but their column fields live in NumPy arrays
+    owned by the registry, so ``update`` can advance every entity in one vectorized pass instead of one
+    Python call per entity. The registry also collects the changes of its entities in ``changes``.
+    """
+    columns = {
+            'age':                 _np.int64,
+            'speed':               _np.float64,
+            'move_energy':         _np.float64,
+            'movements_remaining': _np.float64,
+            'turn':                _np.int64,
+            'turn_moves':          _np.int64,
+            'cell':                object,
+    }
+
+    def __init__(self, capacity: _Optional[int] = None):
+        capacity = max(int(capacity or 1024), 1)
+        self._size = 0
+        self._free = []
+        self._entities = [None] * capacity
+        self._alive = _np.zeros(capacity, dtype=bool)
+        self._columns = {name: self._empty(dtype, capacity) for name, dtype in self.columns.items()}
+        self._fields = {}
+        self.changes = ChangeSet()
+
+    def __len__(self):
+        return self._size - len(self._free)
+
+    def __contains__(self, entity):
+        return getattr(entity, '_registry', None) is self
+
+    def __iter__(self):
+        return (entity for entity in self._entities[:self._size] if entity is not None)
+
+    @property
+    def capacity(self):
+        """Return the number of rows allocated for each column."""
+        return len(self._alive)
+
+    @staticmethod
+    def _empty(dtype, capacity):
+        dtype = _np.dtype(dtype)
+        return _np.full(capacity, _NULL[dtype], dtype=dtype)
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        self._entities.extend([None] * (capacity - len(self._entities)))
+        alive = _np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+        for name, column in self._columns.items():
+            grown = self._empty(column.dtype, capacity)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _fields_of(self, cls):
+        """Return the names of the columns declared on an entity class."""
+        if cls not in self._fields:
+            self._fields[cls] = tuple(
+                    {
+                            attr.name: None
+                            for klass in reversed(cls.__mro__)
+                            for attr in vars(klass).values()
+                            if isinstance(attr, Column) and attr.name in self._columns
+                    }
+            )
+        return self._fields[cls]
+
+    def column(self, name: str) -> _np.ndarray:
+        """Return a view of a column covering every allocated row."""
+        return self._columns[name][:self._size]
+
+    def get(self, name: str, slot: int):
+        """Return the value of a column for the entity at a slot."""
+        value = self._columns[name].item(slot)
+        if value.__class__ is float:
+            if value != value:
+                return None
+            if value.is_integer():
+                return int(value)
+        return value
+
+    def set(self, name: str, slot: int, value):
+        """Set the value of a column for the entity at a slot."""
+        column = self._columns[name]
+        column[slot] = _NULL[column.dtype] if value is None else value
+
+    def register(self, entity) -> int:
+        """Move an entity's column fields into the registry and return its slot."""
+        if entity._registry is self:
+            return entity._slot
+        if entity._registry is not None:
+            entity._registry.unregister(entity)
+        values = {name: getattr(entity, f'_{name}') for name in self._fields_of(type(entity))}
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._size == self.capacity:
+                self._grow()
+            slot = self._size
+            self._size += 1
+        self._entities[slot] = entity
+        self._alive[slot] = True
+        for column in self._columns.values():
+            column[slot] = _NULL[column.dtype]
+        entity._registry = self
+        entity._slot = slot
+        for name, value in values.items():
+            self.set(name, slot, value)
+        return slot
+
+    def unregister(self, entity):
+        """Copy an entity's column fields back onto the entity and release its slot."""
+        if entity._registry is not self:
+            return
+        slot = entity._slot
+        self.changes.discard(entity)
+        values = {name: self.get(name, slot) for name in self._fields_of(type(entity))}
+        entity._registry = None
+        entity._slot = None
+        for name, value in values.items():
+            setattr(entity, f'_{name}', value)
+        self.release(slot)
+
+    def reserve(self, count: int) -> range:
+        """Allocate a run of slots whose columns are filled in bulk before their entities exist.
+
+        The slots are alive, so ``update`` advances their columns like any other, but hold no entity
+        until one is bound to them with ``attach``.
+        """
+        while self._size + count > self.capacity:
+            self._grow()
+        slots = range(self._size, self._size + count)
+        self._size += count
+        self._alive[slots.start:slots.stop] = True
+        return slots
+
+    def attach(self, entity, slot: int):
+        """Bind an entity to a reserved slot, keeping the values already stored in its columns."""
+        self._entities[slot] = entity
+        entity._registry = self
+        entity._slot = slot
+
+    def release(self, slot: int):
+        """Free a slot, whether or not an entity was ever bound to it."""
+        self._entities[slot] = None
+        self._alive[slot] = False
+        self._columns['cell'][slot] = None
+        self._free.append(slot)
+
+    def update(self, dt):
+        """Advance every registered entity by one tick.
+
+        Ages every entity and ends its turn, and for entities with a speed refills move energy the way
+        ``GridEntity.end_turn`` does and restores the movements remaining for the turn.
+        """
+        n = self._size
+        alive = self._alive[:n]
+        self._columns['age'][:n][alive] += 1
+        self._columns['turn'][:n][alive] += 1
+        self._columns['turn_moves'][:n][alive] = 0
+        speed = self._columns['speed'][:n]
+        energy = self._columns['move_energy'][:n]
+        moving = alive & ~_np.isnan(speed)
+        energy = _np.where(_np.isnan(energy), speed, energy)
+        refill = _np.where(energy < 0, speed - _np.abs(energy), speed)
+        self._columns['move_energy'][:n][moving] = refill[moving]
+        self._columns['movements_remaining'][:n][moving] = speed[moving] // 5
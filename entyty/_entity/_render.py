@@ -0,0 +1,119 @@
+from __future__ import annotations as _annotations
+
+from typing import Optional as _Optional
+
+from weakref import finalize as _finalize, ref as _ref
+
+import pyglet
+
+
+def _weak_handlers(renderer) -> dict:
+    """Return event handlers that forward to a renderer without keeping it alive."""
+    renderer = _ref(renderer)
+
+    def on_occupy(entity, cell):
+        target = renderer()
+        if target is not None:
+            target.on_occupy(entity, cell)
+
+    def on_delete(entity):
+        target = renderer()
+        if target is not None:
+            target.on_delete(entity)
+
+    return {'on_occupy': on_occupy, 'on_delete': on_delete}
+
+
+def _remove_handlers(entity_class: type, handlers: dict):
+    for event_type, handler in handlers.items():
+        entity_class._remove_handler(event_type, handler)
+
+
+class GridRenderer:
+    """Draws grid entities into a batch with one persistent rectangle per entity.
+
+    A rectangle is created the first time an entity is shown and is moved in place whenever the entity
+    occupies a new cell, so drawing a frame is a single ``batch.draw()`` that allocates nothing. The
+    renderer follows ``on_occupy`` to move rectangles and ``on_delete`` to remove them.
+
+    The handlers it pushes on the grid entity class hold the renderer weakly and are removed when it is
+    collected, so a renderer lives only as long as it is referenced. The renderer ``for_batch`` returns
+    is kept by its batch and goes away with it; ``close`` stops a renderer at once.
+    """
+
+    def __init__(self, batch: _Optional[pyglet.graphics.Batch] = None, color: tuple = (255, 0, 0)):
+        # Imported here because grid entities import the renderer for ``draw``.
+        from ._grid_entity import AbstractGridEntity
+        self.batch = batch if batch is not None else pyglet.graphics.Batch()
+        self.color = color
+        self._shapes = {}
+        handlers = _weak_handlers(self)
+        AbstractGridEntity._push_handlers(**handlers)
+        self._detach = _finalize(self, _remove_handlers, AbstractGridEntity, handlers)
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def __contains__(self, entity):
+        return entity._id in self._shapes
+
+    @classmethod
+    def for_batch(cls, batch: pyglet.graphics.Batch) -> GridRenderer:
+        """Return the renderer that draws into a batch, creating it on first use and keeping it on the
+        batch."""
+        renderer = getattr(batch, '_grid_renderer', None)
+        if renderer is None:
+            renderer = batch._grid_renderer = cls(batch)
+        return renderer
+
+    def show(self, entity, color: _Optional[tuple] = None):
+        """Give an entity a rectangle in the batch if it does not have one yet."""
+        shape = self._shapes.get(entity._id)
+        if shape is None:
+            shape = pyglet.shapes.Rectangle(
+                    0, 0, entity.width, entity.height, color=color or self.color, batch=self.batch
+            )
+            self._shapes[entity._id] = shape
+            self._place(shape, entity)
+        elif color is not None:
+            shape.color = color
+        return shape
+
+    def hide(self, entity):
+        """Remove an entity's rectangle from the batch."""
+        shape = self._shapes.pop(entity._id, None)
+        if shape is not None:
+            shape.delete()
+
+    def set_color(self, entity, color: tuple):
+        """Change the colour of an entity's rectangle in place."""
+        self.show(entity, color)
+
+    @staticmethod
+    def _place(shape, entity):
+        if entity.cell is None:
+            shape.visible = False
+        else:
+            shape.position = (entity.x, entity.y)
+            shape.visible = True
+
+    def on_occupy(self, entity, cell):
+        shape = self._shapes.get(entity._id)
+        if shape is not None:
+            self._place(shape, entity)
+
+    def on_delete(self, entity):
+        self.hide(entity)
+
+    def draw(self):
+        """Draw the batch."""
+        self.batch.draw()
+
+    def close(self):
+        """Remove every rectangle and stop following entity events."""
+        self._detach()
+        for shape in self._shapes.values():
+            shape.delete()
+        self._shapes.clear()
+        if getattr(self.batch, '_grid_renderer', None) is self:
+            del self.batch._grid_renderer
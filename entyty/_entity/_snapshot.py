@@ -0,0 +1,378 @@
+from __future__ import annotations as _annotations
+
+from collections.abc import Sequence as _Sequence
+
+from importlib import import_module as _import_module
+
+from typing import Iterable as _Iterable, Optional as _Optional
+
+import json as _json
+import mmap as _mmap
+import struct as _struct
+
+import numpy as _np
+
+
+_MAGIC = b'ENTYSNAP'
+_VERSION = 1
+_PREAMBLE = _struct.Struct('<8sIQ')
+_ALIGN = 64
+
+
+def _class_path(cls) -> str:
+    return f'{cls.__module__}:{cls.__qualname__}'
+
+
+def _load_class(path: str):
+    module, _, qualname = path.partition(':')
+    obj = _import_module(module)
+    for part in qualname.split('.'):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _strings(values: list) -> tuple:
+    """Pack strings into an offsets array and one UTF-8 buffer."""
+    encoded = [value.encode() for value in values]
+    offsets = _np.zeros(len(encoded) + 1, _np.int64)
+    _np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, _np.frombuffer(b''.join(encoded), _np.uint8)
+
+
+def _float(value) -> float:
+    return _np.nan if value is None else value
+
+
+def _number(value: float):
+    return None if value != value else int(value) if value.is_integer() else value
+
+
+class Snapshot(_Sequence):
+    """A binary, column-wise snapshot of a collection of entities.
+
+    ``Snapshot.save`` writes the ids, names, ages, speeds, move energy, movements remaining, cells,
+    remaining paths and parents of every entity as one column per field in a single file. Opening a snapshot
+    memory-maps that file, so only a small header is read up front; each entity is rebuilt from its row
+    the first time it is accessed, and the raw columns can be read with ``column`` without rebuilding
+    any entity at all. ``load`` copies the columns into memory, so rows can still be rebuilt after the
+    snapshot is closed.
+
+    Cells are stored as indexes into a table of cell designations, so grid entities need the grid they
+    were saved from, or an equivalent one, to be rebuilt.
+    """
+
+    def __init__(self, path: str, grid: _Optional[object] = None):
+        self.path = path
+        self.grid = grid
+        with open(path, 'rb') as file:
+            self._mmap = _mmap.mmap(file.fileno(), 0, access=_mmap.ACCESS_READ)
+        magic, version, header_size = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f'{path} is not an entity snapshot.')
+        if version != _VERSION:
+            raise ValueError(f'Unsupported snapshot version {version}.')
+        header = _json.loads(bytes(self._mmap[_PREAMBLE.size:_PREAMBLE.size + header_size]))
+        self.tick = header['tick']
+        self._count = header['count']
+        self._class_paths = header['classes']
+        self._classes = [None] * len(self._class_paths)
+        self._layout = header['columns']
+        self._columns = {}
+        self._loaded = False
+        # One slot per stored cell, plus a trailing None that the -1 of a missing cell indexes.
+        self._cells = _np.full(self._layout['cell_table_offsets'][1][0], None, object)
+        self._entities = [None] * self._count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('snapshot index out of range')
+        entity = self._entities[index]
+        if entity is None:
+            entity = self._entities[index] = self._build(index)
+        return entity
+
+    def __iter__(self):
+        self.build()
+        return iter(self._entities)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def columns(self) -> tuple:
+        """Return the names of the stored columns."""
+        return tuple(self._layout)
+
+    def column(self, name: str) -> _np.ndarray:
+        """Return a read-only array over a stored column, backed by the memory-mapped file."""
+        column = self._columns.get(name)
+        if column is None:
+            dtype, shape, offset = self._layout[name]
+            count = int(_np.prod(shape))
+            if count:
+                column = _np.frombuffer(self._mmap, _np.dtype(dtype), count, offset).reshape(shape)
+            else:
+                column = _np.empty(shape, _np.dtype(dtype))
+            self._columns[name] = column
+        return column
+
+    def load(self) -> Snapshot:
+        """Copy every column into memory and return the snapshot."""
+        if not self._loaded:
+            for name in self._layout:
+                self._columns[name] = self.column(name).copy()
+            self._loaded = True
+        return self
+
+    def close(self):
+        """Release the memory-mapped file. Entities that were already rebuilt stay usable, and so do the
+        columns if the snapshot was loaded."""
+        if not self._loaded:
+            self._columns.clear()
+        self._mmap.close()
+
+    def built(self, index: int) -> bool:
+        """Return whether the entity at a row has been rebuilt."""
+        return self._entities[index] is not None
+
+    def cells(self) -> _np.ndarray:
+        """Return an object array of the cell of every row, resolved on the snapshot's grid, without
+        rebuilding any entity."""
+        cells = self.column('cell')
+        return self._resolve(cells)[cells]
+
+    def _string(self, name: str, index: int) -> str:
+        offsets = self.column(f'{name}_offsets')
+        return bytes(self.column(f'{name}_data')[offsets[index]:offsets[index + 1]]).decode()
+
+    def _strings(self, name: str) -> list:
+        offsets = self.column(f'{name}_offsets').tolist()
+        data = self.column(f'{name}_data').tobytes()
+        return [data[start:stop].decode() for start, stop in zip(offsets, offsets[1:])]
+
+    def _grid(self):
+        if self.grid is None:
+            raise ValueError('A grid is required to restore grid entities from a snapshot.')
+        return self.grid
+
+    def _cell(self, index: int):
+        if index < 0:
+            return None
+        cell = self._cells[index]
+        if cell is None:
+            cell = self._cells[index] = self._grid()[self._string('cell_table', index)]
+        return cell
+
+    def _class(self, index: int):
+        cls = self._classes[index]
+        if cls is None:
+            cls = self._classes[index] = _load_class(self._class_paths[index])
+        return cls
+
+    def state(self, index: int) -> dict:
+        """Return the stored fields of the entity at a row, with cells resolved on the snapshot's grid."""
+        offsets = self.column('path_offsets')
+        path = self.column('path_cells')[offsets[index]:offsets[index + 1]]
+        flow = int(self.column('flow_destination')[index])
+        parent = int(self.column('parent')[index])
+        state = {
+                'class':               self._class(int(self.column('class')[index])),
+                'name':                self._string('name', index),
+                'entity_id':           self.column('entity_id')[index].tobytes().hex(),
+                'age':                 int(self.column('age')[index]),
+                'cell':                self._cell(int(self.column('cell')[index])),
+                'path':                [self._cell(cell) for cell in path.tolist()],
+                'flow_destination':    self._cell(flow) if flow >= 0 else None,
+                'traveling':           bool(self.column('traveling')[index]),
+                'blocked_ticks':       int(self._blocked()[index]),
+                'parent':              self.column('entity_id')[parent].tobytes().hex() if parent >= 0 else None,
+                'grid':                self.grid,
+        }
+        for name in ('speed', 'move_energy', 'movements_remaining'):
+            state[name] = _number(float(self.column(name)[index]))
+        return state
+
+    def _blocked(self) -> _np.ndarray:
+        # Snapshots written before entities counted the ticks they waited for a cell have no such column.
+        if 'blocked_ticks' in self._layout:
+            return self.column('blocked_ticks')
+        return _np.zeros(len(self), _np.int32)
+
+    def _build(self, index: int):
+        state = self.state(index)
+        entity = state['class']._restore(state)
+        parent = int(self.column('parent')[index])
+        if parent >= 0:
+            self[parent]._link(entity)
+        return entity
+
+    def _resolve(self, indexes: _np.ndarray) -> _np.ndarray:
+        """Resolve the stored cells at table indexes on the grid, decoding each designation once, and return
+        the table of cells."""
+        cells = self._cells
+        indexes = _np.unique(indexes)
+        missing = [index for index in indexes[indexes >= 0].tolist() if cells[index] is None]
+        if missing:
+            grid = self._grid()
+            offsets = self.column('cell_table_offsets').tolist()
+            data = self.column('cell_table_data').tobytes()
+            for index in missing:
+                cells[index] = grid[data[offsets[index]:offsets[index + 1]].decode()]
+        return cells
+
+    def build(self, rows: _Optional[_Iterable[int]] = None):
+        """Rebuild the entities at some rows, or at every row, that have not been accessed yet, converting
+        each column only once."""
+        rows = range(self._count) if rows is None else rows
+        pending = [index for index in rows if self._entities[index] is None]
+        if not pending:
+            return
+        names = self._strings('name')
+        ids = self.column('entity_id').tobytes().hex()
+        classes = self.column('class').tolist()
+        ages = self.column('age').tolist()
+        traveling = self.column('traveling').tolist()
+        blocked = self._blocked().tolist()
+        parents = self.column('parent').tolist()
+        offsets = self.column('path_offsets').tolist()
+        paths = self.column('path_cells')
+        numbers = {name: self.column(name).tolist() for name in ('speed', 'move_energy', 'movements_remaining')}
+        cells, flows = self.column('cell')[pending], self.column('flow_destination')[pending]
+        if len(pending) == self._count:
+            table = self._resolve(_np.concatenate((cells, flows, paths)))
+        else:
+            table = self._resolve(_np.concatenate(
+                    [cells, flows] + [paths[offsets[index]:offsets[index + 1]] for index in pending]
+            ))
+        cells, flows = table[cells].tolist(), table[flows].tolist()
+        for i, index in enumerate(pending):
+            parent = parents[index]
+            state = {
+                    'class':               self._class(classes[index]),
+                    'name':                names[index],
+                    'entity_id':           ids[index * 32:index * 32 + 32],
+                    'age':                 ages[index],
+                    'cell':                cells[i],
+                    'path':                table[paths[offsets[index]:offsets[index + 1]]].tolist(),
+                    'flow_destination':    flows[i],
+                    'traveling':           traveling[index],
+                    'blocked_ticks':       blocked[index],
+                    'parent':              ids[parent * 32:parent * 32 + 32] if parent >= 0 else None,
+                    'grid':                self.grid,
+                    'speed':               _number(numbers['speed'][index]),
+                    'move_energy':         _number(numbers['move_energy'][index]),
+                    'movements_remaining': _number(numbers['movements_remaining'][index]),
+            }
+            self._entities[index] = state['class']._restore(state)
+        for index in pending:
+            if parents[index] >= 0:
+                self[parents[index]]._link(self._entities[index])
+
+    @classmethod
+    def save(cls, path: str, entities: _Iterable, tick: int = 0) -> int:
+        """Write a snapshot of entities to a file and return the number of entities written."""
+        entities = list(entities)
+        n = len(entities)
+        class_index, class_paths = {}, []
+        cell_index, cell_designations = {}, []
+
+        def cell_id(cell):
+            if cell is None:
+                return -1
+            designation = cell.designation
+            i = cell_index.get(designation)
+            if i is None:
+                i = cell_index[designation] = len(cell_designations)
+                cell_designations.append(designation)
+            return i
+
+        registry = entities[0]._registry if entities else None
+        if registry is not None and all(entity._registry is registry for entity in entities):
+            # Every entity lives in one registry, so its column fields are read as whole columns.
+            slots = _np.fromiter((entity._slot for entity in entities), _np.intp, n)
+            ages = registry.column('age')[slots]
+            speeds = registry.column('speed')[slots]
+            energies = registry.column('move_energy')[slots]
+            movements = registry.column('movements_remaining')[slots]
+            cells = registry.column('cell')[slots].tolist()
+        else:
+            ages = _np.fromiter((entity._age or 0 for entity in entities), _np.int64, n)
+            speeds, energies, movements = (
+                    _np.fromiter((_float(getattr(entity, f'_{name}', None)) for entity in entities), _np.float64, n)
+                    for name in ('speed', 'move_energy', 'movements_remaining')
+            )
+            cells = [getattr(entity, 'cell', None) for entity in entities]
+        rows = {id(entity): row for row, entity in enumerate(entities)}
+        classes, uuids, names, flows, traveling, blocked, parents = [], [], [], [], [], [], []
+        path_offsets, path_cells = [0], []
+        for entity in entities:
+            entity_type = type(entity)
+            j = class_index.get(entity_type)
+            if j is None:
+                j = class_index[entity_type] = len(class_paths)
+                class_paths.append(_class_path(entity_type))
+            classes.append(j)
+            uuids.append(bytes.fromhex(entity.entity_id))
+            names.append(entity.name or '')
+            field = getattr(entity, '_flow_field', None)
+            flows.append(cell_id(field.destination) if field is not None else -1)
+            path_cells.extend(cell_id(cell) for cell in getattr(entity, 'path', None) or ())
+            path_offsets.append(len(path_cells))
+            traveling.append(bool(getattr(entity, 'traveling', False)))
+            blocked.append(getattr(entity, '_blocked_ticks', 0))
+            parents.append(rows.get(id(entity._parent), -1) if entity._parent is not None else -1)
+        cells = _np.fromiter(map(cell_id, cells), _np.int32, n)
+        name_offsets, name_data = _strings(names)
+        table_offsets, table_data = _strings(cell_designations)
+        columns = {
+                'class':               _np.asarray(classes, _np.uint16),
+                'entity_id':           _np.frombuffer(b''.join(uuids), _np.uint8).reshape(n, 16),
+                'name_offsets':        name_offsets,
+                'name_data':           name_data,
+                'age':                 _np.asarray(ages, _np.int64),
+                'speed':               _np.asarray(speeds, _np.float64),
+                'move_energy':         _np.asarray(energies, _np.float64),
+                'movements_remaining': _np.asarray(movements, _np.float64),
+                'cell':                cells,
+                'flow_destination':    _np.asarray(flows, _np.int32),
+                'traveling':           _np.asarray(traveling, bool),
+                'blocked_ticks':       _np.asarray(blocked, _np.int32),
+                'parent':              _np.asarray(parents, _np.int32),
+                'path_offsets':        _np.asarray(path_offsets, _np.int64),
+                'path_cells':          _np.asarray(path_cells, _np.int32),
+                'cell_table_offsets':  table_offsets,
+                'cell_table_data':     table_data,
+        }
+        cls._write(path, columns, {'tick': tick, 'count': n, 'classes': class_paths})
+        return n
+
+    @staticmethod
+    def _write(path: str, columns: dict, header: dict):
+        layout = {name: [column.dtype.str, list(column.shape), 0] for name, column in columns.items()}
+        # The header holds the offset of every column, so it is sized with placeholder offsets wide
+        # enough for any file size first and padded to that size once the real offsets are known.
+        header['columns'] = {name: [dtype, shape, 2 ** 63] for name, (dtype, shape, _) in layout.items()}
+        header_size = len(_json.dumps(header).encode())
+        offset = _PREAMBLE.size + header_size
+        for name, column in columns.items():
+            offset += -offset % _ALIGN
+            layout[name][2] = offset
+            offset += column.nbytes
+        header['columns'] = layout
+        encoded = _json.dumps(header).encode().ljust(header_size)
+        with open(path, 'wb') as file:
+            file.write(_PREAMBLE.pack(_MAGIC, _VERSION, header_size))
+            file.write(encoded)
+            for name, column in columns.items():
+                file.write(b'\0' * (layout[name][2] - file.tell()))
+                file.write(_np.ascontiguousarray(column).tobytes())
@@ -0,0 +1,146 @@
+from __future__ import annotations as _annotations
+
+from heapq import nsmallest as _nsmallest
+
+from typing import Optional as _Optional
+
+import math as _math
+
+
+def _point(where):
+    """Return the (x, y) coordinates of a cell, an entity on a cell or a coordinate pair."""
+    if isinstance(where, tuple):
+        return where
+    cell = getattr(where, 'cell', where)
+    return tuple(cell.coordinates)
+
+
+class SpatialIndex:
+    """A uniform bucket hash of the entities occupying cells, keyed on cell coordinates.
+
+    Grid entities insert themselves when they enter a cell and remove themselves when they leave one,
+    so the index is always current without scanning. Region, radius and nearest-neighbour queries only
+    visit the buckets that overlap the query, so their cost depends on the area searched and the number
+    of entities found rather than on the total number of entities.
+    """
+
+    def __init__(self, bucket_size: float = 8):
+        self.bucket_size = bucket_size
+        self._buckets = {}
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, entity):
+        return id(entity) in self._positions
+
+    def _bucket(self, x, y):
+        return int(x // self.bucket_size), int(y // self.bucket_size)
+
+    def insert(self, entity, cell):
+        """Index an entity at a cell, moving it if it is already indexed."""
+        if id(entity) in self._positions:
+            self.remove(entity)
+        x, y = cell.coordinates[0], cell.coordinates[1]
+        key = self._bucket(x, y)
+        self._buckets.setdefault(key, {})[id(entity)] = entity
+        self._positions[id(entity)] = (x, y, key)
+
+    def remove(self, entity):
+        """Remove an entity from the index."""
+        position = self._positions.pop(id(entity), None)
+        if position is None:
+            return
+        bucket = self._buckets[position[2]]
+        del bucket[id(entity)]
+        if not bucket:
+            del self._buckets[position[2]]
+
+    def clear(self):
+        """Remove every entity from the index."""
+        self._buckets.clear()
+        self._positions.clear()
+
+    def position_of(self, entity) -> _Optional[tuple]:
+        """Return the indexed coordinates of an entity, or None if it is not indexed."""
+        position = self._positions.get(id(entity))
+        return position[:2] if position is not None else None
+
+    def _scan(self, bx0, by0, bx1, by1):
+        """Yield (x, y, entity) for every entity in a rectangle of buckets."""
+        buckets, positions = self._buckets, self._positions
+        if (bx1 - bx0 + 1) * (by1 - by0 + 1) > len(buckets):
+            keys = [key for key in buckets if bx0 <= key[0] <= bx1 and by0 <= key[1] <= by1]
+        else:
+            keys = [(bx, by) for bx in range(bx0, bx1 + 1) for by in range(by0, by1 + 1) if (bx, by) in buckets]
+        for key in keys:
+            for entity_id, entity in buckets[key].items():
+                x, y, _ = positions[entity_id]
+                yield x, y, entity
+
+    def entities_at(self, cell) -> list:
+        """Return the entities indexed at a cell."""
+        x, y = _point(cell)
+        bx, by = self._bucket(x, y)
+        return [entity for ex, ey, entity in self._scan(bx, by, bx, by) if ex == x and ey == y]
+
+    def entities_in_rect(self, x0, y0, x1, y1) -> list:
+        """Return the entities whose coordinates fall inside a rectangle, bounds included."""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        return [
+                entity for x, y, entity in self._scan(*self._bucket(x0, y0), *self._bucket(x1, y1))
+                if x0 <= x <= x1 and y0 <= y <= y1
+        ]
+
+    def entities_within(self, center, radius: float, exclude: _Optional[object] = None) -> list:
+        """Return the entities within a Euclidean radius of a cell, an entity or a coordinate pair."""
+        cx, cy = _point(center)
+        limit = radius * radius
+        return [
+                entity for x, y, entity in self._scan(
+                        *self._bucket(cx - radius, cy - radius), *self._bucket(cx + radius, cy + radius)
+                )
+                if (x - cx) ** 2 + (y - cy) ** 2 <= limit and entity is not exclude
+        ]
+
+    def nearest(self, center, k: int = 1, max_radius: _Optional[float] = None,
+                exclude: _Optional[object] = None) -> list:
+        """Return up to `k` entities nearest to a cell, an entity or a coordinate pair, closest first.
+
+        Buckets are searched in rings of growing distance from the center, stopping as soon as no
+        unsearched bucket can hold an entity closer than the k-th nearest found so far.
+        """
+        cx, cy = _point(center)
+        bx, by = self._bucket(cx, cy)
+        size = self.bucket_size
+        total = len(self._positions) - (exclude is not None and id(exclude) in self._positions)
+        found = []
+        ring = 0
+        while len(found) < total:
+            reach = ring * size
+            if max_radius is not None and reach > max_radius + size:
+                break
+            if ring == 0:
+                keys = [(bx, by)]
+            else:
+                keys = [(bx + dx, by - ring) for dx in range(-ring, ring + 1)]
+                keys += [(bx + dx, by + ring) for dx in range(-ring, ring + 1)]
+                keys += [(bx - ring, by + dy) for dy in range(-ring + 1, ring)]
+                keys += [(bx + ring, by + dy) for dy in range(-ring + 1, ring)]
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                for entity_id, entity in bucket.items():
+                    if entity is exclude:
+                        continue
+                    x, y, _ = self._positions[entity_id]
+                    found.append((_math.hypot(x - cx, y - cy), len(found), entity))
+            if len(found) >= k and _nsmallest(k, found)[-1][0] <= reach:
+                break
+            ring += 1
+        if max_radius is not None:
+            found = [item for item in found if item[0] <= max_radius]
+        return [entity for _, _, entity in _nsmallest(k, found)]
@@ -0,0 +1,320 @@
+from __future__ import annotations as _annotations
+
+from ._neighbors import NeighborTable
+from ._registry import EntityRegistry
+from ._snapshot import Snapshot
+
+from pyglet import clock as _clock
+from pyglet.event import EventDispatcher as _EventDispatcher
+
+from typing import Optional as _Optional, Union as _Union
+
+import numpy as _np
+
+
+# Holds the cell of an entity restored from a snapshot until the entity itself is built.
+_PLACEHOLDER = object()
+
+
+class World(_EventDispatcher):
+    """A stepper that owns a collection of GridEntities and resolves their movement for one tick in a
+    single batched pass.
+
+    The world registers its entities with an EntityRegistry, so move energy and the movements remaining
+    in a turn are read and written as NumPy columns. Each call to ``step`` moves every traveling entity
+    along its path as far as its movements and energy allow, fires one ``on_vacate`` and one
+    ``on_occupy`` event carrying every entity that moved, then ages the entities, ends their turn and
+    refills their energy for the next tick. Finally, every entity whose fields changed during the tick is reported once
+    by a single ``on_update`` event. If the world has an ``event_queue``, the entity events queued during
+    the step are delivered before ``on_step``.
+
+    Events:
+        on_add(entity): An entity has been added to the world.
+        on_remove(entity): An entity has been removed from the world.
+        on_vacate(entities, cells): The entities that left a cell during the step and the cells they left.
+        on_occupy(entities, cells): The entities that entered a cell during the step and the cells they entered.
+        on_update(entities, fields): The entities whose fields changed since the last step, and for each
+            the names of the fields that changed.
+        on_step(dt): The step has been resolved.
+    """
+
+    def __init__(self, grid: _Optional[object] = None, registry: _Optional[EntityRegistry] = None):
+        self.grid = grid
+        self.registry = registry if registry is not None else EntityRegistry()
+        self.tick = 0
+        self._entities = []
+        self._index = {}
+        self._snapshot = None
+        self._pending = {}
+        self._held = []
+        self.event_queue = None
+
+    def __len__(self):
+        return len(self._entities) + len(self._pending)
+
+    def __iter__(self):
+        self._build_pending()
+        return iter(self._entities)
+
+    def __contains__(self, entity):
+        return id(entity) in self._index
+
+    @property
+    def entities(self):
+        """Return the entities owned by the world."""
+        self._build_pending()
+        return tuple(self._entities)
+
+    def add(self, entity):
+        """Add an entity to the world and register it with the world's registry."""
+        if id(entity) in self._index:
+            return
+        self.registry.register(entity)
+        self._index[id(entity)] = len(self._entities)
+        self._entities.append(entity)
+        self.dispatch_event('on_add', entity)
+
+    def remove(self, entity):
+        """Remove an entity from the world and release its registry slot."""
+        position = self._index.pop(id(entity), None)
+        if position is None:
+            return
+        last = self._entities.pop()
+        if last is not entity:
+            self._entities[position] = last
+            self._index[id(last)] = position
+        self.registry.unregister(entity)
+        self.dispatch_event('on_remove', entity)
+
+    def save(self, path: str) -> int:
+        """Write a columnar snapshot of the world's entities to a file and return the number written."""
+        self._build_pending()
+        return Snapshot.save(path, self._entities, self.tick)
+
+    def restore(self, snapshot: _Union[Snapshot, str]):
+        """Replace the world's entities with those of a snapshot, for restarts and rollbacks.
+
+        The snapshot's columns are copied into the registry in one pass, and the entities themselves are
+        only built when the world is first iterated or saved. Entities that are traveling or belong to a
+        hierarchy are built at once. Until an entity is built its cell is held for it, so no other entity
+        can enter it, and ``on_add`` is dispatched for it when it is built.
+        """
+        if not isinstance(snapshot, Snapshot):
+            with Snapshot(snapshot, self.grid) as opened:
+                return self.restore(opened.load())
+        for slot in self._pending.values():
+            self.registry.release(slot)
+        self._release_held()
+        for entity in list(self._entities):
+            self.remove(entity)
+            if getattr(entity, 'cell', None) is not None:
+                entity._leave()
+        snapshot.load()
+        registry = self.registry
+        slots = registry.reserve(len(snapshot))
+        for name in ('age', 'speed', 'move_energy', 'movements_remaining'):
+            registry.column(name)[slots.start:slots.stop] = snapshot.column(name)
+        cells = snapshot.cells()
+        registry.column('cell')[slots.start:slots.stop] = cells
+        parents = snapshot.column('parent')
+        eager = snapshot.column('traveling') | (parents >= 0)
+        eager[parents[parents >= 0]] = True
+        eager[[row for row in range(len(snapshot)) if snapshot.built(row)]] = True
+        rows = _np.flatnonzero(eager).tolist()
+        snapshot.build(rows)
+        for row in rows:
+            self._attach(snapshot[row], slots[row])
+        lazy = _np.flatnonzero(~eager)
+        self._pending = dict(zip(lazy.tolist(), (lazy + slots.start).tolist()))
+        self._held = [cell for cell in cells[lazy].tolist() if cell is not None and not cell.occupied]
+        for cell in self._held:
+            cell.recv_occupant(_PLACEHOLDER)
+        self._snapshot = snapshot if self._pending else None
+        self.tick = snapshot.tick
+
+    def _attach(self, entity, slot):
+        """Bind an entity rebuilt from a snapshot to its registry slot and add it to the world."""
+        self.registry.attach(entity, slot)
+        entity._claim()
+        self._index[id(entity)] = len(self._entities)
+        self._entities.append(entity)
+        self.dispatch_event('on_add', entity)
+
+    def _build_pending(self):
+        """Build every entity restored from a snapshot that has not been built yet."""
+        if not self._pending:
+            return
+        pending, snapshot = self._pending, self._snapshot
+        self._release_held()
+        snapshot.build(pending)
+        for row, slot in pending.items():
+            self._attach(snapshot[row], slot)
+
+    def _release_held(self):
+        """Free the cells held for unbuilt entities and forget those entities."""
+        for cell in self._held:
+            cell.recv_occupant(_PLACEHOLDER)
+        self._held = []
+        self._pending = {}
+        self._snapshot = None
+
+    @classmethod
+    def load(cls, path: str, grid: _Optional[object] = None, registry: _Optional[EntityRegistry] = None):
+        """Create a world from a snapshot file."""
+        world = cls(grid, registry)
+        world.restore(path)
+        return world
+
+    def schedule(self, interval: float):
+        """Step the world at a fixed interval on the pyglet clock."""
+        _clock.schedule_interval(self.step, interval)
+
+    def unschedule(self):
+        """Stop stepping the world on the pyglet clock."""
+        _clock.unschedule(self.step)
+
+    def step(self, dt):
+        """Advance the world by one tick."""
+        movers = [
+                entity for entity in self._entities
+                if getattr(entity, 'traveling', False) and (entity.path or entity._flow_field is not None)
+        ]
+        vacated, occupied = ([], []), ([], [])
+        if movers:
+            self._move(movers, vacated, occupied)
+        self.registry.update(dt)
+        self.tick += 1
+        if vacated[0]:
+            self._dispatch_moves('on_vacate', *vacated)
+            self._dispatch_moves('on_occupy', *occupied)
+        self.flush_changes()
+        if self.event_queue is not None:
+            self.event_queue.deliver()
+        self.dispatch_event('on_step', dt)
+
+    def flush_changes(self) -> int:
+        """Dispatch the changes collected since the last flush and return the number of entities changed.
+
+        The world gets one bulk ``on_update`` event, and each changed entity with listeners or an event
+        queue gets an ``on_update`` with the names of its changed fields. The ageing and energy refill
+        that every step applies to every entity are not reported.
+        """
+        entities, fields = self.registry.changes.flush()
+        if entities:
+            self.dispatch_event('on_update', entities, fields)
+            for entity, changed in zip(entities, fields):
+                if entity._event_queue is not None or entity.dispatcher.has_listeners(entity):
+                    entity._dispatch_event('on_update', entity, changed)
+        return len(entities)
+
+    def _move(self, movers, vacated, occupied):
+        """Move each entity along its path until it runs out of movements, energy or path."""
+        registry = self.registry
+        n = len(movers)
+        slots = _np.fromiter((entity._slot for entity in movers), _np.intp, n)
+        speed = registry.column('speed')[slots]
+        energy = registry.column('move_energy')[slots]
+        energy = _np.where(_np.isnan(energy), speed, energy)
+        budget = registry.column('movements_remaining')[slots]
+        budget = _np.where(_np.isnan(budget), _np.nan_to_num(speed // 5, nan=1), budget)
+        lengths = _np.fromiter((self._remaining(entity) for entity in movers), _np.intp, n)
+        limit = _np.minimum(budget, lengths).astype(_np.intp)
+        progress = _np.zeros(n, _np.intp)
+        active = _np.flatnonzero(limit > 0)
+        neighbors = NeighborTable.for_grid(self.grid if self.grid is not None else movers[0].grid)
+        blocked = []
+        while active.size:
+            cells = [movers[i].cell for i in active]
+            targets = [self._next_cell(movers[i], progress[i]) for i in active]
+            directions = [
+                    neighbors.direction(cell, target) if target is not None else None
+                    for cell, target in zip(cells, targets)
+            ]
+            cost = _np.fromiter((cell.cost_out for cell in cells), float, len(cells))
+            cost += _np.fromiter((getattr(target, 'cost_in', 0) for target in targets), float, len(targets))
+            open_ = _np.fromiter(
+                    (
+                            direction is not None and target.passable and not target.occupied
+                            for target, direction in zip(targets, directions)
+                    ),
+                    bool,
+                    len(targets)
+            )
+            can_move = _np.flatnonzero(open_ & (energy[active] > 0) & (energy[active] >= cost))
+            for j in _np.flatnonzero(~open_):
+                target = targets[j]
+                if directions[j] is not None and target.passable and target.occupied:
+                    blocked.append((active[j], target))
+            claimed = set()
+            moved = []
+            for j in can_move:
+                target = targets[j]
+                if id(target) in claimed:
+                    blocked.append((active[j], target))
+                    continue
+                claimed.add(id(target))
+                entity = movers[active[j]]
+                entity._record_move(cells[j], target, directions[j])
+                vacated[0].append(entity)
+                vacated[1].append(entity._leave())
+                occupied[0].append(entity)
+                occupied[1].append(entity._enter(target))
+                moved.append(j)
+            moved = _np.asarray(moved, _np.intp)
+            advanced = active[moved]
+            energy[advanced] -= cost[moved]
+            progress[advanced] += 1
+            active = advanced[progress[advanced] < limit[advanced]]
+        registry.column('move_energy')[slots] = energy
+        registry.column('movements_remaining')[slots] = budget - progress
+        for i in _np.flatnonzero(progress):
+            entity = movers[i]
+            entity._mark_dirty('move_energy')
+            entity._mark_dirty('movements_remaining')
+            entity._unblock()
+            if entity._flow_field is not None:
+                if entity._next_flow_step() is None:
+                    entity._release_flow()
+                    entity.traveling = False
+                continue
+            entity.path.advance(progress[i])
+            if not entity.path:
+                entity.traveling = False
+        for i, target in blocked:
+            movers[i]._block(target, progress[i])
+        for i in _np.flatnonzero(lengths == 0):
+            entity = movers[i]
+            if entity._flow_field is not None:
+                # Standing at the destination or on a cell the field cannot reach; nothing left to follow.
+                entity._release_flow()
+                entity.traveling = False
+
+    @staticmethod
+    def _remaining(entity):
+        """Return the number of steps left on an entity's path or flow field."""
+        if entity._flow_field is not None:
+            return entity._flow_field.steps_from(entity.cell) or 0
+        return len(entity.path)
+
+    @staticmethod
+    def _next_cell(entity, step):
+        """Return the cell an entity steps into after it has taken a number of steps this tick."""
+        if entity._flow_field is not None:
+            return entity._next_flow_step()
+        return entity.path.peek(step)
+
+    def _dispatch_moves(self, event_type, entities, cells):
+        """Dispatch a bulk move event on the world and per-entity events to entities with listeners or an
+        event queue."""
+        self.dispatch_event(event_type, entities, cells)
+        for entity, cell in zip(entities, cells):
+            if entity._event_queue is not None or entity.dispatcher.has_listeners(entity):
+                entity._dispatch_event(event_type, entity, cell)
+
+
+World.register_event_type('on_add')
+World.register_event_type('on_remove')
+World.register_event_type('on_vacate')
+World.register_event_type('on_occupy')
+World.register_event_type('on_update')
+World.register_event_type('on_step')
@@ -13,7 +13,7 @@ setup(
     author_email='joesaysahoy@gmail.com',
     url='https://github.com/primal-coder/entyty',
     packages=find_packages(),
-    install_requires=['pyglet'],
+    install_requires=['pyglet', 'numpy'],
     python_requires='>=3.7',
     license='MIT',
     classifiers=[
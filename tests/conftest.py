@@ -0,0 +1,39 @@
+import logging
+import os
+import sys
+
+import pytest
+
+# The tests run on the stand-in grid the benchmarks use.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from _grid import Grid  # noqa: E402
+
+from entyty.__log__ import logger  # noqa: E402
+
+# Keep the tests from writing entity.log into the working directory.
+logger.setLevel(logging.CRITICAL)
+
+
+@pytest.fixture
+def grid():
+    return Grid(20, 20, cell_size=4)
+
+
+def state(world):
+    """Return the fields of a world's entities that a rebuilt world must reproduce, sorted by entity id."""
+    return sorted(
+            (
+                    entity.entity_id,
+                    entity.age,
+                    entity.speed,
+                    entity.move_energy,
+                    entity.movements_remaining,
+                    entity.cell.designation if entity.cell is not None else None,
+                    entity.parent.entity_id if entity.parent is not None else None,
+                    entity.traveling,
+                    tuple(cell.designation for cell in entity.path),
+                    entity._blocked_ticks,
+            )
+            for entity in world
+    )
@@ -0,0 +1,57 @@
+from entyty._entity import ActionLog, Direction, GridEntity, World
+from entyty._entity._actions import ACTION_DTYPE
+
+
+def test_moves_are_grouped_by_turn():
+    log = ActionLog(16)
+    log.record(1, 0, 0, Direction.EAST, '0_0', '1_0')
+    log.record(1, 0, 1, Direction.SOUTH, '1_0', '1_1')
+    log.record(2, 0, 0, Direction.WEST, '5_5', '4_5')
+    log.record(1, 1, 0, Direction.NORTH_EAST, '1_1', '2_0')
+    assert log.moves(1, 0) == {
+            0: {'direction': 'east', 'from': '0_0', 'to': '1_0'},
+            1: {'direction': 'south', 'from': '1_0', 'to': '1_1'},
+    }
+    assert list(log.turns(1)) == [0, 1]
+    assert log.moves(2, 1) == {}
+    assert log.cells == ('0_0', '1_0', '1_1', '5_5', '4_5', '2_0')
+
+
+def test_ring_overwrites_the_oldest_records():
+    log = ActionLog(4)
+    for turn in range(10):
+        log.record(7, turn, 0, Direction.EAST, f'{turn}_0', f'{turn + 1}_0')
+    assert len(log) == 4
+    assert list(log.turns(7)) == [6, 7, 8, 9]
+    exported = log.export()
+    assert exported.dtype == ACTION_DTYPE
+    assert exported['turn'].tolist() == [6, 7, 8, 9]
+
+
+def test_discard_drops_one_turn_or_every_record():
+    log = ActionLog(8)
+    for turn in range(3):
+        log.record(3, turn, 0, Direction.SOUTH, '0_0', '0_1')
+    log.discard(3, 1)
+    assert list(log.turns(3)) == [0, 2]
+    log.discard(3)
+    assert log.turns(3) == {} and len(log.export()) == 0
+
+
+def test_entities_keep_the_actions_api(grid):
+    original = GridEntity._action_log
+    GridEntity.use_action_log(ActionLog(64))
+    try:
+        world = World(grid)
+        entity = GridEntity(grid, cell=grid['0_0'])
+        world.add(entity)
+        entity.set_path_to(grid['2_0'])
+        entity.move(grid['1_0'])
+        assert entity.actions == {'move': {0: {'direction': 'east', 'from': '0_0', 'to': '1_0'}}}
+        world.step(1)
+        assert entity.actions == {'move': {None: {}}}
+        assert entity.action_history[-1]['move'][0]['to'] == '1_0'
+        entity.actions = {'move': {0: {'direction': 'west', 'from': '2_0', 'to': '1_0'}}}
+        assert entity.actions['move'][0]['direction'] == 'west'
+    finally:
+        GridEntity.use_action_log(original)
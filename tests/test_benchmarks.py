@@ -0,0 +1,22 @@
+import json
+
+import suite
+
+
+def test_suite_runs_every_benchmark_at_a_small_scale(tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    assert suite.main(['--scales', '50', '--repeat', '1', '--output', str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert {result['name'] for result in report['results']} == set(suite.BENCHMARKS)
+    assert all(result['operations'] > 0 for result in report['results'])
+    assert set(report['meta']) >= {'commit', 'python', 'numpy', 'platform'}
+
+
+def test_compare_reports_regressions(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    suite.main(['--scales', '50', '--repeat', '1', '--only', 'create_entity', '--output', str(baseline)])
+    report = json.loads(baseline.read_text())
+    report['results'][0]['per_second'] *= 1000
+    baseline.write_text(json.dumps(report))
+    assert suite.main(['--scales', '50', '--repeat', '1', '--only', 'create_entity', '--compare', str(baseline)]) == 1
+    assert 'REGRESSION' in capsys.readouterr().out
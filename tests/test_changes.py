@@ -0,0 +1,52 @@
+from entyty._entity import ChangeSet, GridEntity, VisualEntity, World
+
+
+class Tracked(VisualEntity):
+    __slots__ = ()
+
+
+def test_world_reports_each_changed_entity_once_per_step(grid):
+    world = World(grid)
+    entities = [GridEntity(grid, cell=grid[f'{col}_0']) for col in range(3)]
+    for entity in entities:
+        world.add(entity)
+    reports = []
+    world.push_handlers(on_update=lambda changed, fields: reports.append(dict(zip(changed, fields))))
+    for speed in (5, 10, 15):
+        entities[0].speed = speed
+    entities[1].name = 'renamed'
+    world.step(1)
+    assert reports == [{entities[0]: {'speed', 'move_energy'}, entities[1]: {'name'}}]
+    world.step(1)
+    assert len(reports) == 1
+
+
+def test_entities_with_listeners_get_their_own_report(grid):
+    world = World(grid)
+    entity = GridEntity(grid, cell=grid['0_0'])
+    world.add(entity)
+    reports = []
+    entity._push_entity_handlers(on_update=lambda entity, fields: reports.append(fields))
+    entity.set_path_to(grid['2_0'])
+    entity.speed = 10
+    assert reports == []
+    world.step(1)
+    assert len(reports) == 1
+    assert {'path', 'speed', 'cell', 'move_energy', 'movements_remaining'} <= reports[0]
+    assert entity.dirty == frozenset()
+
+
+def test_class_change_set_tracks_entities_outside_a_world():
+    Tracked.use_change_set(ChangeSet())
+    try:
+        reports = []
+        entity = Tracked()
+        entity._push_entity_handlers(on_update=lambda entity, fields: reports.append(fields))
+        entity.name = 'first'
+        entity.name = 'second'
+        entity.position = (1, 2)
+        assert Tracked.flush_changes() == 1
+        assert reports == [{'name', 'position', 'x', 'y'}]
+        assert Tracked.flush_changes() == 0
+    finally:
+        Tracked.use_change_set(None)
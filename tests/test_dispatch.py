@@ -0,0 +1,81 @@
+from pyglet.event import EVENT_HANDLED
+
+from entyty._entity import VisualEntity
+from entyty._entity._dispatch import EntityDispatcher
+
+
+class Probe(VisualEntity):
+    __slots__ = ()
+
+
+class OtherProbe(VisualEntity):
+    __slots__ = ()
+
+
+def test_entity_handlers_only_see_their_entity():
+    seen = []
+    first, second = Probe('first'), Probe('second')
+    first._push_entity_handlers(on_delete=lambda entity: seen.append(entity.name))
+    second.delete()
+    first.delete()
+    assert seen == ['first']
+
+
+def test_class_handlers_see_subclasses_only():
+    seen = []
+
+    def on_delete(entity):
+        seen.append(entity.name)
+
+    Probe._push_handlers(on_delete=on_delete)
+    try:
+        Probe('probe').delete()
+        OtherProbe('other').delete()
+    finally:
+        Probe._remove_handler('on_delete', on_delete)
+    assert seen == ['probe']
+    assert not Probe.dispatcher.has_handlers(Probe)
+
+
+def test_entity_handlers_run_before_class_handlers_and_can_stop_them():
+    seen = []
+
+    def on_delete(entity):
+        seen.append('class')
+
+    Probe._push_handlers(on_delete=on_delete)
+    try:
+        entity = Probe('probe')
+        entity._push_entity_handlers(on_delete=lambda entity: seen.append('entity') or EVENT_HANDLED)
+        entity.delete()
+    finally:
+        Probe._remove_handler('on_delete', on_delete)
+    assert seen == ['entity']
+
+
+def test_delete_drops_the_entity_frames():
+    dispatcher = Probe.dispatcher
+    entities = [Probe() for _ in range(100)]
+    for entity in entities:
+        entity._push_entity_handlers(on_delete=lambda entity: None)
+    for entity in entities:
+        entity.delete()
+    assert not any(dispatcher.has_handlers(entity.id) for entity in entities)
+
+
+def test_dispatcher_stacks_frames_per_key():
+    class Target:
+        id = 'key'
+
+    dispatcher = EntityDispatcher()
+    dispatcher.register_event_type('on_ping')
+    seen = []
+    dispatcher.push_handlers('key', on_ping=lambda: seen.append('bottom'))
+    dispatcher.push_handlers('key', on_ping=lambda: seen.append('top') or EVENT_HANDLED)
+    assert dispatcher.dispatch_event(Target(), 'on_ping') == EVENT_HANDLED
+    dispatcher.pop_handlers('key')
+    dispatcher.dispatch_event(Target(), 'on_ping')
+    assert seen == ['top', 'bottom']
+    dispatcher.clear_handlers('key')
+    assert not dispatcher.has_handlers('key')
+    assert dispatcher.dispatch_event(Target(), 'on_ping') is False
@@ -0,0 +1,87 @@
+import asyncio
+
+from entyty._entity import EventQueue, GridEntity, QueuedEvent, World
+
+
+def test_events_wait_for_delivery_in_order(grid):
+    world = World(grid)
+    entity = GridEntity(grid, cell=grid['0_0'])
+    world.add(entity)
+    queue = EventQueue()
+    queue.attach(world, GridEntity)
+    try:
+        bulk = []
+        seen = []
+        queue.subscribe('on_occupy', bulk.append)
+        entity._push_entity_handlers(
+                on_vacate=lambda entity, cell: seen.append(('vacate', cell.designation)),
+                on_occupy=lambda entity, cell: seen.append(('occupy', cell.designation)),
+        )
+        entity.set_path_to(grid['2_0'])
+        world.step(1)
+        world.step(1)
+        assert [event.args[1].designation for group in bulk for event in group] == ['1_0', '2_0']
+        assert all(isinstance(event, QueuedEvent) and event.entity is entity for group in bulk for event in group)
+        assert seen == [('vacate', '0_0'), ('occupy', '1_0'), ('vacate', '1_0'), ('occupy', '2_0')]
+        assert len(queue) == 0
+    finally:
+        queue.detach()
+    assert GridEntity._event_queue is None and world.event_queue is None
+
+
+def test_handlers_are_cleared_when_on_delete_is_delivered(grid):
+    queue = EventQueue()
+    GridEntity.use_event_queue(queue)
+    try:
+        entity = GridEntity(grid, cell=grid['0_0'])
+        deleted = []
+        entity._push_entity_handlers(on_delete=deleted.append)
+        entity.delete()
+        assert deleted == [] and entity.dispatcher.has_listeners(entity)
+        assert queue.deliver() >= 1
+        assert deleted == [entity]
+        assert not entity.dispatcher.has_listeners(entity)
+    finally:
+        GridEntity.use_event_queue(None)
+
+
+def test_clear_and_unsubscribe(grid):
+    queue = EventQueue()
+    calls = []
+    queue.subscribe('on_delete', calls.append)
+    queue.unsubscribe('on_delete', calls.append)
+    entity = GridEntity(grid, cell=grid['0_0'])
+    queue.put(entity, 'on_delete', (entity,))
+    queue.clear()
+    assert queue.deliver() == 0 and calls == []
+
+
+def test_streams_receive_delivered_events_in_batches(grid):
+    async def consume():
+        queue = EventQueue()
+        stream = queue.stream('on_occupy')
+        entity = GridEntity(grid, cell=grid['0_0'])
+        for _ in range(3):
+            queue.put(entity, 'on_occupy', (entity, grid['1_0']))
+        queue.put(entity, 'on_vacate', (entity, grid['0_0']))
+        queue.deliver()
+        stream.close()
+        return [event.event_type async for event in stream]
+
+    assert asyncio.run(consume()) == ['on_occupy'] * 3
+
+
+def test_full_streams_drop_batches(grid):
+    async def consume():
+        queue = EventQueue()
+        stream = queue.stream(maxsize=1)
+        entity = GridEntity(grid, cell=grid['0_0'])
+        for _ in range(3):
+            queue.put(entity, 'on_vacate', (entity, grid['0_0']))
+            queue.deliver()
+        await asyncio.sleep(0)
+        stream.close()
+        events = [event async for event in stream]
+        return len(events), stream.dropped
+
+    assert asyncio.run(consume()) == (1, 2)
@@ -0,0 +1,91 @@
+from conftest import Grid
+
+from entyty._entity import FlowField, FlowFieldCache, GridEntity, World
+
+
+def wall(grid, col):
+    for row in range(grid.rows):
+        grid[f'{col}_{row}'].passable = False
+
+
+def test_field_leads_every_cell_to_the_destination(grid):
+    field = FlowField(grid, '10_10')
+    assert len(field) == len(grid.cells)
+    assert field.steps_from('10_10') == 0
+    assert field.steps_from('0_0') == 10
+    path = field.path_from('0_0')
+    assert len(path) == 10 and path[-1] is grid['10_10']
+
+
+def test_field_respects_costs_and_walls():
+    grid = Grid(10, 10, cell_size=4)
+    wall(grid, 5)
+    field = FlowField(grid, '9_9')
+    assert '0_0' not in field
+    assert field.next_step('0_0') is None and field.steps_from('0_0') is None
+    grid = Grid(10, 1, cell_size=4)
+    grid['5_0'].cost_in = 10
+    assert FlowField(grid, '9_0').cost_from('0_0') == 27
+
+
+def test_cache_shares_fields_until_the_last_user_releases(grid):
+    cache = FlowFieldCache()
+    first = cache.acquire(grid, '5_5')
+    assert cache.acquire(grid, grid['5_5']) is first
+    assert cache.stats() == {'fields': 1, 'builds': 1, 'reuses': 1}
+    cache.release(first)
+    assert len(cache) == 1
+    cache.release(first)
+    assert len(cache) == 0
+
+
+def test_invalidated_fields_are_rebuilt_for_their_users(grid):
+    cache = FlowFieldCache()
+    GridEntity.use_flow_fields(cache)
+    try:
+        entity = GridEntity(grid, cell=grid['0_0'])
+        entity.set_path_to(grid['4_0'])
+        old = entity._flow_field
+        cache.invalidate(grid)
+        assert old.stale
+        entity._next_flow_step()
+        assert entity._flow_field is not old and not entity._flow_field.stale
+    finally:
+        GridEntity.use_flow_fields(None)
+
+
+def test_world_walks_flow_followers_to_their_destination(grid):
+    cache = FlowFieldCache()
+    GridEntity.use_flow_fields(cache)
+    try:
+        world = World(grid)
+        entities = [GridEntity(grid, cell=grid[f'0_{row}']) for row in range(5)]
+        for entity in entities:
+            world.add(entity)
+            entity.set_path_to(grid['12_2'])
+        assert len(cache) == 1
+        for _ in range(20):
+            world.step(1)
+    finally:
+        GridEntity.use_flow_fields(None)
+    assert grid['12_2'].occupant in entities
+    assert not any(entity.traveling for entity in entities)
+    assert len(cache) == 0
+
+
+def test_world_releases_followers_that_cannot_reach_the_destination():
+    grid = Grid(10, 10, cell_size=4)
+    wall(grid, 5)
+    cache = FlowFieldCache()
+    GridEntity.use_flow_fields(cache)
+    try:
+        world = World(grid)
+        entity = GridEntity(grid, cell=grid['0_0'])
+        world.add(entity)
+        entity.set_path_to(grid['9_9'])
+        world.step(1)
+    finally:
+        GridEntity.use_flow_fields(None)
+    assert not entity.traveling
+    assert entity._flow_field is None
+    assert len(cache) == 0
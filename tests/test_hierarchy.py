@@ -0,0 +1,51 @@
+from entyty._entity import GridEntity, Hierarchy, VisualEntity, World
+
+
+def test_tree_walks():
+    root, child, grandchild, sibling = (VisualEntity() for _ in range(4))
+    root._adopt(child)
+    root._adopt(sibling)
+    child._adopt(grandchild)
+    assert list(root.descendants()) == [child, grandchild, sibling]
+    assert list(grandchild.ancestors()) == [child, root]
+    assert grandchild.root is root and child.siblings == [sibling]
+    sibling._adopt(grandchild)
+    assert child.children is None and grandchild.parent is sibling
+
+
+def test_descendants_follow_a_moved_entity():
+    hierarchy = Hierarchy()
+    parent, child, grandchild = VisualEntity(), VisualEntity(), VisualEntity()
+    parent.position = (0, 0)
+    child.position = (10, 20)
+    grandchild.position = (5, 5)
+    parent._adopt(child)
+    child._adopt(grandchild)
+    hierarchy.track((parent, child, grandchild))
+    parent.position = (3, 4)
+    assert hierarchy.propagate((parent,)) == 2
+    assert child.position == (13, 24) and grandchild.position == (8, 9)
+    assert hierarchy.propagate((parent,)) == 0
+
+
+def test_world_passes_moves_and_inherited_fields_down(grid):
+    world = World(grid)
+    hierarchy = Hierarchy(inherit=('speed',))
+    leader = GridEntity(grid, cell=grid['0_0'])
+    follower = GridEntity(grid, cell=grid['0_1'])
+    marker = VisualEntity()
+    marker.position = (0, 0)
+    leader._adopt(follower)
+    leader._adopt(marker)
+    for entity in (leader, follower, marker):
+        world.add(entity)
+    hierarchy.attach(world)
+    try:
+        leader.speed = 7
+        leader.set_path_to(grid['1_0'])
+        world.step(1)
+        assert follower.speed == 7
+        assert marker.position == (0, grid.cell_size)
+    finally:
+        hierarchy.detach()
+    assert hierarchy.world is None
@@ -0,0 +1,47 @@
+from entyty._entity import CellHistory, GridEntity, HistorySpill, World
+
+
+def test_unbounded_history_keeps_every_cell():
+    history = CellHistory(range(5))
+    assert list(history) == [0, 1, 2, 3, 4]
+    assert history.last == 4 and history.total == 5
+    assert history.last_n(2) == [3, 4]
+
+
+def test_bounded_history_keeps_the_newest_cells():
+    history = CellHistory(maxlen=3)
+    for cell in range(7):
+        history.append(cell)
+    assert history == [4, 5, 6]
+    assert history[0] == 4 and history[-1] == 6
+    assert history.last == 6 and history.last_n(10) == [4, 5, 6]
+    assert history.total == 7 and history.dropped == 4
+
+
+def test_dropped_cells_are_spilled():
+    spilled = []
+    history = CellHistory(maxlen=2, spill=lambda owner, cell: spilled.append((owner, cell)), owner='owner')
+    for cell in range(4):
+        history.append(cell)
+    assert spilled == [('owner', 0), ('owner', 1)]
+    history = CellHistory(maxlen=0, spill=lambda owner, cell: spilled.append(cell))
+    history.append(9)
+    assert len(history) == 0 and spilled[-1] == 9
+
+
+def test_entities_spill_their_full_history_to_disk(grid, tmp_path):
+    spill = HistorySpill(str(tmp_path / 'history.txt'))
+    GridEntity.use_cell_history(maxlen=2, spill=spill)
+    try:
+        world = World(grid)
+        entity = GridEntity(grid, cell=grid['0_0'])
+        world.add(entity)
+        entity.set_path_to(grid['5_0'])
+        for _ in range(5):
+            world.step(1)
+        assert [cell.designation for cell in entity.cell_history] == ['3_0', '4_0']
+        assert entity.last_cell is grid['4_0']
+        assert spill.read(entity.entity_id) == ['0_0', '1_0', '2_0']
+    finally:
+        GridEntity.use_cell_history()
+        spill.close()
@@ -0,0 +1,36 @@
+from uuid import UUID, uuid4
+
+from entyty._entity import Entity, VisualEntity
+
+
+def test_ids_are_increasing_integers():
+    first, second = VisualEntity(), VisualEntity()
+    assert isinstance(first.id, int)
+    assert second.id > first.id
+
+
+def test_hash_and_equality_use_the_integer_id():
+    entity = VisualEntity()
+    assert hash(entity) == entity.id
+    assert entity == entity and entity != VisualEntity()
+    assert entity != entity.id
+    assert entity._entity_id is None
+    assert len({entity, entity, VisualEntity()}) == 2
+    assert entity._entity_id is None
+
+
+def test_uuid_is_created_lazily_and_kept():
+    entity = VisualEntity()
+    entity_id = entity.entity_id
+    assert UUID(entity_id).hex == entity_id
+    assert entity.entity_id == entity_id
+
+
+def test_given_uuids_are_stored_as_hex():
+    uuid = uuid4()
+    entity = Entity()
+    entity.entity_id = uuid
+    assert entity.entity_id == uuid.hex
+    entity = VisualEntity()
+    entity.entity_id = str(uuid)
+    assert entity.entity_id == uuid.hex
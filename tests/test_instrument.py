@@ -0,0 +1,61 @@
+import pytest
+
+from entyty._entity import GridEntity, Instrumentation, World
+
+
+def records(instrumentation, scope):
+    return {(record['method'], record['class']): record for record in instrumentation.snapshot(scope)}
+
+
+def test_enable_and_disable_swap_the_methods():
+    move, step_move = GridEntity.move, World._move
+    with Instrumentation() as instrumentation:
+        assert instrumentation.enabled
+        assert GridEntity.move is not move and World._move is not step_move
+        with pytest.raises(RuntimeError):
+            Instrumentation().enable()
+    assert not instrumentation.enabled
+    assert GridEntity.move is move and World._move is step_move
+
+
+def test_attached_instrumentation_closes_a_tick_per_step(grid):
+    world = World(grid)
+    entity = GridEntity(grid, cell=grid['0_0'])
+    world.add(entity)
+    instrumentation = Instrumentation()
+    instrumentation.attach(world)
+    try:
+        entity.move(grid['1_0'])
+        assert records(instrumentation, 'current')[('GridEntity.move', 'GridEntity')]['calls'] == 1
+        entity.set_path_to(grid['3_0'])
+        world.step(1)
+        tick = records(instrumentation, 'tick')
+        assert tick[('World._move', 'World')]['calls'] == 1
+        assert tick[('World.flush_changes', 'World')]['calls'] == 1
+        assert tick[('EntityRegistry.update', 'EntityRegistry')]['calls'] == 1
+        assert tick[('GridEntity.move', 'GridEntity')]['calls'] == 1
+        world.step(1)
+        assert ('GridEntity.move', 'GridEntity') not in records(instrumentation, 'tick')
+        total = records(instrumentation, 'total')
+        assert total[('World._move', 'World')]['calls'] == 2
+        assert total[('GridEntity.move', 'GridEntity')]['calls'] == 1
+        assert instrumentation.ticks == 2
+        assert all(record['max_seconds'] <= record['seconds'] for record in total.values())
+    finally:
+        instrumentation.detach()
+    assert not instrumentation.enabled and instrumentation.world is None
+
+
+def test_prometheus_text_and_reset(grid):
+    with Instrumentation(prefix='test') as instrumentation:
+        GridEntity(grid, cell=grid['0_0']).move(grid['1_0'])
+        instrumentation.tick()
+        text = instrumentation.prometheus()
+    assert '# TYPE test_calls_total counter' in text
+    assert 'test_calls_total{method="GridEntity.move",class="GridEntity"} 1' in text
+    assert 'test_last_tick_calls_total{method="GridEntity.move",class="GridEntity"} 1' in text
+    assert text.endswith('test_ticks_total 1\n')
+    instrumentation.reset()
+    assert instrumentation.snapshot() == [] and instrumentation.ticks == 0
+    with pytest.raises(ValueError):
+        instrumentation.snapshot('week')
@@ -0,0 +1,100 @@
+import random
+
+from conftest import Grid, state
+
+from entyty._entity import FlowFieldCache, GridEntity, Journal, World
+
+
+def populate(grid, count=40, seed=1):
+    rng = random.Random(seed)
+    world = World(grid)
+    cells = rng.sample(list(grid.cells.values()), count)
+    for cell in cells:
+        world.add(GridEntity(grid, cell=cell))
+    return world, rng
+
+
+def test_replay_rebuilds_the_world(grid, tmp_path):
+    world, rng = populate(grid)
+    journal = Journal(str(tmp_path / 'world.journal'))
+    journal.attach(world)
+    entities = list(world)
+    for entity in entities[:20]:
+        entity.set_path_to(rng.choice(list(grid.cells.values())))
+    entities[0]._adopt(entities[1])
+    entities[2].speed = 10
+    for _ in range(3):
+        world.step(1)
+        journal.checkpoint()
+    world.remove(entities[3])
+    world.add(GridEntity(grid, cell=next(cell for cell in grid.cells.values() if not cell.occupied)))
+    world.step(1)
+    journal.checkpoint()
+    replayed = journal.replay(Grid(20, 20, cell_size=4))
+    assert replayed.tick == world.tick
+    assert state(replayed) == state(world)
+
+
+def test_replayed_world_steps_on_as_the_live_one(grid, tmp_path):
+    world, rng = populate(grid, count=120)
+    journal = Journal(str(tmp_path / 'world.journal'))
+    journal.attach(world)
+    for entity in list(world)[:80]:
+        entity.set_path_to(rng.choice(list(grid.cells.values())))
+    world.step(1)
+    journal.checkpoint()
+    replayed = journal.replay(Grid(20, 20, cell_size=4))
+    for _ in range(6):
+        world.step(1)
+        replayed.step(1)
+        assert state(replayed) == state(world)
+
+
+def test_compact_folds_the_journal_into_the_base_snapshot(grid, tmp_path):
+    world, rng = populate(grid)
+    journal = Journal(str(tmp_path / 'world.journal'))
+    journal.attach(world)
+    for entity in list(world)[:10]:
+        entity.set_path_to(rng.choice(list(grid.cells.values())))
+    world.step(1)
+    journal.checkpoint()
+    journal.compact()
+    assert len(journal) == 0
+    assert state(journal.replay(Grid(20, 20, cell_size=4))) == state(world)
+
+
+def test_changes_are_recorded_once_per_step(grid, tmp_path):
+    world, _ = populate(grid, count=5)
+    journal = Journal(str(tmp_path / 'world.journal'))
+    journal.attach(world)
+    entity = next(iter(world))
+    assert not entity.dispatcher.has_listeners(entity)
+    for speed in (5, 10, 15):
+        entity.speed = speed
+    world.step(1)
+    updates = [record for record in journal.records() if record[0] == 'update' and record[2] == 'speed']
+    assert updates == [['update', entity.entity_id, 'speed', 15]]
+    assert [record for record in journal.records() if record[0] == 'step'] == [['step', 1]]
+    world.step(1)
+    assert [record[0] for record in journal.records()][-1] == 'step'
+
+
+def test_replay_keeps_flow_followers_on_their_fields(grid, tmp_path):
+    GridEntity.use_flow_fields(FlowFieldCache())
+    try:
+        world, _ = populate(grid, count=60)
+        journal = Journal(str(tmp_path / 'world.journal'))
+        journal.attach(world)
+        for entity in list(world)[:30]:
+            entity.set_path_to(grid['10_10'])
+        for _ in range(4):
+            world.step(1)
+            journal.checkpoint()
+        replayed = journal.replay(Grid(20, 20, cell_size=4))
+        assert state(replayed) == state(world)
+        for _ in range(4):
+            world.step(1)
+            replayed.step(1)
+            assert state(replayed) == state(world)
+    finally:
+        GridEntity.use_flow_fields(None)
@@ -0,0 +1,58 @@
+import gc
+
+from entyty._entity import GridEntity, LabelIndex, VisualEntity
+
+
+class Labeled(VisualEntity):
+    __slots__ = ()
+
+
+def test_mask_treats_a_string_as_one_label():
+    index = LabelIndex()
+    assert index.mask('enemy') == index.mask(('enemy',)) == 1
+    assert index.mask(('enemy', 'flying')) == 3
+    assert index.labels(3) == ('enemy', 'flying') and index.names == ('enemy', 'flying')
+    assert 'enemy' in index and 'e' not in index
+
+
+def test_queries_combine_labels():
+    original = Labeled._label_index
+    Labeled.use_label_index(LabelIndex(8))
+    try:
+        a, b, c, d = (Labeled() for _ in range(4))
+        a.labels = ('enemy', 'flying')
+        b.labels = 'enemy'
+        c.labels = ('ally', 'flying')
+        d.add_label('ally')
+        d.remove_label('ally')
+        assert Labeled.labeled(all_of='enemy') == [a, b]
+        assert Labeled.labeled(any_of=('enemy', 'ally')) == [a, b, c]
+        assert Labeled.labeled(all_of='flying', none_of='enemy') == [c]
+        assert Labeled.labeled(none_of='flying') == [b]
+        assert Labeled.labeled(all_of='unknown') == [] and Labeled.labeled(any_of='unknown') == []
+        assert a.has_label('enemy', 'flying') and not b.has_label('flying')
+        assert Labeled._label_index.count('flying') == 2 and len(Labeled._label_index) == 3
+    finally:
+        Labeled.use_label_index(original)
+
+
+def test_deleted_and_collected_entities_leave_the_index(grid):
+    index = LabelIndex()
+    originals = GridEntity._label_index, Labeled._label_index
+    GridEntity.use_label_index(index)
+    Labeled.use_label_index(index)
+    try:
+        kept = GridEntity(grid, cell=grid['0_0'])
+        deleted = GridEntity(grid, cell=grid['1_0'])
+        dropped = Labeled()
+        for entity in (kept, deleted, dropped):
+            entity.labels = 'unit'
+        assert len(index) == 3
+        deleted.delete()
+        del entity, dropped
+        gc.collect()
+        assert index.entities(all_of='unit') == [kept]
+        assert index.query(all_of='unit').tolist() == [kept._id]
+    finally:
+        GridEntity.use_label_index(originals[0])
+        Labeled.use_label_index(originals[1])
@@ -0,0 +1,69 @@
+import logging
+import os
+import subprocess
+import sys
+
+from entyty import __log__
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(code, cwd, **env):
+    environment = dict(os.environ, PYTHONPATH=ROOT, **env)
+    result = subprocess.run([sys.executable, '-c', code], cwd=cwd, env=environment, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_import_starts_no_thread_and_writes_no_file(tmp_path):
+    output = run(
+            'import threading, entyty._entity\n'
+            'from entyty.__log__ import queue_handler\n'
+            'print(threading.active_count(), queue_handler.listener is None)',
+            tmp_path
+    )
+    assert output == '1 True'
+    assert not (tmp_path / 'entity.log').exists()
+
+
+def test_log_method_can_be_compiled_out(tmp_path):
+    code = (
+            'from entyty.__log__ import log_method\n'
+            'def func(): pass\n'
+            'print(log_method(func) is func)'
+    )
+    assert run(code, tmp_path, ENTYTY_LOG_METHODS='0') == 'True'
+    assert run(code, tmp_path) == 'False'
+
+
+def test_filtered_messages_are_not_formatted():
+    class Loud:
+        formatted = 0
+
+        def __str__(self):
+            Loud.formatted += 1
+            return 'loud'
+
+    level = __log__.logger.level
+    __log__.logger.setLevel(__log__.LEVEL)
+    try:
+        __log__.log('%s', Loud(), level=logging.DEBUG)
+    finally:
+        __log__.logger.setLevel(level)
+    assert Loud.formatted == 0
+
+
+def test_records_are_written_by_the_background_thread(tmp_path):
+    handler = __log__.LazyQueueHandler(str(tmp_path / 'test.log'))
+    logger = logging.getLogger('entyty-test')
+    logger.addHandler(handler)
+    logger.setLevel(__log__.LEVEL)
+    try:
+        assert handler.listener is None
+        logger.log(__log__.LEVEL, 'hello %s', 'world')
+        assert handler.listener is not None
+    finally:
+        handler.stop()
+        logger.removeHandler(handler)
+    assert (tmp_path / 'test.log').read_text().endswith('hello world\n')
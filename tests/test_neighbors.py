@@ -0,0 +1,41 @@
+import math
+
+from entyty._entity import Direction, GridEntity, NeighborTable
+
+
+def test_directions_between_adjacent_cells(grid):
+    table = NeighborTable.for_grid(grid)
+    assert NeighborTable.for_grid(grid) is table
+    assert table.direction(grid['1_1'], grid['2_1']) is Direction.EAST
+    assert table.direction(grid['1_1'], grid['1_0']) is Direction.NORTH
+    assert table.direction(grid['1_1'], grid['0_2']) is Direction.SOUTH_WEST
+    assert table.direction(grid['1_1'], grid['3_1']) is None
+    for designation, direction in table.directions(grid['1_1']).items():
+        assert getattr(grid['1_1'], direction.cell_attribute).designation == designation
+
+
+def test_corner_cells_only_list_their_neighbors(grid):
+    table = NeighborTable(grid)
+    assert set(table.directions(grid['0_0']).values()) == {Direction.EAST, Direction.SOUTH_EAST, Direction.SOUTH}
+    assert len(table) == 1
+    table.invalidate(grid['0_0'])
+    assert len(table) == 0
+    table.directions(grid['0_0'])
+    table.directions(grid['1_0'])
+    table.invalidate()
+    assert len(table) == 0
+
+
+def test_facing_covers_every_angle(grid):
+    entity = GridEntity(grid, cell=grid['0_0'])
+    for angle, cardinal in ((0, 'E'), (10, 'E'), (359, 'E'), (45, 'NE'), (90, 'N'), (180, 'W'), (270, 'S'), (-90, 'S')):
+        entity.facing = angle
+        assert entity.facing == cardinal, angle
+    entity.facing = math.pi
+    assert entity.facing == 'W'
+    entity.facing = 'NW'
+    assert entity.facing == 'NW'
+    entity.facing = 'up'
+    assert entity.facing == 'Invalid angle'
+    entity.facing = float('nan')
+    assert entity.facing == 'Invalid angle'
@@ -0,0 +1,49 @@
+import pytest
+
+from entyty._entity import PathCursor
+
+
+def test_iterates_the_cells_ahead():
+    cursor = PathCursor(list(range(10)))
+    assert list(cursor) == list(range(10))
+    cursor.advance(4)
+    assert list(cursor) == [4, 5, 6, 7, 8, 9]
+    assert len(cursor) == 6
+    assert cursor.position == 4
+
+
+def test_advance_returns_the_cells_passed():
+    cursor = PathCursor(list(range(5)))
+    assert list(cursor.advance(2)) == [0, 1]
+    assert list(cursor.advance(10)) == [2, 3, 4]
+    assert not cursor
+    assert list(cursor.advance()) == []
+
+
+def test_peek_and_index():
+    cursor = PathCursor(list(range(5)))
+    cursor.advance()
+    assert cursor.peek() == 1
+    assert cursor.peek(3) == 4
+    assert cursor.peek(4) is None
+    assert cursor[0] == 1
+    assert cursor[-1] == 4
+    with pytest.raises(IndexError):
+        cursor[4]
+
+
+def test_slices_share_the_cells():
+    cells = list(range(10))
+    cursor = PathCursor(cells)
+    part = cursor[2:5]
+    assert isinstance(part, PathCursor)
+    assert part._cells is cells
+    assert part == [2, 3, 4]
+    assert cursor[::3] == [0, 3, 6, 9]
+
+
+def test_chunks_cover_the_rest_of_the_path():
+    cursor = PathCursor(list(range(7)))
+    cursor.advance()
+    assert [list(chunk) for chunk in cursor.chunks(3)] == [[1, 2, 3], [4, 5, 6]]
+    assert len(cursor) == 6
@@ -0,0 +1,76 @@
+from entyty._entity import GridEntity, PathCache
+
+
+class CountingGrid:
+    def __init__(self, grid):
+        self.grid = grid
+        self.calls = 0
+
+    def get_path(self, start, destination):
+        self.calls += 1
+        return self.grid.get_path(start, destination)
+
+
+def test_hits_share_the_cached_tuple(grid):
+    cache = PathCache()
+    counting = CountingGrid(grid)
+    first = cache.get_path(counting, '0_0', '5_3')
+    second = cache.get_path(counting, grid['0_0'], grid['5_3'])
+    assert isinstance(first, tuple)
+    assert second is first
+    assert counting.calls == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_invalidate_drops_the_paths_of_one_grid(grid):
+    cache = PathCache()
+    one, other = CountingGrid(grid), CountingGrid(grid)
+    cache.get_path(one, '0_0', '4_4')
+    cache.get_path(other, '0_0', '4_4')
+    cache.invalidate(one)
+    cache.get_path(one, '0_0', '4_4')
+    cache.get_path(other, '0_0', '4_4')
+    assert one.calls == 2 and other.calls == 1
+    assert cache.invalidations == 1
+
+
+def test_grid_revision_invalidates_automatically(grid):
+    cache = PathCache()
+    counting = CountingGrid(grid)
+    counting.revision = 0
+    cache.get_path(counting, '0_0', '4_4')
+    counting.revision = 1
+    cache.get_path(counting, '0_0', '4_4')
+    assert counting.calls == 2
+
+
+def test_least_recently_used_paths_are_evicted(grid):
+    cache = PathCache(maxsize=2)
+    counting = CountingGrid(grid)
+    cache.get_path(counting, '0_0', '1_1')
+    cache.get_path(counting, '0_0', '2_2')
+    cache.get_path(counting, '0_0', '1_1')
+    cache.get_path(counting, '0_0', '3_3')
+    assert len(cache) == 2 and cache.evictions == 1
+    cache.get_path(counting, '0_0', '1_1')
+    assert counting.calls == 3
+
+
+def test_max_bytes_caps_the_cache(grid):
+    cache = PathCache(maxsize=None, max_bytes=200)
+    for col in range(1, 10):
+        cache.get_path(grid, '0_0', f'{col}_{col}')
+    assert cache.nbytes <= 200
+    assert cache.evictions > 0
+
+
+def test_entities_walk_cached_paths(grid):
+    GridEntity.use_path_cache(PathCache())
+    try:
+        entity = GridEntity(grid, cell=grid['0_0'])
+        entity.set_path_to(grid['3_0'])
+        entity.set_path_to(grid['3_0'])
+        assert list(entity.path) == [grid['1_0'], grid['2_0'], grid['3_0']]
+        assert GridEntity._path_cache.hits == 1
+    finally:
+        GridEntity.use_path_cache(None)
@@ -0,0 +1,70 @@
+from entyty._entity import GridEntity, PathPlanner, World
+
+
+def designations(path):
+    return [cell.designation for cell in path]
+
+
+def test_in_process_planner_sets_paths(grid):
+    with PathPlanner(grid, workers=0) as planner:
+        entity = GridEntity(grid, cell=grid['0_0'])
+        future = planner.plan(entity, grid['3_0'])
+        assert len(planner) == 1 and not future.done()
+        assert planner.submit() == 1
+        assert planner.collect() == 1
+        assert designations(future.result()) == ['1_0', '2_0', '3_0']
+        assert designations(entity.path) == ['1_0', '2_0', '3_0'] and entity.traveling
+        assert len(planner) == 0
+
+
+def test_later_requests_replace_earlier_ones(grid):
+    with PathPlanner(grid, workers=0) as planner:
+        entity = GridEntity(grid, cell=grid['0_0'])
+        first = planner.plan(entity, grid['5_0'])
+        second = planner.plan(entity, grid['0_2'])
+        planner.submit()
+        planner.collect()
+        assert designations(first.result())[-1] == '5_0'
+        assert designations(entity.path) == designations(second.result()) == ['0_1', '0_2']
+
+
+def test_update_copies_changed_cells(grid):
+    with PathPlanner(grid, workers=0) as planner:
+        entity = GridEntity(grid, cell=grid['0_0'])
+        blocked = [grid[f'1_{row}'] for row in range(19)]
+        for cell in blocked:
+            cell.passable = False
+        try:
+            planner.update(blocked)
+            future = planner.plan(entity, grid['2_0'])
+            planner.submit()
+            planner.collect()
+            path = designations(future.result())
+            assert path[-1] == '2_0' and '1_19' in path
+            assert not set(path) & {cell.designation for cell in blocked}
+        finally:
+            for cell in blocked:
+                cell.passable = True
+
+
+def test_worker_pool_plans_for_an_attached_world(grid):
+    planner = PathPlanner(grid, workers=2, batch_size=2)
+    GridEntity.use_path_planner(planner)
+    try:
+        world = World(grid)
+        planner.attach(world)
+        entities = [GridEntity(grid, cell=grid[f'0_{row}']) for row in range(0, 12, 3)]
+        for entity in entities:
+            world.add(entity)
+        futures = [entity.set_path_to(grid[f'5_{entity.cell.row}']) for entity in entities]
+        assert planner.submit() == 4
+        assert planner.collect(wait=True) == 4
+        for entity, future in zip(entities, futures):
+            assert future.result()[-1] is grid[f'5_{entity.cell.row}']
+            assert len(entity.path) == 5
+        world.step(1)
+        assert [entity.cell for entity in entities] == [future.result()[0] for future in futures]
+    finally:
+        GridEntity.use_path_planner(None)
+        planner.close()
+    assert planner.world is None
@@ -0,0 +1,57 @@
+import pytest
+
+from entyty._entity import EntityPool, GridEntity, VisualEntity, World
+
+
+def test_acquire_reuses_released_entities(grid):
+    pool = EntityPool(GridEntity)
+    entity = pool.acquire(grid, cell=grid['3_3'])
+    entity_id, old_id = entity.entity_id, entity.id
+    entity.add_label('enemy')
+    pool.release(entity)
+    assert len(pool) == 1
+    assert not grid['3_3'].occupied
+    again = pool.acquire(grid, cell=grid['5_5'])
+    assert again is entity
+    assert again.cell is grid['5_5'] and grid['5_5'].occupant is again
+    assert again.entity_id != entity_id and again.id != old_id
+    assert again.labels == ()
+    assert again.age == 0
+    assert not again.traveling and not again.path
+    assert pool.stats()['hits'] == 1 and pool.stats()['misses'] == 1
+    assert pool.hit_rate == 0.5
+
+
+def test_recycled_entity_works_in_a_world(grid):
+    pool = EntityPool(GridEntity)
+    pool.release(pool.acquire(grid, cell=grid['0_0']))
+    world = World(grid)
+    entity = pool.acquire(grid, cell=grid['1_1'])
+    world.add(entity)
+    entity.set_path_to(grid['3_1'])
+    for _ in range(3):
+        world.step(1)
+    assert entity.cell is grid['3_1']
+
+
+def test_release_checks_the_entity(grid):
+    pool = EntityPool(GridEntity)
+    with pytest.raises(TypeError):
+        pool.release(VisualEntity())
+    world = World(grid)
+    entity = pool.acquire(grid, cell=grid['2_2'])
+    world.add(entity)
+    with pytest.raises(ValueError):
+        pool.release(entity)
+    world.remove(entity)
+    pool.release(entity)
+
+
+def test_release_beyond_maxsize_discards(grid):
+    pool = EntityPool(GridEntity, maxsize=1)
+    first, second = pool.acquire(grid, cell=grid['0_0']), pool.acquire(grid, cell=grid['0_1'])
+    pool.release(first)
+    pool.release(second)
+    assert len(pool) == 1
+    assert pool.stats()['discarded'] == 1
+    assert not grid['0_1'].occupied
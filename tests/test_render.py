@@ -0,0 +1,54 @@
+import gc
+
+import pyglet
+import pytest
+
+from entyty._entity import AbstractGridEntity, GridEntity, GridRenderer, World
+
+pyglet.options['headless'] = True
+
+
+@pytest.fixture
+def batch():
+    try:
+        return pyglet.graphics.Batch()
+    except Exception as error:
+        pytest.skip(f'no OpenGL context: {error}')
+
+
+def test_rectangles_follow_their_entities(grid, batch):
+    renderer = GridRenderer(batch)
+    try:
+        world = World(grid)
+        entity = GridEntity(grid, cell=grid['0_0'])
+        world.add(entity)
+        shape = renderer.show(entity)
+        assert entity in renderer and len(renderer) == 1
+        assert shape.position == (entity.x, entity.y)
+        entity.set_path_to(grid['3_0'])
+        for _ in range(3):
+            world.step(1)
+        assert renderer.show(entity) is shape
+        assert shape.position == (entity.x, entity.y)
+        renderer.set_color(entity, (0, 255, 0))
+        assert tuple(shape.color)[:3] == (0, 255, 0)
+        entity.delete()
+        assert entity not in renderer
+    finally:
+        renderer.close()
+
+
+def test_renderer_for_batch_is_kept_by_the_batch(batch):
+    renderer = GridRenderer.for_batch(batch)
+    assert GridRenderer.for_batch(batch) is renderer
+    renderer.close()
+    assert GridRenderer.for_batch(batch) is not renderer
+
+
+def test_collected_renderers_stop_listening(grid, batch):
+    before = GridEntity.dispatcher.has_handlers(AbstractGridEntity)
+    renderer = GridRenderer(batch)
+    renderer.show(GridEntity(grid, cell=grid['1_1']))
+    del renderer
+    gc.collect()
+    assert GridEntity.dispatcher.has_handlers(AbstractGridEntity) == before
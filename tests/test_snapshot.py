@@ -0,0 +1,100 @@
+from conftest import Grid, state
+
+from entyty._entity import AbstractEntity, GridEntity, Snapshot, World
+
+
+def make_world(grid):
+    world = World(grid)
+    entities = [GridEntity(grid, cell=grid[f'{col}_{col}']) for col in range(8)]
+    for entity in entities:
+        world.add(entity)
+    entities[0]._adopt(entities[1])
+    entities[2].speed = 15
+    entities[3].set_path_to(grid['15_3'])
+    world.add(GridEntity(grid, cell=grid['4_5']))
+    entities[4].set_path_to(grid['4_10'])
+    world.step(1)
+    return world
+
+
+def test_save_and_load_round_trip(grid, tmp_path):
+    world = make_world(grid)
+    path = str(tmp_path / 'world.snapshot')
+    assert world.save(path) == len(world)
+    loaded = World.load(path, Grid(20, 20, cell_size=4))
+    assert loaded.tick == world.tick
+    assert state(loaded) == state(world)
+
+
+def test_lazy_and_bulk_rebuilds_agree(grid, tmp_path):
+    world = make_world(grid)
+    path = str(tmp_path / 'world.snapshot')
+    world.save(path)
+    with Snapshot(path, Grid(20, 20, cell_size=4)) as snapshot:
+        lazy = [snapshot[index] for index in reversed(range(len(snapshot)))]
+    with Snapshot(path, Grid(20, 20, cell_size=4)) as snapshot:
+        bulk = list(snapshot)
+    assert state(lazy) == state(bulk) == state(world)
+
+
+def test_restore_links_children_without_events(grid, tmp_path):
+    world = make_world(grid)
+    path = str(tmp_path / 'world.snapshot')
+    world.save(path)
+    updates = []
+
+    def on_update(entity, fields):
+        updates.append(fields)
+
+    AbstractEntity._push_handlers(on_update=on_update)
+    try:
+        restored = World(Grid(20, 20, cell_size=4))
+        restored.restore(path)
+    finally:
+        AbstractEntity._remove_handler('on_update', on_update)
+    assert updates == []
+    assert restored.flush_changes() == 0
+    child = next(entity for entity in restored if entity.parent is not None)
+    assert child.is_child and child.parent.is_parent
+    assert child.parent.children == (child,)
+
+
+def test_restored_world_steps_on_as_the_live_one(grid, tmp_path):
+    world = make_world(grid)
+    path = str(tmp_path / 'world.snapshot')
+    world.save(path)
+    loaded = World.load(path, Grid(20, 20, cell_size=4))
+    for _ in range(5):
+        world.step(1)
+        loaded.step(1)
+        assert state(loaded) == state(world)
+
+
+def test_idle_entities_are_built_on_first_access(grid, tmp_path):
+    world = make_world(grid)
+    path = str(tmp_path / 'world.snapshot')
+    world.save(path)
+    added = []
+    loaded = World(Grid(20, 20, cell_size=4))
+    loaded.push_handlers(on_add=added.append)
+    loaded.restore(path)
+    assert len(loaded) == len(world)
+    assert len(added) < len(world)
+    assert loaded.registry.column('age').tolist() == [entity.age for entity in world]
+    for _ in range(5):
+        world.step(1)
+        loaded.step(1)
+    assert state(loaded) == state(world)
+    assert len(added) == len(world)
+
+
+def test_restoring_again_frees_the_unbuilt_entities(grid, tmp_path):
+    world = make_world(grid)
+    path = str(tmp_path / 'world.snapshot')
+    world.save(path)
+    other = Grid(20, 20, cell_size=4)
+    loaded = World.load(path, other)
+    loaded.restore(path)
+    assert len(loaded) == len(loaded.registry) == len(world)
+    assert sum(cell.occupied for cell in other.cells.values()) == len(world)
+    assert state(loaded) == state(world)
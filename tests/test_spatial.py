@@ -0,0 +1,82 @@
+import math
+import random
+
+from entyty._entity import GridEntity, SpatialIndex, World
+
+
+class Point:
+    def __init__(self, x, y):
+        self.coordinates = (x, y)
+
+
+def brute_within(points, center, radius):
+    return {i for i, (x, y) in points.items() if math.hypot(x - center[0], y - center[1]) <= radius}
+
+
+def test_queries_agree_with_a_full_scan():
+    rng = random.Random(3)
+    index = SpatialIndex(bucket_size=10)
+    entities = [object() for _ in range(500)]
+    points = {}
+    for i, entity in enumerate(entities):
+        points[i] = (rng.randrange(200), rng.randrange(200))
+        index.insert(entity, Point(*points[i]))
+    for _ in range(20):
+        center = (rng.randrange(200), rng.randrange(200))
+        radius = rng.randrange(1, 40)
+        found = {entities.index(entity) for entity in index.entities_within(center, radius)}
+        assert found == brute_within(points, center, radius)
+        x0, y0, x1, y1 = center[0] - radius, center[1] - radius, center[0] + radius, center[1] + radius
+        found = {entities.index(entity) for entity in index.entities_in_rect(x1, y1, x0, y0)}
+        assert found == {i for i, (x, y) in points.items() if x0 <= x <= x1 and y0 <= y <= y1}
+
+
+def test_nearest_returns_the_closest_first():
+    rng = random.Random(5)
+    index = SpatialIndex(bucket_size=4)
+    entities = [object() for _ in range(300)]
+    points = {}
+    for i, entity in enumerate(entities):
+        points[i] = (rng.randrange(100), rng.randrange(100))
+        index.insert(entity, Point(*points[i]))
+    center = (50, 50)
+    nearest = index.nearest(center, k=5)
+    distances = [math.hypot(points[entities.index(entity)][0] - 50, points[entities.index(entity)][1] - 50)
+                 for entity in nearest]
+    assert distances == sorted(distances)
+    assert distances[-1] == sorted(math.hypot(x - 50, y - 50) for x, y in points.values())[4]
+    within = index.nearest(center, k=50, max_radius=10)
+    assert len(within) == len(brute_within(points, center, 10))
+
+
+def test_remove_and_move():
+    index = SpatialIndex(bucket_size=8)
+    entity = object()
+    index.insert(entity, Point(1, 1))
+    index.insert(entity, Point(30, 30))
+    assert len(index) == 1 and index.position_of(entity) == (30, 30)
+    assert index.entities_at((1, 1)) == [] and index.entities_at((30, 30)) == [entity]
+    index.remove(entity)
+    index.remove(entity)
+    assert entity not in index and not index._buckets
+
+
+def test_grid_entities_keep_the_index_current(grid):
+    index = SpatialIndex(bucket_size=8)
+    GridEntity.use_spatial_index(index)
+    try:
+        world = World(grid)
+        mover = GridEntity(grid, cell=grid['0_0'])
+        other = GridEntity(grid, cell=grid['1_1'])
+        world.add(mover)
+        world.add(other)
+        assert set(mover.neighbors_within(8)) == {other}
+        mover.set_path_to(grid['10_0'])
+        for _ in range(10):
+            world.step(1)
+        assert index.position_of(mover) == grid['10_0'].coordinates
+        assert mover.neighbors_within(8) == []
+        other.vacate()
+        assert other not in index
+    finally:
+        GridEntity.use_spatial_index(None)
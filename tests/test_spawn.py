@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from entyty._entity import GridEntity, World
+
+
+class Spawned(GridEntity):
+    __slots__ = ()
+
+
+def test_entities_land_on_distinct_free_cells(grid):
+    for col in range(20):
+        grid[f'{col}_0'].passable = False
+    existing = GridEntity(grid, cell=grid['0_1'])
+    created = []
+    Spawned._push_handlers(on_create=created.append)
+    try:
+        entities = Spawned.spawn_many(grid, 50, rng=random.Random(1))
+    finally:
+        Spawned._pop_handlers()
+        for col in range(20):
+            grid[f'{col}_0'].passable = True
+    assert created == [entities]
+    cells = [entity.cell for entity in entities]
+    assert len(set(map(id, cells))) == 50
+    assert all(cell.passable and cell.occupant is entity for cell, entity in zip(cells, entities))
+    assert existing.cell not in cells
+    assert len({entity.id for entity in entities}) == 50
+    assert entities[0].name == 'spawned' and entities[0].speed == 5
+
+
+def test_the_same_seed_picks_the_same_cells(grid):
+    first = [entity.cell.designation for entity in GridEntity.spawn_many(grid, 10, rng=random.Random(7))]
+    other = type(grid)(20, 20, cell_size=4)
+    second = [entity.cell.designation for entity in GridEntity.spawn_many(other, 10, rng=random.Random(7))]
+    assert first == second
+
+
+def test_too_many_entities_raise(grid):
+    with pytest.raises(ValueError):
+        GridEntity.spawn_many(grid, 401)
+    assert not any(cell.occupied for cell in grid.cells.values())
+
+
+def test_spawned_entities_move_in_a_world(grid):
+    world = World(grid)
+    entities = GridEntity.spawn_many(grid, 5, rng=random.Random(3))
+    for entity in entities:
+        world.add(entity)
+    entity = entities[0]
+    goal = next(cell for cell in grid.cells.values() if not cell.occupied and cell is not entity.cell)
+    entity.set_path_to(goal)
+    for _ in range(40):
+        world.step(1)
+    assert entity.cell is goal
@@ -0,0 +1,89 @@
+from entyty._entity import Entity, GridEntity, World
+
+
+def test_step_moves_traveling_entities_along_their_paths(grid):
+    world = World(grid)
+    entity = GridEntity(grid, cell=grid['5_5'])
+    world.add(entity)
+    entity.set_path_to(grid['8_5'])
+    path = list(entity.path)
+    world.step(1)
+    assert entity.cell is path[0]
+    assert list(entity.path) == path[1:]
+    for _ in range(len(path)):
+        world.step(1)
+    assert entity.cell is grid['8_5']
+    assert not entity.traveling
+    assert not entity.path
+
+
+def test_step_ends_the_turn_of_every_entity(grid):
+    world = World(grid)
+    mover = GridEntity(grid, cell=grid['1_1'])
+    idle = GridEntity(grid, cell=grid['10_10'])
+    world.add(mover)
+    world.add(idle)
+    mover.set_path_to(grid['4_1'])
+    world.step(1)
+    world.step(1)
+    assert world.tick == 2
+    assert mover._turn == idle._turn == 2
+    assert mover._turn_moves == idle._turn_moves == 0
+    assert len(mover.action_history) == 2
+
+
+def test_step_ignores_entities_that_cannot_move(grid):
+    world = World(grid)
+    world.add(Entity('plain'))
+    world.add(GridEntity(grid, cell=grid['2_2']))
+    world.step(1)
+    assert world.tick == 1
+
+
+def test_blocked_entity_stops_after_its_patience(grid):
+    world = World(grid)
+    mover = GridEntity(grid, cell=grid['5_5'])
+    blocker = GridEntity(grid, cell=grid['6_5'])
+    world.add(mover)
+    world.add(blocker)
+    mover.set_path_to(grid['9_5'])
+    for _ in range(GridEntity._patience):
+        world.step(1)
+        assert mover.traveling
+    world.step(1)
+    assert not mover.traveling
+    assert not mover.path
+    assert mover.cell is grid['5_5']
+    assert blocker.cell is grid['6_5']
+
+
+def test_blocked_entity_stops_at_an_occupied_destination(grid):
+    world = World(grid)
+    mover = GridEntity(grid, cell=grid['5_5'])
+    world.add(mover)
+    world.add(GridEntity(grid, cell=grid['6_5']))
+    mover.set_path_to(grid['6_5'])
+    world.step(1)
+    assert not mover.traveling
+    assert mover.cell is grid['5_5']
+
+
+def test_move_refuses_an_occupied_cell(grid, capsys):
+    entity = GridEntity(grid, cell=grid['5_5'])
+    GridEntity(grid, cell=grid['6_5'])
+    assert entity.move(grid['6_5']) is None
+    assert entity.cell is grid['5_5']
+    assert capsys.readouterr().out == ''
+
+
+def test_entities_never_share_a_cell(grid):
+    world = World(grid)
+    entities = [GridEntity(grid, cell=grid[f'{col}_0']) for col in range(10)]
+    for entity in entities:
+        world.add(entity)
+        entity.set_path_to(grid['10_10'])
+    for _ in range(15):
+        world.step(1)
+        cells = [entity.cell for entity in entities]
+        assert len(set(map(id, cells))) == len(cells)
+        assert all(cell.occupant is entity for cell, entity in zip(cells, entities))